@@ -1,10 +1,16 @@
+import os
+
 from google.adk.agents import Agent
 
-root_agent = Agent(
-    name="api_contract_agent",
-    model="gemini-2.0-flash",
-    description="Generates a REST API Contract document from a PRD, confirmed screens, tech preferences, architecture overview, data model, and technical guidelines.",
-    instruction="""
+from sdlc_common.guidelines import select_guidelines
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .parallel import parallel_api_contract_agent
+
+NAME = "api_contract_agent"
+DESCRIPTION = "Generates a REST API Contract document from a PRD, confirmed screens, tech preferences, architecture overview, data model, and technical guidelines."
+INSTRUCTION = """
 CRITICAL: Generate output based ONLY on the context provided in this message. Do not use any information from previous sessions, prior conversations, or stored memory. Every section of your response must be derived exclusively from the input provided below.
 
 You are a senior API architect generating a REST API Contract document for an enterprise software project.
@@ -120,5 +126,17 @@ Before finalizing your response, verify:
 - Are external integrations from the PRD reflected in Section 5?
 - Does your response start with # API Contract with no preamble?
 
-""",
-)
+"""
+
+if os.getenv("API_CONTRACT_MODE") == "parallel":
+    root_agent = parallel_api_contract_agent(NAME, DESCRIPTION, INSTRUCTION)
+else:
+    root_agent = Agent(
+        name=NAME,
+        model="gemini-2.0-flash",
+        description=DESCRIPTION,
+        instruction=INSTRUCTION,
+        before_model_callback=select_guidelines,
+    )
+
+root_agent = routed(versioned(root_agent))
@@ -0,0 +1,194 @@
+"""Resource-parallel mode: the contract frame and every resource's endpoints in concurrent calls.
+
+Enabled with API_CONTRACT_MODE=parallel. The resources are the entities of
+the DATA MODEL (its Entity Overview table, or its entity definition headings).
+One call writes the frame of the contract (header, API overview,
+authentication endpoints, integration and async sections, error handling
+standards, design decisions) with Core Resource Endpoints left empty; at the
+same time one call per resource writes that resource's endpoint group from its
+entity definition and the PRD. The groups are spliced into Core Resource
+Endpoints in data model order. Without a data model the frame call writes the
+whole contract as in serial mode.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import content_text, replace_request_text, strip_outer_fence, user_text
+from sdlc_common.context import parse_context, render_context, section_map
+from sdlc_common.guidelines import select_guidelines
+from sdlc_common.markdown import fill_section, plain, select_blocks, split_blocks, table_with_column
+from sdlc_common.pipeline import FanOutAgent, StitchAgent
+
+RESOURCE_SOURCES = (
+    "TECHNOLOGY STACK",
+    "PRODUCT REQUIREMENTS DOCUMENT",
+    "CONFIRMED UI SCREENS",
+    "GLOBAL TECHNICAL GUIDELINES",
+    "CORPORATE TECHNICAL GUIDELINES",
+)
+# Sections that may follow Core Resource Endpoints, in document order.
+FOLLOWING_SECTIONS = ("Integration", "Async", "Error Handling", "Design Decisions")
+
+BASE_URL_RULE = (
+    "Use the base URL convention /api/v1 with plural, kebab-case resource paths unless the guidelines "
+    "mandate a different convention, in which case use that one."
+)
+
+FRAME_INSTRUCTION = f"""
+
+## Frame Pass
+
+The endpoints of the Core Resource Endpoints section are generated separately, one resource at a time.
+- Write every other section in order, and keep the Core Resource Endpoints H2 heading with nothing under it.
+- {BASE_URL_RULE} State this convention in the API Overview.
+- The Error Handling Standards apply to every resource endpoint; describe them completely.
+"""
+
+RESOURCE_INSTRUCTION = f"""
+
+## Your Resource
+
+You are writing ONE resource group of the Core Resource Endpoints section of an API Contract whose other
+sections are written separately. The message contains the RESOURCE you are responsible for, the parts of
+the DATA MODEL that mention it (its entity definition and relationships), and the OTHER RESOURCES that get
+their own groups.
+
+Return ONLY, with no preamble and no other section:
+- an H3 heading naming the resource group (the plural of the entity, for example Claims),
+- the H4 endpoint entries for this resource, following the structure below.
+
+Rules:
+- {BASE_URL_RULE}
+- Endpoints belong to the resource they return or modify; do not write endpoints of the OTHER RESOURCES.
+- Authentication endpoints (login, logout, token refresh, password reset) are written separately — leave them out.
+- Follow the error handling standards of the guidelines; list only the status codes in each Errors line.
+- If the PRD requires no endpoints for this resource (for example a join table or an internal audit log),
+  return nothing at all.
+
+"""
+
+
+@dataclass
+class Resource:
+    name: str
+    overview: dict = field(default_factory=dict)
+    definition: str = ""
+
+
+def data_model_resources(data_model: str) -> list[Resource]:
+    """The entities of a data model document, with their overview row and definition block."""
+    definitions = {
+        plain(block.title).lower(): block.text
+        for block in split_blocks(data_model)
+        if block.level >= 3 and "| Column" in block.text
+    }
+    rows = table_with_column(data_model, "Entity")
+    if not rows:
+        return [Resource(name, {}, text) for name, text in definitions.items()]
+    resources = []
+    for row in rows:
+        name = plain(row["Entity"])
+        if name:
+            overview = {key: value for key, value in row.items() if key != "Entity" and value}
+            resources.append(Resource(name, overview, definitions.get(name.lower(), "")))
+    return resources
+
+
+def contract_instructions(instruction: str) -> tuple[str, str]:
+    """The frame instruction and the per-resource instruction."""
+    start = instruction.index("## Document Structure")
+    end = instruction.index("## Guidelines Application")
+    shared = "\n".join(
+        line for line in (instruction[:start] + instruction[end:]).split("\n")
+        if "start with # API Contract" not in line
+    )
+    core = instruction.index("### 4. Core Resource Endpoints", start)
+    brief = instruction[core:instruction.index("### 5.", core)].strip()
+    return instruction + FRAME_INSTRUCTION, shared + RESOURCE_INSTRUCTION + brief + "\n"
+
+
+def parallel_api_contract_agent(name: str, description: str, instruction: str):
+    frame_instruction, resource_instruction = contract_instructions(instruction)
+
+    def resources_of(context: str) -> list[Resource]:
+        return data_model_resources(section_map(context).get("DATA MODEL", ""))
+
+    frame = LlmAgent(
+        name=f"{name}_frame",
+        model="gemini-2.0-flash",
+        description="Writes every API Contract section except the core resource endpoint groups.",
+        # Without resources to fan out to, the frame call writes the complete contract.
+        instruction=lambda ctx: frame_instruction if resources_of(content_text(ctx.user_content)) else instruction,
+        output_key="api_contract_frame",
+        before_model_callback=select_guidelines,
+    )
+
+    def resource_agent(index: int, resource: Resource) -> LlmAgent:
+        return LlmAgent(
+            name=f"{name}_resource_{index}",
+            model="gemini-2.0-flash",
+            description=f"Writes the {resource.name} endpoint group.",
+            instruction=lambda _: resource_instruction,
+            output_key=f"api_contract_resource_{index}",
+            before_model_callback=[_focus_on(resource), select_guidelines],
+        )
+
+    def assemble(state: dict, context: str) -> tuple[str, dict]:
+        document = strip_outer_fence(state.get("api_contract_frame") or "")
+        resources = resources_of(context)
+        if not resources:
+            return document, {}
+        groups = [
+            strip_outer_fence(state.get(f"api_contract_resource_{index}") or "") for index in range(len(resources))
+        ]
+        titles = [block.title.lower() for block in split_blocks(document)]
+        before = next((name for name in FOLLOWING_SECTIONS if any(name.lower() in title for title in titles)), None)
+        content = "\n\n".join(group for group in groups if group)
+        return fill_section(document, "Core Resource Endpoints", content, before=before), {}
+
+    return SequentialAgent(
+        name=name,
+        description=description,
+        sub_agents=[
+            ParallelAgent(
+                name=f"{name}_parts",
+                sub_agents=[
+                    frame,
+                    FanOutAgent(
+                        name=f"{name}_resources",
+                        items=lambda state, context: resources_of(context),
+                        make_agent=resource_agent,
+                    ),
+                ],
+            ),
+            StitchAgent(name=f"{name}_stitch", assemble=assemble),
+        ],
+    )
+
+
+def _focus_on(resource: Resource):
+    def focus(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        """before_model_callback: send the resource, its slice of the data model and the PRD context."""
+        context = user_text(callback_context)
+        others = [
+            other.name for other in data_model_resources(section_map(context).get("DATA MODEL", ""))
+            if other.name != resource.name
+        ]
+        details = "\n".join(f"{key}: {value}" for key, value in resource.overview.items())
+        mentions = re.compile(rf"\b{re.escape(resource.name)}\b")
+        data_model = select_blocks(section_map(context).get("DATA MODEL", ""), mentions, fallback=False)
+        sources = [part for part in parse_context(context) if part.name in RESOURCE_SOURCES]
+        replace_request_text(llm_request, (
+            f"RESOURCE\n{resource.name}\n{details}\n\n"
+            f"OTHER RESOURCES\n{', '.join(others) or 'None'}\n\n"
+            f"DATA MODEL\n{data_model or resource.definition}\n\n"
+            + render_context(sources)
+        ))
+        return None
+
+    return focus
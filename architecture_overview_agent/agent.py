@@ -1,10 +1,17 @@
+import os
+
 from google.adk.agents import Agent
 
-root_agent = Agent(
-    name="architecture_overview_agent",
-    model="gemini-2.0-flash",
-    description="Generates a Technical Architecture Overview document from a PRD, confirmed screens, tech preferences, and technical guidelines.",
-    instruction="""
+from sdlc_common.guidelines import select_guidelines
+from sdlc_common.mermaid import fix_mermaid_diagrams
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .parallel import parallel_architecture_overview_agent
+
+NAME = "architecture_overview_agent"
+DESCRIPTION = "Generates a Technical Architecture Overview document from a PRD, confirmed screens, tech preferences, and technical guidelines."
+INSTRUCTION = """
 CRITICAL: Generate output based ONLY on the context provided in this message. Do not use any information from previous sessions, prior conversations, or stored memory. Every section of your response must be derived exclusively from the input provided below.
 
 You are a senior software architect generating a Technical Architecture Overview document for an enterprise software project.
@@ -110,5 +117,18 @@ Before finalizing your response, verify:
 - Do Architecture Decisions reflect real choices made for this specific project?
 - Does your response start with # Architecture Overview with no preamble?
 
-""",
-)
+"""
+
+if os.getenv("ARCHITECTURE_OVERVIEW_MODE") == "parallel":
+    root_agent = parallel_architecture_overview_agent(NAME, DESCRIPTION, INSTRUCTION)
+else:
+    root_agent = Agent(
+        name=NAME,
+        model="gemini-2.0-flash",
+        description=DESCRIPTION,
+        instruction=INSTRUCTION,
+        before_model_callback=select_guidelines,
+        after_model_callback=fix_mermaid_diagrams,
+    )
+
+root_agent = routed(versioned(root_agent))
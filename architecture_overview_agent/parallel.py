@@ -0,0 +1,155 @@
+"""Section-parallel mode: the header is built locally, every other section in its own call.
+
+Enabled with ARCHITECTURE_OVERVIEW_MODE=parallel. The header block needs no
+model: the stack line comes straight from TECHNOLOGY STACK and the project
+name from PROJECT NAME or the PRD title. Sections 2 to 7 are independent of
+each other, so each is generated concurrently from the shared rules, its own
+brief and the context sections it draws on, then stitched in the mandated
+order.
+"""
+
+import re
+from dataclasses import dataclass
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import find_json_objects, replace_request_text, user_text
+from sdlc_common.context import parse_context, render_context, section_map
+from sdlc_common.guidelines import select_guidelines
+from sdlc_common.mermaid import fix_markdown
+from sdlc_common.pipeline import parallel_document_agent
+
+STACK_ORDER = ("frontend", "backend", "database", "deployment", "auth", "api")
+
+_BRIEF = re.compile(r"^### (\d)\. (.+?)\s*$", re.MULTILINE)
+_STACK_LINE = re.compile(r"^[\s*\-•]*(?P<key>[A-Za-z][A-Za-z /&]*?)\s*[:=]\s*(?P<value>\S.*?)\s*$", re.MULTILINE)
+_PRD_TITLE = re.compile(r"^#\s+(?:PRD|Product Requirements Document)?\s*[:\-—–]?\s*(?P<title>.+?)\s*$", re.MULTILINE)
+_TITLE_SUFFIX = re.compile(r"\s*[:\-—–]?\s*(?:PRD|Product Requirements Document)\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Section:
+    number: int
+    key: str
+    sources: tuple[str, ...]
+
+    @property
+    def output_key(self) -> str:
+        return f"architecture_{self.key}"
+
+
+SECTIONS = (
+    Section(2, "system_context", ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT", "CONFIRMED UI SCREENS")),
+    Section(3, "application_layers", ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT")),
+    Section(4, "key_integrations", ("PRODUCT REQUIREMENTS DOCUMENT",)),
+    Section(5, "security_architecture", ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT",
+                                         "GLOBAL TECHNICAL GUIDELINES", "CORPORATE TECHNICAL GUIDELINES")),
+    Section(6, "deployment_architecture", ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT",
+                                           "CORPORATE TECHNICAL GUIDELINES")),
+    Section(7, "architecture_decisions", ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT",
+                                          "GLOBAL TECHNICAL GUIDELINES", "CORPORATE TECHNICAL GUIDELINES")),
+)
+
+
+def technology_stack(text: str) -> list[str]:
+    """The frontend, backend, database, deployment, auth and API style selections, in that order."""
+    objects = find_json_objects(text)
+    pairs = (
+        [(str(key), str(value)) for key, value in objects[0].items()] if objects
+        else [(match.group("key"), match.group("value")) for match in _STACK_LINE.finditer(text)]
+    )
+    stack = []
+    for wanted in STACK_ORDER:
+        value = next((value for key, value in pairs if wanted in key.lower().replace(" ", "")), None)
+        if value and value not in stack:
+            stack.append(value)
+    return stack
+
+
+def project_name(sections: dict[str, str]) -> str | None:
+    if sections.get("PROJECT NAME"):
+        return sections["PROJECT NAME"].splitlines()[0].strip()
+    match = _PRD_TITLE.search(sections.get("PRODUCT REQUIREMENTS DOCUMENT", ""))
+    return _TITLE_SUFFIX.sub("", match.group("title")) if match else None
+
+
+def header_block(context: str) -> str:
+    sections = section_map(context)
+    lines = ["# Architecture Overview"]
+    name = project_name(sections)
+    if name:
+        lines.append(f"**Project:** {name}")
+    stack = technology_stack(sections.get("TECHNOLOGY STACK", ""))
+    if stack:
+        lines.append(f"**Stack:** {' · '.join(stack)}")
+    return "\n".join(lines)
+
+
+def section_instructions(instruction: str) -> tuple[str, dict[int, tuple[str, str]]]:
+    """Split the full instruction into its shared rules and the brief of each numbered section."""
+    start = instruction.index("## Document Structure")
+    end = instruction.index("## Guidelines Application")
+    # Rules about the document as a whole are replaced by the per-section output format.
+    shared = "\n".join(
+        line for line in (instruction[:start] + instruction[end:]).split("\n")
+        if "start with # Architecture Overview" not in line and "header show" not in line
+    )
+    briefs = {}
+    matches = list(_BRIEF.finditer(instruction, start, end))
+    for match, following in zip(matches, matches[1:] + [None]):
+        body = instruction[match.end():following.start() if following else end].strip()
+        briefs[int(match.group(1))] = (match.group(2), body)
+    return shared, briefs
+
+
+def part_instructions(instruction: str) -> dict[str, str]:
+    """The instruction of each section's call, by section key."""
+    shared, briefs = section_instructions(instruction)
+    return {
+        section.key: (
+            f"{shared}\n\n## Your Section\n\n"
+            f"Write ONLY the {briefs[section.number][0]} section described below, not the whole document. "
+            "Return the section content without its heading and without any other section.\n\n"
+            f"{briefs[section.number][1]}\n"
+        )
+        for section in SECTIONS
+    }
+
+
+def parallel_architecture_overview_agent(name: str, description: str, instruction: str):
+    _, briefs = section_instructions(instruction)
+    titles = {section.output_key: briefs[section.number][0] for section in SECTIONS}
+    instructions = part_instructions(instruction)
+    parts = [
+        LlmAgent(
+            name=f"{name}_{section.key}",
+            model="gemini-2.0-flash",
+            description=f"Writes the {titles[section.output_key]} section of the Architecture Overview.",
+            instruction=instructions[section.key],
+            output_key=section.output_key,
+            before_model_callback=[_focus_on(section), select_guidelines],
+        )
+        for section in SECTIONS
+    ]
+
+    def assemble(state: dict, context: str) -> tuple[str, dict]:
+        document = "\n\n".join([header_block(context)] + [
+            f"## {titles[section.output_key]}\n\n{(state.get(section.output_key) or '').strip()}"
+            for section in SECTIONS
+        ])
+        document, issues = fix_markdown(document)
+        return document, {"mermaid_issues": [issue.__dict__ for issue in issues if not issue.fixed]}
+
+    return parallel_document_agent(name, description, parts, assemble)
+
+
+def _focus_on(section: Section):
+    def focus(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        """before_model_callback: send only the context the section draws on."""
+        sources = [part for part in parse_context(user_text(callback_context)) if part.name in section.sources]
+        replace_request_text(llm_request, render_context(sources))
+        return None
+
+    return focus
@@ -1,10 +1,16 @@
+import os
+
 from google.adk.agents import Agent
 
-root_agent = Agent(
-    name="data_model_agent",
-    model="gemini-2.0-flash",
-    description="Generates a Technical Data Model document from a PRD, confirmed screens, tech preferences, architecture overview, and technical guidelines.",
-    instruction="""
+from sdlc_common.guidelines import select_guidelines
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .parallel import parallel_data_model_agent
+
+NAME = "data_model_agent"
+DESCRIPTION = "Generates a Technical Data Model document from a PRD, confirmed screens, tech preferences, architecture overview, and technical guidelines."
+INSTRUCTION = """
 CRITICAL: Generate output based ONLY on the context provided in this message. Do not use any information from previous sessions, prior conversations, or stored memory. Every section of your response must be derived exclusively from the input provided below.
 
 You are a senior data architect generating a Technical Data Model document for an enterprise software project.
@@ -101,5 +107,17 @@ Before finalizing your response, verify:
 - Are PII fields identified in the Data Security section?
 - Does your response start with # Data Model with no preamble?
 
-""",
-)
+"""
+
+if os.getenv("DATA_MODEL_MODE") == "parallel":
+    root_agent = parallel_data_model_agent(NAME, DESCRIPTION, INSTRUCTION)
+else:
+    root_agent = Agent(
+        name=NAME,
+        model="gemini-2.0-flash",
+        description=DESCRIPTION,
+        instruction=INSTRUCTION,
+        before_model_callback=select_guidelines,
+    )
+
+root_agent = routed(versioned(root_agent))
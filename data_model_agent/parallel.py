@@ -0,0 +1,143 @@
+"""Entity-parallel mode: an outline call, then one call per entity definition.
+
+Enabled with DATA_MODEL_MODE=parallel. The first call writes every section of
+the document except the per-entity tables: header, Entity Overview,
+Relationships, Indexes and Data Security & Compliance. The entity list is read
+from its Entity Overview table, and each entity's Column | Type | Constraints |
+Description table is generated concurrently with the outline as a reference,
+so foreign keys, indexes and PII columns line up. The definitions are then
+spliced in under Entity Definitions.
+"""
+
+from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import replace_request_text, strip_outer_fence, user_text
+from sdlc_common.context import parse_context, render_context
+from sdlc_common.guidelines import select_guidelines
+from sdlc_common.markdown import fill_section, plain, table_with_column
+from sdlc_common.pipeline import FanOutAgent, StitchAgent
+
+ENTITY_SOURCES = (
+    "TECHNOLOGY STACK",
+    "PRODUCT REQUIREMENTS DOCUMENT",
+    "CONFIRMED UI SCREENS",
+    "GLOBAL TECHNICAL GUIDELINES",
+    "CORPORATE TECHNICAL GUIDELINES",
+)
+
+OUTLINE_INSTRUCTION = """
+
+## Outline Pass
+
+This pass writes the document WITHOUT the per-entity tables, which are generated separately.
+- Write every section in order, including the Entity Definitions heading, but leave the Entity Definitions section empty.
+- The Entity Overview table must list every entity, one per row, with the exact entity name that will head its definition.
+- Relationships, Indexes and Data Security & Compliance must name columns following the conventions above
+  (id, <singular_table>_id foreign keys, snake_case), because the entity tables will be written to match them.
+"""
+
+ENTITY_INSTRUCTION = """
+
+## Your Entity
+
+You are writing ONE entity of a Data Model whose outline has already been written. The message contains the
+ENTITY you are responsible for and the DATA MODEL OUTLINE (header, entity overview, relationships, indexes and
+data security sections).
+
+Return ONLY, with no preamble:
+- a "### <Entity>" heading using the exact entity name,
+- its Markdown table with columns: Column | Type | Constraints | Description,
+- the 2-3 sentence paragraph describing the entity's purpose and business rules.
+
+The table must include every foreign key implied by the outline's Relationships, every column named for this
+entity in its Indexes and Data Security sections, and follow the entity definition conventions below.
+
+{brief}
+"""
+
+
+def outline_entities(outline: str) -> list[dict[str, str]]:
+    """The rows of the outline's Entity Overview table (the first table with an Entity column)."""
+    rows = table_with_column(outline, "Entity")
+    return [{"name": plain(row["Entity"]), **row} for row in rows if plain(row["Entity"])]
+
+
+def entity_definitions_brief(instruction: str) -> str:
+    start = instruction.index("### 3. Entity Definitions")
+    return instruction[start:instruction.index("### 4.", start)].strip()
+
+
+def data_model_instructions(instruction: str) -> tuple[str, str]:
+    """The outline instruction and the per-entity instruction."""
+    shared = instruction[:instruction.index("## Document Structure")] + instruction[
+        instruction.index("## Guidelines Application"):
+    ]
+    shared = "\n".join(line for line in shared.split("\n") if "start with # Data Model" not in line)
+    return instruction + OUTLINE_INSTRUCTION, shared + ENTITY_INSTRUCTION.replace(
+        "{brief}", entity_definitions_brief(instruction)
+    )
+
+
+def parallel_data_model_agent(name: str, description: str, instruction: str):
+    outline_instruction, entity_instruction = data_model_instructions(instruction)
+
+    outline = LlmAgent(
+        name=f"{name}_outline",
+        model="gemini-2.0-flash",
+        description="Writes the Data Model outline: header, entity overview, relationships, indexes and security.",
+        instruction=outline_instruction,
+        output_key="data_model_outline",
+        before_model_callback=select_guidelines,
+    )
+
+    def entity_agent(index: int, entity: dict) -> LlmAgent:
+        return LlmAgent(
+            name=f"{name}_entity_{index}",
+            model="gemini-2.0-flash",
+            description=f"Writes the {entity['name']} entity definition.",
+            instruction=lambda _: entity_instruction,
+            output_key=f"data_model_entity_{index}",
+            before_model_callback=[_focus_on(entity), select_guidelines],
+        )
+
+    def assemble(state: dict, context: str) -> tuple[str, dict]:
+        outline_text = strip_outer_fence(state.get("data_model_outline") or "")
+        count = len(outline_entities(outline_text))
+        definitions = [
+            strip_outer_fence(state.get(f"data_model_entity_{index}") or "") for index in range(count)
+        ]
+        content = "\n\n".join(text for text in definitions if text)
+        return fill_section(outline_text, "Entity Definitions", content, before="Relationships"), {}
+
+    return SequentialAgent(
+        name=name,
+        description=description,
+        sub_agents=[
+            outline,
+            FanOutAgent(
+                name=f"{name}_entities",
+                items=lambda state, context: outline_entities(strip_outer_fence(state.get("data_model_outline") or "")),
+                make_agent=entity_agent,
+            ),
+            StitchAgent(name=f"{name}_stitch", assemble=assemble),
+        ],
+    )
+
+
+def _focus_on(entity: dict):
+    def focus(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        """before_model_callback: send the entity, the outline and the context the tables draw on."""
+        sources = [part for part in parse_context(user_text(callback_context)) if part.name in ENTITY_SOURCES]
+        details = "\n".join(
+            f"{key}: {value}" for key, value in entity.items() if key not in ("name", "Entity") and value
+        )
+        replace_request_text(llm_request, (
+            f"ENTITY\n{entity['name']}\n{details}\n\n"
+            f"DATA MODEL OUTLINE\n{callback_context.state.get('data_model_outline', '')}\n\n"
+            + render_context(sources)
+        ))
+        return None
+
+    return focus
@@ -0,0 +1,349 @@
+"""Deterministic rendering of design system component examples.
+
+Every component example the frontend renders (buttons, alerts, badges, inputs,
+cards, tables, the collapsible sidebar and typography) is a mechanical function
+of the design tokens, so it is rendered here instead of being written by the
+model. The model only chooses the tokens and the domain-specific badge states.
+"""
+
+import html
+import json
+import re
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import load_json, replace_text, response_text
+
+BASE_COLORS = (
+    "primary", "secondary", "success", "warning", "error", "info",
+    "background", "foreground", "muted", "border", "card",
+)
+STATUS_VARIANTS = ("success", "warning", "error", "info")
+
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def css_name(token: str) -> str:
+    """primaryForeground -> primary-foreground, matching the var() names the screens use."""
+    return _CAMEL_BOUNDARY.sub("-", token).lower()
+
+
+def render_css_variables(tokens: dict) -> str:
+    """Render the :root custom property block for a designTokens object.
+
+    Token groups that are not objects (a list of colors, ``"spacing": "8px"``)
+    are skipped.
+    """
+    typography = _group(tokens, "typography")
+    groups = [
+        ("", _group(tokens, "colors")),
+        ("font-size-", _group(typography, "fontSize")),
+        ("font-weight-", _group(typography, "fontWeight")),
+        ("line-height-", _group(typography, "lineHeight")),
+        ("spacing-", _group(_group(tokens, "spacing"), "scale")),
+        ("radius-", _group(tokens, "borderRadius")),
+        ("shadow-", _group(tokens, "shadows")),
+    ]
+    lines = []
+    if typography.get("fontFamily"):
+        lines.append(f"  --font-family: {typography['fontFamily']};")
+    for prefix, values in groups:
+        lines.extend(f"  --{prefix}{css_name(key)}: {value};" for key, value in values.items())
+    return ":root {\n" + "\n".join(lines) + "\n}"
+
+
+def domain_states(tokens: dict, states: list | None = None) -> list[dict]:
+    """Badge states beyond the semantic colors, as {"token", "label"} pairs.
+
+    Uses the states the model listed, falling back to any extra color token
+    that has a matching foreground token.
+    """
+    colors = _group(tokens, "colors")
+    if states:
+        return [
+            {"token": state["token"], "label": state.get("label") or state["token"].title()}
+            for state in states
+            if isinstance(state, dict) and isinstance(state.get("token"), str) and state["token"] in colors
+        ]
+    return [
+        {"token": key, "label": _label(key)}
+        for key in colors
+        if key not in BASE_COLORS and not key.endswith("Foreground") and f"{key}Foreground" in colors
+    ]
+
+
+def render_components(tokens: dict, states: list[dict]) -> dict:
+    """Render every component spec in the shape the frontend expects."""
+    return {
+        "button": _button(),
+        "alert": _alert(),
+        "badge": _badge(states),
+        "input": _input(),
+        "card": _card(),
+        "table": _table(states),
+        "sidebar": _sidebar(),
+        "typography": _typography(tokens),
+    }
+
+
+def render_design_system(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: add the rendered components and :root block to the model's tokens."""
+    if llm_response.partial:
+        return None
+    payload = load_json(response_text(llm_response))
+    if not isinstance(payload, dict) or not isinstance(payload.get("designTokens"), dict):
+        return None
+    tokens = payload["designTokens"]
+    states = domain_states(tokens, payload.pop("domainStates", None))
+    result = {
+        "designTokens": tokens,
+        "components": render_components(tokens, states),
+        "cssVariables": render_css_variables(tokens),
+        **{key: value for key, value in payload.items() if key not in ("designTokens", "components")},
+    }
+    return replace_text(llm_response, json.dumps(result, indent=2, ensure_ascii=False))
+
+
+def _button() -> dict:
+    return {
+        "description": "Interactive button component with multiple variants",
+        "variants": ["primary", "secondary", "outline", "ghost", "destructive"],
+        "htmlExample": (
+            "<button type='button' class='btn btn-primary'>Primary</button>"
+            "<button type='button' class='btn btn-secondary'>Secondary</button>"
+            "<button type='button' class='btn btn-outline'>Outline</button>"
+            "<button type='button' class='btn btn-ghost'>Ghost</button>"
+            "<button type='button' class='btn btn-destructive'>Delete</button>"
+        ),
+        "cssExample": (
+            ".btn { display: inline-flex; align-items: center; justify-content: center; gap: var(--spacing-xs); "
+            "padding: var(--spacing-sm) var(--spacing-md); border: 1px solid transparent; border-radius: var(--radius-md); "
+            "font-family: var(--font-family); font-size: var(--font-size-sm); font-weight: var(--font-weight-medium); "
+            "line-height: var(--line-height-tight); cursor: pointer; transition: all 0.2s; } "
+            ".btn:focus-visible { outline: 2px solid var(--primary); outline-offset: 2px; } "
+            ".btn-primary { background: var(--primary); color: var(--primary-foreground); } "
+            ".btn-primary:hover { opacity: 0.9; } "
+            ".btn-secondary { background: var(--secondary); color: var(--secondary-foreground); } "
+            ".btn-outline { background: transparent; border-color: var(--border); color: var(--foreground); } "
+            ".btn-outline:hover { background: var(--muted); } "
+            ".btn-ghost { background: transparent; color: var(--foreground); } "
+            ".btn-ghost:hover { background: var(--muted); } "
+            ".btn-destructive { background: var(--error); color: var(--error-foreground); }"
+        ),
+    }
+
+
+def _alert() -> dict:
+    titles = {"success": "Success", "warning": "Warning", "error": "Error", "info": "Information"}
+    icons = {"success": "✓", "warning": "!", "error": "✕", "info": "i"}
+    return {
+        "description": "Alert/notification component for status messages",
+        "variants": list(STATUS_VARIANTS),
+        "htmlExample": "".join(
+            f"<div class='alert alert-{variant}' role='{'alert' if variant == 'error' else 'status'}'>"
+            f"<span class='alert-icon' aria-hidden='true'>{icons[variant]}</span>"
+            f"<div><strong>{titles[variant]}</strong><p>{titles[variant]} message for this workflow.</p></div></div>"
+            for variant in STATUS_VARIANTS
+        ),
+        "cssExample": (
+            ".alert { display: flex; gap: var(--spacing-sm); padding: var(--spacing-md); border-radius: var(--radius-md); "
+            "border: 1px solid; font-size: var(--font-size-sm); line-height: var(--line-height-normal); } "
+            ".alert p { margin: 0; } .alert-icon { font-weight: var(--font-weight-bold); } "
+            + " ".join(
+                f".alert-{variant} {{ background: var(--{variant}); color: var(--{variant}-foreground); "
+                f"border-color: var(--{variant}-foreground); }}"
+                for variant in STATUS_VARIANTS
+            )
+        ),
+    }
+
+
+def _badge(states: list[dict]) -> dict:
+    variants = [{"token": variant, "label": _label(variant)} for variant in STATUS_VARIANTS] + states
+    return {
+        "description": "Small status indicator badge",
+        "variants": ["default", *(variant["token"] for variant in variants)],
+        "htmlExample": "<span class='badge'>Default</span>" + "".join(
+            f"<span class='badge badge-{css_name(variant['token'])}'>{html.escape(variant['label'])}</span>"
+            for variant in variants
+        ),
+        "cssExample": (
+            ".badge { display: inline-flex; align-items: center; padding: 2px 8px; border-radius: var(--radius-full); "
+            "font-size: var(--font-size-xs); font-weight: var(--font-weight-medium); background: var(--muted); "
+            "color: var(--muted-foreground); } "
+            + " ".join(
+                f".badge-{css_name(variant['token'])} {{ background: var(--{css_name(variant['token'])}); "
+                f"color: var(--{css_name(variant['token'])}-foreground); }}"
+                for variant in variants
+            )
+        ),
+    }
+
+
+def _input() -> dict:
+    return {
+        "description": "Form input fields: text, textarea, select, checkbox and radio",
+        "variants": ["default", "error"],
+        "htmlExample": (
+            "<div class='input-group'><label class='label' for='example-email'>Email</label>"
+            "<input id='example-email' type='email' class='input' placeholder='name@example.com'></div>"
+            "<div class='input-group'><label class='label' for='example-id'>Member ID</label>"
+            "<input id='example-id' type='text' class='input input-error' aria-invalid='true' "
+            "aria-describedby='example-id-error'><p id='example-id-error' class='input-error-text'>"
+            "Member ID is required.</p></div>"
+            "<div class='input-group'><label class='label' for='example-notes'>Notes</label>"
+            "<textarea id='example-notes' class='input' rows='3'></textarea></div>"
+            "<div class='input-group'><label class='label' for='example-status'>Status</label>"
+            "<select id='example-status' class='input'><option>All</option><option>Active</option></select></div>"
+            "<label class='choice'><input type='checkbox' checked> Include inactive records</label>"
+            "<label class='choice'><input type='radio' name='example-scope' checked> This month</label>"
+        ),
+        "cssExample": (
+            ".input-group { display: flex; flex-direction: column; gap: var(--spacing-xs); margin-bottom: var(--spacing-md); } "
+            ".label { font-size: var(--font-size-sm); font-weight: var(--font-weight-medium); color: var(--foreground); } "
+            ".input { width: 100%; padding: var(--spacing-sm) var(--spacing-md); border: 1px solid var(--border); "
+            "border-radius: var(--radius-md); font-family: var(--font-family); font-size: var(--font-size-base); "
+            "background: var(--background); color: var(--foreground); box-sizing: border-box; } "
+            ".input:focus { outline: none; border-color: var(--primary); box-shadow: 0 0 0 2px var(--primary); } "
+            ".input-error { border-color: var(--error-foreground); } "
+            ".input-error-text { margin: 0; font-size: var(--font-size-xs); color: var(--error-foreground); } "
+            ".choice { display: inline-flex; align-items: center; gap: var(--spacing-xs); margin-right: var(--spacing-md); "
+            "font-size: var(--font-size-sm); color: var(--foreground); } "
+            ".choice input { accent-color: var(--primary); }"
+        ),
+    }
+
+
+def _card() -> dict:
+    return {
+        "description": "Content container card",
+        "variants": ["default"],
+        "htmlExample": (
+            "<section class='card'><div class='card-header'><h3 class='card-title'>Card Title</h3>"
+            "<p class='card-description'>Card description goes here</p></div>"
+            "<div class='card-body'><p>Card content</p></div>"
+            "<div class='card-footer'><button type='button' class='btn btn-primary'>Action</button></div></section>"
+        ),
+        "cssExample": (
+            ".card { background: var(--card); color: var(--card-foreground); border: 1px solid var(--border); "
+            "border-radius: var(--radius-lg); box-shadow: var(--shadow-sm); overflow: hidden; } "
+            ".card-header { padding: var(--spacing-lg); border-bottom: 1px solid var(--border); } "
+            ".card-title { margin: 0; font-size: var(--font-size-lg); font-weight: var(--font-weight-semibold); } "
+            ".card-description { margin: var(--spacing-xs) 0 0; font-size: var(--font-size-sm); color: var(--muted-foreground); } "
+            ".card-body { padding: var(--spacing-lg); } "
+            ".card-footer { padding: var(--spacing-md) var(--spacing-lg); border-top: 1px solid var(--border); background: var(--muted); }"
+        ),
+    }
+
+
+def _table(states: list[dict]) -> dict:
+    samples = [{"token": "success", "label": "Active"}, *states[:2], {"token": "warning", "label": "Pending"}]
+    rows = "".join(
+        f"<tr><td>Record {index}</td><td><span class='badge badge-{css_name(state['token'])}'>"
+        f"{html.escape(state['label'])}</span></td><td>2024-02-{19 - index:02d}</td></tr>"
+        for index, state in enumerate(samples[:3], start=1)
+    )
+    return {
+        "description": "Data table for list views",
+        "variants": ["default"],
+        "htmlExample": (
+            "<table class='table'><thead><tr><th scope='col'>Name</th><th scope='col'>Status</th>"
+            f"<th scope='col'>Date</th></tr></thead><tbody>{rows}</tbody></table>"
+        ),
+        "cssExample": (
+            ".table { width: 100%; border-collapse: collapse; font-size: var(--font-size-sm); color: var(--foreground); } "
+            ".table th { text-align: left; padding: var(--spacing-sm) var(--spacing-md); background: var(--muted); "
+            "color: var(--muted-foreground); font-weight: var(--font-weight-semibold); border-bottom: 1px solid var(--border); } "
+            ".table td { padding: var(--spacing-sm) var(--spacing-md); border-bottom: 1px solid var(--border); } "
+            ".table tbody tr:hover { background: var(--muted); }"
+        ),
+    }
+
+
+def _sidebar() -> dict:
+    items = (("⊞", "Dashboard", True), ("📋", "Projects", False), ("👤", "Users", False), ("⚙", "Settings", False))
+    return {
+        "description": (
+            "Collapsible left navigation sidebar. Expands to show icon + label (240px wide); collapses to "
+            "icon-only rail (56px wide). Toggle controlled by a collapse button at the bottom of the sidebar. "
+            "Uses CSS transition for smooth animation."
+        ),
+        "variants": ["expanded", "collapsed"],
+        "htmlExample": (
+            "<nav class='sidebar' id='sidebar' aria-label='Main navigation'><div class='sidebar-header'>"
+            "<span class='sidebar-logo'>⚡</span><span class='sidebar-app-name'>App Name</span></div>"
+            "<div class='sidebar-section'><p class='sidebar-section-label'>MAIN</p>"
+            + "".join(
+                (
+                    "<a class='sidebar-item active' href='#' aria-current='page'>"
+                    if active
+                    else "<a class='sidebar-item' href='#'>"
+                )
+                + f"<span class='sidebar-icon' aria-hidden='true'>{icon}</span><span class='sidebar-label'>{label}</span></a>"
+                for icon, label, active in items
+            )
+            + "</div><button class='sidebar-toggle' onclick=\"document.getElementById('sidebar').classList"
+            ".toggle('collapsed')\" aria-label='Toggle sidebar'>◀</button></nav>"
+        ),
+        "cssExample": (
+            ".sidebar { display: flex; flex-direction: column; width: 240px; min-height: 100vh; background: var(--foreground); "
+            "color: var(--background); transition: width 0.2s ease; overflow: hidden; flex-shrink: 0; } "
+            ".sidebar.collapsed { width: 56px; } "
+            ".sidebar-header { display: flex; align-items: center; gap: var(--spacing-sm); padding: var(--spacing-md); "
+            "height: 56px; border-bottom: 1px solid rgba(255,255,255,0.1); white-space: nowrap; box-sizing: border-box; } "
+            ".sidebar-logo { font-size: 20px; flex-shrink: 0; } "
+            ".sidebar-app-name { font-size: var(--font-size-sm); font-weight: var(--font-weight-semibold); overflow: hidden; "
+            "opacity: 1; transition: opacity 0.15s ease; } "
+            ".sidebar.collapsed .sidebar-app-name { opacity: 0; width: 0; } "
+            ".sidebar-section { flex: 1; padding: var(--spacing-sm) 0; } "
+            ".sidebar-section-label { margin: 0; padding: var(--spacing-sm) var(--spacing-md); font-size: var(--font-size-xs); "
+            "font-weight: var(--font-weight-semibold); opacity: 0.5; white-space: nowrap; overflow: hidden; "
+            "transition: opacity 0.15s ease; } "
+            ".sidebar.collapsed .sidebar-section-label { opacity: 0; } "
+            ".sidebar-item { display: flex; align-items: center; gap: var(--spacing-sm); padding: var(--spacing-sm) var(--spacing-md); "
+            "font-size: var(--font-size-sm); color: rgba(255,255,255,0.7); text-decoration: none; white-space: nowrap; "
+            "transition: background 0.15s ease, color 0.15s ease; cursor: pointer; } "
+            ".sidebar-item:hover { background: rgba(255,255,255,0.08); color: var(--background); } "
+            ".sidebar-item.active { background: var(--primary); color: var(--primary-foreground); } "
+            ".sidebar-icon { font-size: 16px; flex-shrink: 0; width: 24px; text-align: center; } "
+            ".sidebar-label { overflow: hidden; opacity: 1; transition: opacity 0.15s ease; } "
+            ".sidebar.collapsed .sidebar-label { opacity: 0; width: 0; } "
+            ".sidebar-toggle { display: flex; align-items: center; justify-content: center; margin: var(--spacing-sm); "
+            "padding: var(--spacing-sm); background: rgba(255,255,255,0.08); border: none; border-radius: var(--radius-md); "
+            "color: rgba(255,255,255,0.6); cursor: pointer; font-size: 12px; transition: background 0.15s ease, transform 0.2s ease; } "
+            ".sidebar.collapsed .sidebar-toggle { transform: rotate(180deg); } "
+            ".sidebar-toggle:hover { background: rgba(255,255,255,0.15); }"
+        ),
+    }
+
+
+def _typography(tokens: dict) -> dict:
+    family = _group(tokens, "typography").get("fontFamily", "sans-serif")
+    return {
+        "description": f"Typography scale and text styles set in {family}",
+        "variants": ["h1", "h2", "h3", "body", "small"],
+        "htmlExample": (
+            "<h1 class='heading-1'>Page Title</h1><h2 class='heading-2'>Section Header</h2>"
+            "<h3 class='heading-3'>Subsection Header</h3><p class='body-text'>Body text paragraph</p>"
+            "<p class='text-sm text-muted'>Small muted text</p>"
+        ),
+        "cssExample": (
+            ".heading-1, .heading-2, .heading-3, .body-text, .text-sm { font-family: var(--font-family); color: var(--foreground); } "
+            ".heading-1 { font-size: var(--font-size-3xl); font-weight: var(--font-weight-bold); line-height: var(--line-height-tight); } "
+            ".heading-2 { font-size: var(--font-size-2xl); font-weight: var(--font-weight-semibold); line-height: var(--line-height-tight); } "
+            ".heading-3 { font-size: var(--font-size-xl); font-weight: var(--font-weight-semibold); line-height: var(--line-height-tight); } "
+            ".body-text { font-size: var(--font-size-base); line-height: var(--line-height-normal); } "
+            ".text-sm { font-size: var(--font-size-sm); line-height: var(--line-height-normal); } "
+            ".text-muted { color: var(--muted-foreground); }"
+        ),
+    }
+
+
+def _group(tokens: dict, key: str) -> dict:
+    value = tokens.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+def _label(token: str) -> str:
+    return css_name(token).replace("-", " ").title()
@@ -0,0 +1,190 @@
+"""WCAG AA contrast verification and correction for design tokens.
+
+Every foreground/background pair in designTokens.colors is checked in one pass
+(relative luminance is computed once per distinct color). A failing foreground
+is moved along the lightness axis, keeping its hue and saturation, to the
+nearest value that reaches the required ratio. Pairs with a translucent color
+(#rgba or #rrggbbaa with alpha below ff) cannot be scored without knowing what
+shows through, so they are reported as unchecked instead.
+"""
+
+import colorsys
+import json
+import re
+from dataclasses import dataclass
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import load_json, replace_text, response_text
+
+AA_NORMAL_TEXT = 4.5
+EXTRA_PAIRS = (
+    ("foreground", "background"),
+    ("mutedForeground", "background"),
+    ("mutedForeground", "card"),
+    ("cardForeground", "background"),
+)
+
+_HEX = re.compile(r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$")
+_ALPHA_HEX = re.compile(r"^#(?:[0-9a-fA-F]{3}(?P<short>[0-9a-fA-F])|[0-9a-fA-F]{6}(?P<long>[0-9a-fA-F]{2}))$")
+
+
+@dataclass
+class ContrastCheck:
+    foreground: str
+    background: str
+    ratio: float
+
+
+@dataclass
+class ContrastCorrection:
+    token: str
+    backgrounds: list[str]
+    before: str
+    after: str
+    ratio_before: float
+    ratio_after: float
+
+
+def color_pairs(colors: dict) -> list[tuple[str, str]]:
+    """(foreground token, background token) pairs of opaque hex colors present in the color tokens."""
+    return [
+        pair for pair in _token_pairs(colors)
+        if all(_HEX.match(str(colors[token])) and not _translucent(colors[token]) for token in pair)
+    ]
+
+
+def translucent_pairs(colors: dict) -> list[tuple[str, str]]:
+    """Pairs where either color has an alpha channel below ff; their contrast depends on what is behind them."""
+    return [
+        pair for pair in _token_pairs(colors)
+        if any(_translucent(colors[token]) for token in pair)
+    ]
+
+
+def check_contrast(colors: dict) -> list[ContrastCheck]:
+    """Contrast ratio of every pair, computing each distinct color's luminance once."""
+    pairs = color_pairs(colors)
+    luminance = {value: relative_luminance(value) for pair in pairs for value in (colors[pair[0]], colors[pair[1]])}
+    return [
+        ContrastCheck(foreground, background, _ratio(luminance[colors[foreground]], luminance[colors[background]]))
+        for foreground, background in pairs
+    ]
+
+
+def correct_contrast(colors: dict, minimum: float = AA_NORMAL_TEXT) -> list[ContrastCorrection]:
+    """Fix failing pairs in place by adjusting the foreground token; returns what changed.
+
+    A foreground used on several backgrounds (mutedForeground on muted, card
+    and background) is corrected against all of them at once.
+    """
+    backgrounds, failing = {}, {}
+    for check in check_contrast(colors):
+        backgrounds.setdefault(check.foreground, []).append(check.background)
+        if check.ratio < minimum:
+            failing.setdefault(check.foreground, []).append(check.ratio)
+    corrections = []
+    for token, ratios in failing.items():
+        surfaces = [colors[background] for background in backgrounds[token]]
+        before = colors[token]
+        colors[token] = nearest_compliant(before, surfaces, minimum)
+        corrections.append(ContrastCorrection(
+            token, backgrounds[token], before, colors[token], round(min(ratios), 2),
+            round(min(contrast_ratio(colors[token], surface) for surface in surfaces), 2),
+        ))
+    return corrections
+
+
+def nearest_compliant(foreground: str, backgrounds: list[str], minimum: float = AA_NORMAL_TEXT) -> str:
+    """The color with the foreground's hue and saturation and the closest lightness compliant on every background."""
+    hue, lightness, saturation = colorsys.rgb_to_hls(*_rgb(foreground))
+    surfaces = [relative_luminance(background) for background in backgrounds]
+
+    def passes(value: float) -> bool:
+        candidate = _luminance(colorsys.hls_to_rgb(hue, value, saturation))
+        return all(_ratio(candidate, surface) >= minimum for surface in surfaces)
+
+    candidates = []
+    for bound in (0.0, 1.0):
+        if not passes(bound):
+            continue
+        near, far = lightness, bound
+        for _ in range(24):
+            middle = (near + far) / 2
+            near, far = (near, middle) if passes(middle) else (middle, far)
+        candidates.append(far)
+    if not candidates:
+        return max(("#000000", "#ffffff"), key=lambda color: min(contrast_ratio(color, b) for b in backgrounds))
+    best = min(candidates, key=lambda value: abs(value - lightness))
+    step = 0.002 if best > lightness else -0.002
+    result = _hex(colorsys.hls_to_rgb(hue, best, saturation))
+    while any(contrast_ratio(result, b) < minimum for b in backgrounds) and 0.0 <= best + step <= 1.0:
+        best += step
+        result = _hex(colorsys.hls_to_rgb(hue, best, saturation))
+    return result
+
+
+def contrast_ratio(first: str, second: str) -> float:
+    return _ratio(relative_luminance(first), relative_luminance(second))
+
+
+def relative_luminance(color: str) -> float:
+    return _luminance(_rgb(color))
+
+
+def enforce_contrast(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: correct failing color pairs before the response leaves the agent."""
+    if llm_response.partial:
+        return None
+    payload = load_json(response_text(llm_response))
+    tokens = payload.get("designTokens") if isinstance(payload, dict) else None
+    colors = tokens.get("colors") if isinstance(tokens, dict) else None
+    if not isinstance(colors, dict):
+        return None
+    corrections = correct_contrast(colors)
+    callback_context.state["contrast_corrections"] = [correction.__dict__ for correction in corrections]
+    callback_context.state["contrast_unchecked"] = [
+        {"foreground": foreground, "background": background, "reason": "translucent color"}
+        for foreground, background in translucent_pairs(colors)
+    ]
+    if not corrections:
+        return None
+    return replace_text(llm_response, json.dumps(payload, ensure_ascii=False))
+
+
+def _token_pairs(colors: dict) -> list[tuple[str, str]]:
+    pairs = [
+        (f"{key}Foreground", key)
+        for key in colors
+        if not key.endswith("Foreground") and f"{key}Foreground" in colors
+    ]
+    return pairs + [pair for pair in EXTRA_PAIRS if pair[0] in colors and pair[1] in colors and pair not in pairs]
+
+
+def _translucent(color) -> bool:
+    match = _ALPHA_HEX.match(str(color))
+    return bool(match) and (match.group("short") or match.group("long")).lower() not in ("f", "ff")
+
+
+def _ratio(first: float, second: float) -> float:
+    lighter, darker = max(first, second), min(first, second)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def _luminance(rgb: tuple[float, float, float]) -> float:
+    red, green, blue = (
+        channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4 for channel in rgb
+    )
+    return 0.2126 * red + 0.7152 * green + 0.0722 * blue
+
+
+def _rgb(color: str) -> tuple[float, float, float]:
+    digits = color.lstrip("#")
+    if len(digits) == 3:
+        digits = "".join(digit * 2 for digit in digits)
+    return tuple(int(digits[index:index + 2], 16) / 255 for index in (0, 2, 4))
+
+
+def _hex(rgb: tuple[float, float, float]) -> str:
+    return "#" + "".join(f"{round(min(max(channel, 0.0), 1.0) * 255):02x}" for channel in rgb)
@@ -0,0 +1,154 @@
+"""Design system cache keyed by template and domain profile.
+
+Projects in the same domain on the same template end up with nearly the same
+customized tokens. The cache fingerprints the template metadata and stores
+each generated design system with the domain profile of its PRD (domain
+keywords and workflow states). A request with the same profile is served from
+the cache; one with a close profile gets the cached system with tokens added
+for any workflow states it lacks. Enabled when SDLC_CACHE_DIR is set.
+"""
+
+import json
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.cache import fingerprint, named_cache
+from sdlc_common.callbacks import find_json_objects, load_json, response_text, text_response, user_text
+from sdlc_common.context import section_map
+
+from .components import domain_states, render_components, render_css_variables
+from .contrast import correct_contrast
+
+KEYWORD_COUNT = 25
+ADAPT_THRESHOLD = 0.6
+MAX_ENTRIES_PER_TEMPLATE = 20
+
+# Workflow states and the semantic color each one borrows when added to a cached system.
+WORKFLOW_STATES = {
+    "pending": "warning", "pending review": "warning", "pending approval": "warning", "on hold": "warning",
+    "in review": "info", "in progress": "info", "submitted": "info", "escalated": "warning",
+    "approved": "success", "verified": "success", "completed": "success", "resolved": "success",
+    "active": "success", "enrolled": "success", "published": "success", "shipped": "success",
+    "denied": "error", "rejected": "error", "failed": "error", "expired": "error", "overdue": "error",
+    "cancelled": "muted", "inactive": "muted", "draft": "muted", "archived": "muted",
+}
+STOPWORDS = frozenset("""
+    a about above after again all also an and any are as at be because been before being below between both but
+    by can could did do does doing down during each few for from further had has have having here how i if in
+    into is it its itself just may me more most must my no nor not now of off on once only or other our out over
+    own same should so some such than that the their them then there these they this those through to too under
+    until up very was we were what when where which while who whom why will with within without would you your
+    acceptance criteria criterion description epic epics given labels mvp priority scenario story stories
+    summary task tasks user users component frontend backend database testing design confirm pm
+    high medium low critical able want need needs view display show new use using based system
+""".split())
+
+_WORD = re.compile(r"[a-z][a-z-]{2,}")
+
+
+@dataclass
+class DomainProfile:
+    keywords: list[str]
+    states: list[str]
+
+    def similarity(self, other: "DomainProfile") -> float:
+        """Jaccard similarity of keywords, halved when the workflow states differ entirely."""
+        left, right = set(self.keywords), set(other.keywords)
+        score = len(left & right) / len(left | right) if left | right else 1.0
+        if self.states and other.states and not set(self.states) & set(other.states):
+            score /= 2
+        return score
+
+
+def domain_profile(prd: str) -> DomainProfile:
+    """Extract the domain keywords and workflow states of a PRD."""
+    text = prd.lower()
+    mentioned = {state for state in WORKFLOW_STATES if re.search(rf"\b{re.escape(state)}\b", text)}
+    states = sorted(state for state in mentioned if not any(state in other for other in mentioned - {state}))
+    excluded = STOPWORDS | {word for state in WORKFLOW_STATES for word in state.split()}
+    counts = Counter(word.strip("-") for word in _WORD.findall(text) if word.strip("-") not in excluded)
+    return DomainProfile(sorted(word for word, _ in counts.most_common(KEYWORD_COUNT)), states)
+
+
+def template_metadata(context: str) -> dict | None:
+    """The template metadata is the largest JSON object in the design system input."""
+    objects = find_json_objects(context)
+    return max(objects, key=lambda value: len(json.dumps(value)), default=None)
+
+
+def adapt_design_system(payload: dict, profile: DomainProfile) -> tuple[dict, list[str]]:
+    """Add color tokens for workflow states the cached system lacks and re-render its components."""
+    payload = json.loads(json.dumps(payload))
+    tokens = payload["designTokens"]
+    colors = tokens.setdefault("colors", {})
+    added = []
+    for state in profile.states:
+        token = _token_name(state)
+        semantic = WORKFLOW_STATES[state]
+        if token in colors or semantic not in colors or f"{semantic}Foreground" not in colors:
+            continue
+        colors[token], colors[f"{token}Foreground"] = colors[semantic], colors[f"{semantic}Foreground"]
+        added.append(token)
+    if added:
+        correct_contrast(colors)
+        payload["components"] = render_components(tokens, domain_states(tokens))
+        payload["cssVariables"] = render_css_variables(tokens)
+    return payload, added
+
+
+def serve_cached_design_system(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """before_model_callback: answer from the cache when the template and domain match."""
+    cache = named_cache("design_systems")
+    context = user_text(callback_context)
+    template = template_metadata(context)
+    if cache is None or template is None:
+        return None
+    key = fingerprint(template)
+    profile = domain_profile(section_map(context).get("PRODUCT REQUIREMENTS DOCUMENT", context))
+    lookup = {"key": key, "profile": asdict(profile), "result": None}
+    callback_context.state["design_system_cache"] = lookup
+
+    entries = (cache.get(key) or {}).get("entries", [])
+    scored = [(profile.similarity(DomainProfile(**entry["profile"])), entry) for entry in entries]
+    score, entry = max(scored, key=lambda item: item[0], default=(0.0, None))
+    if entry is None or score < ADAPT_THRESHOLD:
+        return None
+    if entry["profile"] == lookup["profile"]:
+        callback_context.state["design_system_cache"] = {**lookup, "result": "hit"}
+        return text_response(json.dumps(entry["payload"], indent=2, ensure_ascii=False))
+
+    payload, added = adapt_design_system(entry["payload"], profile)
+    if added:
+        payload["explanation"] = (
+            f"{payload.get('explanation', '').strip()} Reused the design system of a project on the same template "
+            f"in the same domain and added tokens for the {', '.join(added)} workflow states."
+        ).strip()
+    callback_context.state["design_system_cache"] = {**lookup, "result": "adapted"}
+    return text_response(json.dumps(payload, indent=2, ensure_ascii=False))
+
+
+def remember_design_system(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: store the finished design system under its template and profile."""
+    cache = named_cache("design_systems")
+    lookup = callback_context.state.get("design_system_cache")
+    if cache is None or not lookup or llm_response.partial:
+        return None
+    payload = load_json(response_text(llm_response))
+    if not isinstance(payload, dict) or "components" not in payload:
+        return None
+    entries = [
+        entry for entry in (cache.get(lookup["key"]) or {}).get("entries", [])
+        if entry["profile"] != lookup["profile"]
+    ]
+    entries.append({"profile": lookup["profile"], "payload": payload})
+    cache.put(lookup["key"], {"entries": entries[-MAX_ENTRIES_PER_TEMPLATE:]})
+    return None
+
+
+def _token_name(state: str) -> str:
+    first, *rest = state.split()
+    return first + "".join(word.title() for word in rest)
@@ -1,5 +1,9 @@
 from google.adk.agents import Agent
 
+from sdlc_common.prd_digest import use_prd_digest
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
 root_agent = Agent(
     name="gtm_feature_notes_agent",
     model="gemini-2.0-flash",
@@ -32,4 +36,7 @@ Your job is to produce comprehensive feature release notes that a user or custom
 - Each capability area should have 2-5 bullet points
 - Total document length: 300-600 words
 """,
+    before_model_callback=use_prd_digest,
 )
+
+root_agent = routed(versioned(root_agent))
@@ -1,5 +1,9 @@
 from google.adk.agents import Agent
 
+from sdlc_common.prd_digest import use_prd_digest
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
 root_agent = Agent(
     name="gtm_kpis_agent",
     model="gemini-2.0-flash",
@@ -44,4 +48,7 @@ A table showing: Metric name, How to measure it, Measurement frequency, Owner ro
 - Do not use generic metrics that could apply to any product without explaining their relevance to this one
 - If the product is B2B vs B2C, reflect that in metric choices and targets
 """,
+    before_model_callback=use_prd_digest,
 )
+
+root_agent = routed(versioned(root_agent))
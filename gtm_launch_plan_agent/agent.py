@@ -1,5 +1,9 @@
 from google.adk.agents import Agent
 
+from sdlc_common.prd_digest import use_prd_digest
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
 root_agent = Agent(
     name="gtm_launch_plan_agent",
     model="gemini-2.0-flash",
@@ -44,4 +48,7 @@ A table or bulleted list mapping stakeholder roles to their launch responsibilit
 - Timeline actions should be concrete and owned (e.g., "Marketing team publishes blog post announcing feature X")
 - Risks should be specific to this product's domain and user base
 """,
+    before_model_callback=use_prd_digest,
 )
+
+root_agent = routed(versioned(root_agent))
@@ -1,5 +1,10 @@
 from google.adk.agents import Agent
 
+from sdlc_common.prd_digest import use_prd_digest
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+from sdlc_common.variants import generate_variants
+
 root_agent = Agent(
     name="gtm_marketing_materials_agent",
     model="gemini-2.0-flash",
@@ -43,4 +48,7 @@ Provide 3 distinct email subject line options for a launch announcement.
 - Taglines, differentiators, and social copy must reference actual product capabilities from the PRD
 - Do not use placeholder text or generic phrases like "revolutionary solution" without substance
 """,
+    before_model_callback=[use_prd_digest, generate_variants],
 )
+
+root_agent = routed(versioned(root_agent))
@@ -1,5 +1,10 @@
 from google.adk.agents import Agent
 
+from sdlc_common.prd_digest import use_prd_digest
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+from sdlc_common.variants import generate_variants
+
 root_agent = Agent(
     name="gtm_press_release_agent",
     model="gemini-2.0-flash",
@@ -47,4 +52,7 @@ Write a professional internal email from a product leader to executives and key
 - The stakeholder email impact bullets must reference specific features or user outcomes from the PRD
 - Tone: press release is formal and journalistic; stakeholder email is professional but direct
 """,
+    before_model_callback=[use_prd_digest, generate_variants],
 )
+
+root_agent = routed(versioned(root_agent))
@@ -1,5 +1,12 @@
 from google.adk.agents import Agent
 
+from sdlc_common.callbacks import chain_after_model_callbacks
+from sdlc_common.consistency import record_consistency
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .coverage import fill_story_gaps
+
 root_agent = Agent(
     name="implementation_plan_agent",
     model="gemini-2.5-pro",
@@ -517,4 +524,7 @@ Before returning your JSON, mentally verify these four things:
    If any screen is missing a task, add one now before returning JSON. An API-only
    task does not satisfy this check — the screen needs a frontend component task.
 """,
+    after_model_callback=chain_after_model_callbacks(fill_story_gaps, record_consistency),
 )
+
+root_agent = routed(versioned(root_agent))
@@ -0,0 +1,208 @@
+"""Local PRD story coverage check with targeted gap filling for the implementation plan.
+
+Every STORY heading of the PRD is mapped to the plan tasks that cover it: a
+task covers a story when it cites the story number (in its references, title
+or description) or when its title and description contain most of the
+story's title words. Only the stories left uncovered go to a small follow-up
+call, which returns the missing tasks with the phase each belongs to; they are
+appended to those phases with fresh ids and the effort figures are updated.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import json_objects, json_strings, load_json, replace_text, response_text, user_text
+from sdlc_common.context import section_map
+from sdlc_common.llm import generate_text
+from sdlc_common.prd import Story, load_prd
+
+GAP_FILL_MODEL = "gemini-2.5-pro"
+TITLE_MATCH_THRESHOLD = 0.6
+EFFORT_LABELS = {"S": "Under 1 hour", "M": "1-3 hours", "L": "3-8 hours"}
+STOPWORDS = frozenset("""
+    a an and as at by for from in into of on or the to with without via user users view page screen
+    story epic task able can new based using
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+GAP_FILL_INSTRUCTION = """
+You are a senior technical lead completing an implementation plan that is missing tasks for some PRD stories.
+Return ONLY a JSON object of the form {"tasks": [...]}. Each task object has the fields phaseNumber (int, the
+existing phase it belongs in), storyNumber (string), title, effort ("S", "M" or "L"), description (2-4
+sentences), filesToCreate, filesToModify, references, acceptanceCriteria and dependsOn (existing task ids only).
+Write at least one task per missing story, following the technology stack and the file path conventions of the
+existing tasks. Place each task in the phase whose goal it serves, after the tasks it depends on.
+"""
+
+
+@dataclass
+class Coverage:
+    covered: dict[str, list[str]]  # story number -> task ids
+    uncovered: list[Story]
+
+
+def plan_tasks(plan: dict) -> list[dict]:
+    return [task for phase in json_objects(plan.get("phases")) for task in json_objects(phase.get("tasks"))]
+
+
+def check_coverage(stories: list[Story], plan: dict) -> Coverage:
+    tasks = plan_tasks(plan)
+    covered, uncovered = {}, []
+    for story in stories:
+        task_ids = [str(task.get("id") or "") for task in tasks if covers(task, story)]
+        if task_ids:
+            covered[story.number] = task_ids
+        else:
+            uncovered.append(story)
+    return Coverage(covered, uncovered)
+
+
+def covers(task: dict, story: Story) -> bool:
+    text = " ".join([
+        str(task.get("title") or ""), str(task.get("description") or ""), *json_strings(task.get("references")),
+    ])
+    if re.search(rf"\bstory\s*{re.escape(story.number)}(?![\d.]*\d)", text, re.IGNORECASE):
+        return True
+    wanted = _words(story.title) or _words(story.summary)
+    if not wanted:
+        return False
+    shared = wanted & _words(text)
+    return len(shared) / len(wanted) >= TITLE_MATCH_THRESHOLD and (len(shared) >= 2 or len(wanted) == 1)
+
+
+def splice_tasks(plan: dict, tasks: list[dict]) -> list[str]:
+    """Append generated tasks to their phases with fresh ids; returns the new ids."""
+    phases = json_objects(plan.get("phases"))
+    if not phases:
+        return []
+    numbered = {phase.get("phaseNumber"): phase for phase in phases if isinstance(phase.get("phaseNumber"), (int, str))}
+    known = {str(task.get("id") or "") for task in plan_tasks(plan)}
+    added = []
+    for task in tasks:
+        number = task.pop("phaseNumber", None)
+        phase = (numbered.get(number) if isinstance(number, (int, str)) else None) or phases[-1]
+        phase_number = phase.get("phaseNumber")
+        if phase_number is None:
+            phase_number = phases.index(phase) + 1
+        story = task.pop("storyNumber", None)
+        if not isinstance(phase.get("tasks"), list):
+            phase["tasks"] = []
+        # Plans with gaps or hand-edited ids can already use the next sequential id.
+        position = len(json_objects(phase["tasks"])) + 1
+        while f"phase-{phase_number}-task-{position}" in known:
+            position += 1
+        task_id = f"phase-{phase_number}-task-{position}"
+        effort = task.get("effort") if isinstance(task.get("effort"), str) and task["effort"] in EFFORT_LABELS else "M"
+        references = json_strings(task.get("references"))
+        if story and not any(f"Story {story}" in reference for reference in references):
+            references.append(f"PRD → Story {story}")
+        dependencies = [dependency for dependency in json_strings(task.get("dependsOn")) if dependency in known]
+        phase["tasks"].append({
+            "id": task_id,
+            "taskNumber": f"{phase_number}.{position}",
+            "title": str(task.get("title") or ""),
+            "effort": effort,
+            "effortLabel": EFFORT_LABELS[effort],
+            "description": str(task.get("description") or ""),
+            "filesToCreate": json_strings(task.get("filesToCreate")),
+            "filesToModify": json_strings(task.get("filesToModify")),
+            "references": references,
+            "acceptanceCriteria": json_strings(task.get("acceptanceCriteria")),
+            "dependsOn": dependencies,
+            "blocks": [],
+        })
+        for other in plan_tasks(plan):
+            if other.get("id") in dependencies:
+                if not isinstance(other.get("blocks"), list):
+                    other["blocks"] = []
+                other["blocks"].append(task_id)
+        known.add(task_id)
+        added.append(task_id)
+    _update_effort(plan)
+    return added
+
+
+async def fill_story_gaps(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: generate tasks for the PRD stories the plan does not cover."""
+    if llm_response.partial:
+        return None
+    plan = load_json(response_text(llm_response))
+    sections = section_map(user_text(callback_context))
+    stories = load_prd(sections.get("PRODUCT REQUIREMENTS DOCUMENT", "")).stories
+    if not isinstance(plan, dict) or not stories:
+        return None
+    coverage = check_coverage(stories, plan)
+    report = {"stories": len(stories), "uncovered": [story.number for story in coverage.uncovered], "added": []}
+    callback_context.state["story_coverage"] = report
+    if not coverage.uncovered:
+        return None
+
+    try:
+        answer = await generate_text(
+            GAP_FILL_MODEL, _gap_prompt(coverage.uncovered, plan, sections), GAP_FILL_INSTRUCTION, json_output=True
+        )
+    except Exception as error:  # the plan is still usable without the extra tasks
+        callback_context.state["story_coverage"] = {**report, "error": str(error)}
+        return None
+    generated = load_json(answer)
+    tasks = generated.get("tasks") if isinstance(generated, dict) else None
+    added = splice_tasks(plan, json_objects(tasks))
+    remaining = check_coverage(coverage.uncovered, plan).uncovered
+    callback_context.state["story_coverage"] = {
+        **report, "added": added, "uncovered": [story.number for story in remaining],
+    }
+    return replace_text(llm_response, json.dumps(plan, ensure_ascii=False)) if added else None
+
+
+def _gap_prompt(stories: list[Story], plan: dict, sections: dict[str, str]) -> str:
+    phases = [
+        {
+            "phaseNumber": phase.get("phaseNumber"),
+            "title": phase.get("title"),
+            "goal": phase.get("goal"),
+            "tasks": [
+                {key: task.get(key) for key in ("id", "title", "filesToCreate")}
+                for task in json_objects(phase.get("tasks"))
+            ],
+        }
+        for phase in json_objects(plan.get("phases"))
+    ]
+    missing = "\n\n".join(
+        f"### STORY {story.number}: {story.title} (Epic {story.epic})\n{story.body}" for story in stories
+    )
+    return (
+        f"TECHNOLOGY STACK\n{sections.get('TECHNOLOGY STACK', '')}\n\n"
+        f"EXISTING PHASES AND TASKS\n{json.dumps(phases, ensure_ascii=False)}\n\n"
+        f"PRD STORIES WITHOUT TASKS\n{missing}\n"
+    )
+
+
+def _update_effort(plan: dict) -> None:
+    summary_phases, totals = [], {"S": 0, "M": 0, "L": 0}
+    for phase in json_objects(plan.get("phases")):
+        phase_tasks = json_objects(phase.get("tasks"))
+        counts = {size: sum(task.get("effort") == size for task in phase_tasks) for size in totals}
+        tasks = len(phase_tasks)
+        phase["effortLabel"] = f"{tasks} tasks ({counts['S']}S · {counts['M']}M · {counts['L']}L)"
+        summary_phases.append({
+            "phaseName": f"Phase {phase.get('phaseNumber')}: {phase.get('title') or ''}",
+            "tasks": tasks, "small": counts["S"], "medium": counts["M"], "large": counts["L"],
+        })
+        for size in totals:
+            totals[size] += counts[size]
+    plan["effortSummary"] = {
+        "phases": summary_phases,
+        "totalTasks": sum(phase["tasks"] for phase in summary_phases),
+        "totalSmall": totals["S"],
+        "totalMedium": totals["M"],
+        "totalLarge": totals["L"],
+    }
+
+
+def _words(text: str) -> set[str]:
+    return {word for word in _WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 2}
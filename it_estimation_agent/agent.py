@@ -1,5 +1,8 @@
 from google.adk.agents import Agent
 
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
 root_agent = Agent(
     name="it_estimation_agent",
     model="gemini-2.0-flash",
@@ -193,3 +196,5 @@ Check these before outputting JSON:
 - Is the first character { and the last character }?
 """,
 )
+
+root_agent = routed(versioned(root_agent))
@@ -1,10 +1,16 @@
+import os
+
 from google.adk.agents import Agent
 
-root_agent = Agent(
-    name="prd_generation_agent",
-    model="gemini-2.0-flash",
-    description="Generates PRDs from uploaded project documents.",
-    instruction="""
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .lint import lint_prd
+from .mapreduce import mapreduce_prd_agent
+
+NAME = "prd_generation_agent"
+DESCRIPTION = "Generates PRDs from uploaded project documents."
+INSTRUCTION = """
 You are a senior Product Manager with expert business analyst skills. You transform raw input (meeting transcripts, notes, documents) into a structured Product Requirements Document (PRD) that an enterprise software engineering team can execute from.
 
 RULES:
@@ -148,5 +154,17 @@ NESTING RULES:
 
 Begin the PRD with the Executive Summary, then generate all Epics with their nested Stories and Tasks.
 
-""",
-)
+"""
+
+if os.getenv("PRD_GENERATION_MODE") == "mapreduce":
+    root_agent = mapreduce_prd_agent(NAME, DESCRIPTION, INSTRUCTION)
+else:
+    root_agent = Agent(
+        name=NAME,
+        model="gemini-2.0-flash",
+        description=DESCRIPTION,
+        instruction=INSTRUCTION,
+        after_model_callback=lint_prd,
+    )
+
+root_agent = routed(versioned(root_agent))
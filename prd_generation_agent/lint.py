@@ -0,0 +1,190 @@
+"""Local lint of a generated PRD, with batched repair of its Jira summaries.
+
+Checks the rules a Jira import depends on: every Epic, Story and Task has a
+Summary of at most 80 characters, headings sit at their hierarchy level
+(## Epic, ### Story, #### Task) with numbers nested under their parent, every
+Story has Given/When/Then, Acceptance Criteria and at least one Task, and every
+Task names its Component. As an after_model_callback, missing and over-long
+summaries are rewritten by one small call covering only those items (falling
+back to a local cut at a word boundary), and the remaining issues are recorded
+in session state.
+
+    python -m prd_generation_agent.lint PRD.md [--json]
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import load_json, replace_text, response_text
+from sdlc_common.llm import generate_text
+from sdlc_common.prd import Epic, Node, Prd, Story, Task, parse_prd
+
+MAX_SUMMARY = 80
+REPAIR_MODEL = "gemini-2.0-flash"
+HEADING_LEVELS = {"epic": 2, "story": 3, "task": 4}
+SUMMARY_RULES = ("missing_summary", "summary_too_long")
+
+_SUMMARY_LINE = re.compile(r"^\*\*Summary:?\*\*:?")
+
+REPAIR_INSTRUCTION = f"""
+You write Jira issue summaries for items of a Product Requirements Document.
+For each item you receive, write a standalone summary of at most {MAX_SUMMARY} characters that keeps its
+specific subject (named systems, roles, data) and drops filler words. Do not end it with a period.
+Return ONLY a JSON object mapping each item number to its summary, for example {{"1.2": "Search members by ID"}}.
+"""
+
+
+@dataclass
+class LintIssue:
+    number: str
+    rule: str
+    message: str
+    line: int
+    fixed: bool = False
+
+
+def lint(prd: Prd) -> list[LintIssue]:
+    """Every rule violation in a parsed PRD, in document order."""
+    issues = []
+    counts = Counter(node.number for node in [*prd.epics, *prd.stories, *prd.tasks])
+    for node in sorted([*prd.epics, *prd.stories, *prd.tasks], key=lambda node: node.line):
+        issues += _lint_node(node, counts)
+    return issues
+
+
+def apply_summaries(markdown: str, prd: Prd, summaries: dict[str, str]) -> str:
+    """Replace (or insert) the Summary line of each numbered item."""
+    lines = markdown.split("\n")
+    nodes = [node for node in [*prd.epics, *prd.stories, *prd.tasks] if node.number in summaries]
+    # Bottom-up, so insertions leave the line numbers of earlier headings valid.
+    for node in sorted(nodes, key=lambda node: node.line, reverse=True):
+        summary_line = f"**Summary:** {summaries[node.number]}"
+        position = node.line
+        while position < len(lines) and not lines[position].lstrip().startswith("#"):
+            if _SUMMARY_LINE.match(lines[position].strip()):
+                lines[position] = summary_line
+                break
+            position += 1
+        else:
+            if node.line < len(lines) and not lines[node.line].strip():
+                lines.insert(node.line + 1, summary_line)
+            else:
+                lines[node.line:node.line] = ["", summary_line]
+    return "\n".join(lines)
+
+
+async def repair_summaries(prd: Prd, numbers: list[str]) -> dict[str, str]:
+    """New summaries for the given items from one batched call, cut locally where it falls short."""
+    nodes = [prd.get(number) for number in numbers if prd.get(number)]
+    items = [
+        {"number": node.number, "type": node.kind, "title": node.title, "summary": node.summary,
+         "description": getattr(node, "description", "") or getattr(node, "scenario", "")}
+        for node in nodes
+    ]
+    answer = load_json(await generate_text(REPAIR_MODEL, json.dumps(items, ensure_ascii=False), REPAIR_INSTRUCTION,
+                                           json_output=True))
+    answer = answer if isinstance(answer, dict) else {}
+    summaries = {}
+    for node in nodes:
+        summary = " ".join(str(answer.get(node.number) or "").split())
+        summaries[node.number] = (
+            summary if 0 < len(summary) <= MAX_SUMMARY else shorten(node.summary or node.title)
+        )
+    return summaries
+
+
+def shorten(text: str, limit: int = MAX_SUMMARY) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    return text[:cut if cut > 0 else limit].rstrip(" ,;:-—")
+
+
+async def lint_prd(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: fix the response's Jira summaries and record the other lint issues."""
+    if llm_response.partial:
+        return None
+    text = response_text(llm_response)
+    prd = parse_prd(text)
+    if not prd.epics:
+        return None
+    issues = lint(prd)
+    numbers = list(dict.fromkeys(issue.number for issue in issues if issue.rule in SUMMARY_RULES))
+    fixed_text = text
+    if numbers:
+        try:
+            summaries = await repair_summaries(prd, numbers)
+        except Exception as error:  # a local cut still keeps the import working
+            callback_context.state["prd_lint_error"] = str(error)
+            summaries = {number: shorten(prd.get(number).summary or prd.get(number).title) for number in numbers}
+        summaries = {number: summary for number, summary in summaries.items() if summary}
+        fixed_text = apply_summaries(text, prd, summaries)
+        for issue in issues:
+            issue.fixed = issue.rule in SUMMARY_RULES and issue.number in summaries
+    callback_context.state["prd_lint"] = [asdict(issue) for issue in issues if not issue.fixed]
+    return replace_text(llm_response, fixed_text) if fixed_text != text else None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("prd", help="PRD markdown file")
+    parser.add_argument("--json", action="store_true", help="print issues as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.prd, encoding="utf-8") as file:
+        issues = lint(parse_prd(file.read()))
+    if args.json:
+        print(json.dumps([asdict(issue) for issue in issues], indent=2))
+    else:
+        for issue in issues:
+            print(f"line {issue.line}: {issue.number} {issue.rule} — {issue.message}")
+        print(f"{len(issues)} issue(s)" if issues else "No issues.")
+    return 1 if issues else 0
+
+
+def _lint_node(node: Node, counts: Counter) -> list[LintIssue]:
+    issues = []
+
+    def issue(rule: str, message: str) -> None:
+        issues.append(LintIssue(node.number, rule, message, node.line))
+
+    label = f"{node.kind.capitalize()} {node.number}"
+    if not node.level:
+        issue("missing_heading", f"{label} is implied by its children but has no heading")
+        return issues
+    if not node.summary:
+        issue("missing_summary", f"{label} has no Summary")
+    elif len(node.summary) > MAX_SUMMARY:
+        issue("summary_too_long", f"{label} Summary is {len(node.summary)} characters (max {MAX_SUMMARY})")
+    if node.level != HEADING_LEVELS[node.kind]:
+        issue("heading_level", f"{label} heading is H{node.level}, expected H{HEADING_LEVELS[node.kind]}")
+    if counts[node.number] > 1:
+        issue("duplicate_number", f"{label} is numbered more than once")
+    parent = node.epic if isinstance(node, Story) else node.story if isinstance(node, Task) else ""
+    if parent and not node.number.startswith(f"{parent}."):
+        issue("numbering", f"{label} is nested under {'Epic' if isinstance(node, Story) else 'Story'} {parent}")
+    if isinstance(node, Epic) and not node.stories:
+        issue("missing_stories", f"{label} has no Stories")
+    if isinstance(node, Story):
+        missing = [name.capitalize() for name in ("given", "when", "then") if not getattr(node, name)]
+        if missing:
+            issue("missing_scenario", f"{label} has no {'/'.join(missing)}")
+        if not node.acceptance_criteria:
+            issue("missing_acceptance_criteria", f"{label} has no Acceptance Criteria")
+        if not node.tasks:
+            issue("missing_tasks", f"{label} has no Tasks")
+    if isinstance(node, Task) and not node.component:
+        issue("missing_component", f"{label} has no Component")
+    return issues
+
+
+if __name__ == "__main__":
+    sys.exit(main())
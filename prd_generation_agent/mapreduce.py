@@ -0,0 +1,184 @@
+"""Map-reduce mode for transcripts too long to send in one call.
+
+Enabled with PRD_GENERATION_MODE=mapreduce. The input is cut into chunks of at
+most PRD_CHUNK_TOKENS estimated tokens (default 8000) at paragraph
+boundaries. One extraction call per chunk runs concurrently and returns the
+requirements, roles, named systems, metrics, data fields, edge cases and open
+questions it finds as JSON. The extracts are merged and deduplicated locally,
+and the PRD is generated from the merged extract with the usual instruction,
+so latency follows the largest chunk instead of the whole transcript. Input
+that fits in one chunk is sent to the PRD call unchanged.
+"""
+
+import os
+import re
+
+from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import content_text, find_json_objects, replace_request_text, user_text
+from sdlc_common.pipeline import FanOutAgent
+from sdlc_common.tokens import chunk_text
+
+from .lint import lint_prd
+
+DEFAULT_CHUNK_TOKENS = 8000
+
+# Extract keys, with the heading each gets in the merged extract sent to the PRD call.
+CATEGORIES = (
+    ("requirements", "REQUIREMENTS"),
+    ("roles", "USER ROLES AND AUDIENCES"),
+    ("systems", "NAMED SYSTEMS, INTEGRATIONS AND DATA SOURCES"),
+    ("metrics", "METRICS, THRESHOLDS AND SLAS"),
+    ("data_fields", "DATA FIELDS AND IDENTIFIERS"),
+    ("edge_cases", "EDGE CASES AND EXCEPTIONS"),
+    ("open_questions", "AMBIGUITIES TO CONFIRM WITH PM"),
+)
+# Short names are deduplicated by exact name; longer statements also by word containment.
+NAME_CATEGORIES = ("roles", "systems", "data_fields")
+
+EXTRACT_INSTRUCTION = """
+You are a senior business analyst reading ONE part of a long discovery transcript or set of meeting notes.
+Extract everything in this part that a Product Requirements Document would need. Other parts are read
+separately, so do not summarize the product as a whole and do not invent anything that is not in this part.
+
+Return ONLY a JSON object with these keys, each a list of short standalone strings:
+- "requirements": every capability, workflow step, report, screen or behaviour someone asks for
+- "roles": every user role, persona or reporting audience, with its specific need when stated
+- "systems": every named product, system, integration, tool or data source, by its exact name
+- "metrics": every number stated — response times, volumes, percentages, SLAs, thresholds, dates, phases
+- "data_fields": every data field or identifier users want to see or enter, one per entry
+- "edge_cases": every exception, edge case or failure scenario described
+- "open_questions": anything left undecided, contradicted or uncertain
+
+Rules:
+- Keep names, numbers and identifiers verbatim. "response time under 5 seconds" stays exactly that.
+- One item per entry; never merge "deductible remaining, out-of-pocket max" into "financial information".
+- Leave a list empty rather than padding it.
+"""
+
+REDUCE_INSTRUCTION = """
+
+INPUT NOTE:
+The raw transcript was too long to send in one message. You receive instead a structured EXTRACT of it,
+merged from every part of the transcript: requirements, roles, named systems, metrics, data fields, edge
+cases and open questions. Treat every item in it as source input — apply all the detail capture rules above
+to it exactly as you would to the transcript, and tag the open questions with: please confirm with PM.
+"""
+
+
+def chunk_budget() -> int:
+    return int(os.getenv("PRD_CHUNK_TOKENS") or DEFAULT_CHUNK_TOKENS)
+
+
+def transcript_chunks(text: str) -> list[str]:
+    """The chunks to extract from; empty when the input fits in one PRD call."""
+    chunks = chunk_text(text, chunk_budget())
+    return chunks if len(chunks) > 1 else []
+
+
+def merge_extracts(extracts: list[dict]) -> dict[str, list[str]]:
+    """Merge per-chunk extracts, keeping the first wording of each item in transcript order."""
+    merged = {}
+    for key, _ in CATEGORIES:
+        items = []
+        for extract in extracts:
+            values = extract.get(key)
+            if isinstance(values, list):
+                items.extend(" ".join(str(value).split()) for value in values if str(value).strip())
+        merged[key] = _dedupe(items, by_containment=key not in NAME_CATEGORIES)
+    return merged
+
+
+def render_extract(merged: dict[str, list[str]], chunk_count: int) -> str:
+    parts = [f"TRANSCRIPT EXTRACT (merged from {chunk_count} parts)"]
+    for key, heading in CATEGORIES:
+        items = merged.get(key) or []
+        parts.append(f"{heading}\n" + ("\n".join(f"- {item}" for item in items) or "- None stated"))
+    return "\n\n".join(parts) + "\n"
+
+
+def reduce_instruction(instruction: str) -> str:
+    """The instruction of the PRD call when it receives the merged extract."""
+    return instruction + REDUCE_INSTRUCTION
+
+
+def mapreduce_prd_agent(name: str, description: str, instruction: str) -> SequentialAgent:
+    def extract_agent(index: int, chunk: str) -> LlmAgent:
+        return LlmAgent(
+            name=f"{name}_extract_{index}",
+            model="gemini-2.0-flash",
+            description=f"Extracts PRD inputs from transcript part {index + 1}.",
+            instruction=EXTRACT_INSTRUCTION,
+            output_key=f"prd_extract_{index}",
+            before_model_callback=_send_chunk(chunk),
+        )
+
+    return SequentialAgent(
+        name=name,
+        description=description,
+        sub_agents=[
+            FanOutAgent(
+                name=f"{name}_extracts",
+                items=lambda state, context: transcript_chunks(context),
+                make_agent=extract_agent,
+            ),
+            LlmAgent(
+                name=f"{name}_reduce",
+                model="gemini-2.0-flash",
+                description=description,
+                instruction=lambda ctx: (
+                    reduce_instruction(instruction)
+                    if transcript_chunks(content_text(ctx.user_content)) else instruction
+                ),
+                before_model_callback=_send_extract,
+                after_model_callback=lint_prd,
+            ),
+        ],
+    )
+
+
+def _send_chunk(chunk: str):
+    def send(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        """before_model_callback: send only this part of the transcript."""
+        replace_request_text(llm_request, chunk)
+        return None
+
+    return send
+
+
+def _send_extract(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """before_model_callback: replace a long transcript with its merged extract."""
+    chunks = transcript_chunks(user_text(callback_context))
+    if not chunks:
+        return None
+    state = callback_context.state
+    extracts = [
+        objects[0]
+        for objects in (find_json_objects(state.get(f"prd_extract_{index}") or "") for index in range(len(chunks)))
+        if objects
+    ]
+    merged = merge_extracts(extracts)
+    state["prd_extract"] = merged
+    replace_request_text(llm_request, render_extract(merged, len(chunks)))
+    return None
+
+
+def _dedupe(items: list[str], by_containment: bool) -> list[str]:
+    kept: list[tuple[str, frozenset[str]]] = []
+    for item in items:
+        words = frozenset(re.findall(r"[a-z0-9]+", item.lower()))
+        if not words or any(words == other for _, other in kept):
+            continue
+        if by_containment:
+            # A statement whose words all appear in a kept one adds nothing; a fuller one replaces it.
+            if any(len(words) >= 3 and words <= other for _, other in kept):
+                continue
+            replaced = [index for index, (_, other) in enumerate(kept) if len(other) >= 3 and other < words]
+            if replaced:
+                kept[replaced[0]] = (item, words)
+                kept = [entry for index, entry in enumerate(kept) if index not in replaced[1:]]
+                continue
+        kept.append((item, words))
+    return [item for item, _ in kept]
@@ -1,5 +1,10 @@
 from google.adk.agents import Agent
 
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .screen_identity import stabilize_screen_ids
+
 root_agent = Agent(
     name="screen_extraction_agent",
     model="gemini-2.0-flash",
@@ -44,6 +49,10 @@ As a rule of thumb:
 
 If you exceed these ranges, re-evaluate whether you are creating screens for content sections, error states, or sub-features that belong inside other screens.
 
+## Re-extraction
+
+If a PREVIOUS SCREEN INVENTORY section appears in your input, it is the inventory from an earlier run on a prior version of the PRD. Reuse the same name, epicName, and screenType for screens that still exist so they can be matched to their existing prototypes, and only change a description when the PRD change actually affects that screen. Number ids sequentially as usual; they are reconciled with the previous inventory automatically.
+
 ## Screen Identification Rules
 - Each entry must represent a genuinely distinct UI view that a user navigates to independently
 - Include authentication screens (login, forgot password) if the PRD implies user authentication
@@ -107,4 +116,7 @@ Before finalizing your response, verify:
 Return only the JSON array.
 
 """,
+    after_model_callback=stabilize_screen_ids,
 )
+
+root_agent = routed(versioned(root_agent))
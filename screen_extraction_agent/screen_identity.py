@@ -0,0 +1,165 @@
+"""Stable screen identity across re-runs of the screen extraction agent.
+
+The agent numbers screens sequentially on every run, so the same screen can
+come back as screen-004 one day and screen-006 the next. Matching the new
+inventory against the previous one (by name, epic, screen type and
+description) lets the ids survive re-extraction, and the resulting plan tells
+the backend which prototypes actually need to be regenerated.
+
+The highest screen number ever issued is kept as ``screen_id_high_water`` in
+session state and reported as ``highWater`` in the plan, so a removed screen's
+id is not handed to a new screen on a later run. A backend that starts a new
+session per run presets the state from the last plan it stored.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import json_objects, load_json, replace_text, response_text, user_text
+from sdlc_common.context import section_map
+
+MATCH_THRESHOLD = 0.55
+MATERIAL_TEXT_THRESHOLD = 0.75
+MATERIAL_FIELDS = ("screenType", "complexity", "userRole")
+TEXT_FIELDS = ("name", "description", "notes")
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SCREEN_NUMBER = re.compile(r"^screen-(\d+)$")
+
+
+@dataclass
+class ScreenMatch:
+    screen: dict
+    previous: dict | None = None
+    score: float = 0.0
+    changed_fields: list[str] = field(default_factory=list)
+    material: bool = True
+
+    @property
+    def status(self) -> str:
+        if self.previous is None:
+            return "new"
+        return "changed" if self.material else "unchanged"
+
+
+@dataclass
+class RegenerationPlan:
+    screens: list[dict]
+    regenerate: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    high_water: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "regenerate": self.regenerate, "unchanged": self.unchanged, "removed": self.removed,
+            "highWater": self.high_water,
+        }
+
+
+def screen_similarity(previous: dict, current: dict) -> float:
+    """Weighted similarity in [0, 1] used to decide whether two entries are the same screen."""
+    score = 0.4 * _text_similarity(previous.get("name"), current.get("name"))
+    score += 0.3 * _text_similarity(previous.get("description"), current.get("description"))
+    score += 0.15 * _text_similarity(previous.get("epicName"), current.get("epicName"))
+    score += 0.15 * (previous.get("screenType") == current.get("screenType"))
+    return score
+
+
+def match_screens(previous: list[dict], current: list[dict]) -> list[ScreenMatch]:
+    """Pair each current screen with at most one previous screen, best matches first."""
+    candidates = sorted(
+        (
+            (screen_similarity(old, new), old_index, new_index)
+            for old_index, old in enumerate(previous)
+            for new_index, new in enumerate(current)
+        ),
+        reverse=True,
+    )
+    matches = [ScreenMatch(screen) for screen in current]
+    taken = set()
+    for score, old_index, new_index in candidates:
+        if score < MATCH_THRESHOLD:
+            break
+        if old_index in taken or matches[new_index].previous is not None:
+            continue
+        taken.add(old_index)
+        old = previous[old_index]
+        match = matches[new_index]
+        match.previous, match.score = old, score
+        match.changed_fields = [
+            key for key in (*TEXT_FIELDS, "epicName", *MATERIAL_FIELDS) if old.get(key) != match.screen.get(key)
+        ]
+        match.material = any(old.get(key) != match.screen.get(key) for key in MATERIAL_FIELDS) or any(
+            _text_similarity(old.get(key), match.screen.get(key)) < MATERIAL_TEXT_THRESHOLD for key in TEXT_FIELDS
+        )
+    return matches
+
+
+def plan_regeneration(previous: list[dict], current: list[dict], high_water: int = 0) -> RegenerationPlan:
+    """Carry previous ids over to matched screens and list the screens needing a new prototype.
+
+    Unmatched screens, and matched ones whose previous entry had no id, get
+    fresh ids numbered after ``high_water`` (the highest screen number issued
+    by earlier runs) or the highest id of the previous inventory, whichever is
+    greater. Without a high-water mark, the id of a screen removed from the end
+    of the previous inventory can be issued again. Entries of either list that
+    are not objects are dropped.
+    """
+    previous, current = json_objects(previous), json_objects(current)
+    matches = match_screens(previous, current)
+    next_number = max([high_water, *(_screen_number(screen.get("id")) for screen in previous)]) + 1
+    plan = RegenerationPlan(screens=[])
+    for match in matches:
+        screen = dict(match.screen)
+        carried = match.previous is not None and bool(match.previous.get("id"))
+        if carried:
+            screen["id"] = match.previous["id"]
+        else:
+            screen["id"] = f"screen-{next_number:03d}"
+            next_number += 1
+        plan.screens.append(screen)
+        if carried and match.status == "unchanged":
+            plan.unchanged.append(screen["id"])
+        else:
+            plan.regenerate.append(screen["id"])
+    matched = {match.previous.get("id") for match in matches if match.previous is not None}
+    plan.removed = [screen["id"] for screen in previous if screen.get("id") and screen["id"] not in matched]
+    plan.high_water = next_number - 1
+    return plan
+
+
+def stabilize_screen_ids(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: reuse ids from a PREVIOUS SCREEN INVENTORY section, if one was sent."""
+    if llm_response.partial:
+        return None
+    previous = load_json(section_map(user_text(callback_context)).get("PREVIOUS SCREEN INVENTORY", ""))
+    current = load_json(response_text(llm_response))
+    if not isinstance(current, list):
+        return None
+    high_water = callback_context.state.get("screen_id_high_water") or 0
+    if not isinstance(previous, list):
+        numbers = [_screen_number(screen.get("id")) for screen in json_objects(current)]
+        callback_context.state["screen_id_high_water"] = max([high_water, *numbers])
+        return None
+    plan = plan_regeneration(previous, current, high_water)
+    callback_context.state["screen_id_high_water"] = plan.high_water
+    callback_context.state["screen_regeneration"] = plan.to_dict()
+    return replace_text(llm_response, json.dumps(plan.screens, indent=2, ensure_ascii=False))
+
+
+def _text_similarity(left: str | None, right: str | None) -> float:
+    left_words, right_words = _WORD.findall(str(left or "").lower()), _WORD.findall(str(right or "").lower())
+    if not left_words and not right_words:
+        return 1.0
+    return SequenceMatcher(None, left_words, right_words, autojunk=False).ratio()
+
+
+def _screen_number(screen_id: str | None) -> int:
+    match = _SCREEN_NUMBER.match(str(screen_id or ""))
+    return int(match.group(1)) if match else 0
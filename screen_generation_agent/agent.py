@@ -1,5 +1,12 @@
 from google.adk.agents import Agent
 
+from sdlc_common.callbacks import chain_after_model_callbacks
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .archetypes import remember_archetype, use_archetype
+from .html_optimizer import optimize_screen_response
+
 root_agent = Agent(
     name="screen_generation_agent",
     model="gemini-2.0-flash",
@@ -267,4 +274,8 @@ Before returning your response, verify:
 You are a professional designer. Your prototype will be reviewed by stakeholders and used as a specification for developers. Make it pixel-perfect.
 
 """,
+    before_model_callback=use_archetype,
+    after_model_callback=chain_after_model_callbacks(optimize_screen_response, remember_archetype),
 )
+
+root_agent = routed(versioned(root_agent))
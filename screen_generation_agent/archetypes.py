@@ -0,0 +1,137 @@
+"""Reusable screen archetypes keyed by screen type, complexity and design system.
+
+Screens such as login, settings or a filtered list come out structurally the
+same whenever the design tokens are the same. Every generated screen is
+remembered under (screenType, complexity, auth flow, whether a COMPONENT
+STYLESHEET was provided, design token hash). The stored markup has already
+been through the HTML optimizer, which strips the component CSS a stylesheet
+supplies, so screens with and without a stylesheet never share an entry. A
+later screen with the same key gets that prototype's markup skeleton as a
+starting point, and auth screens of the same flow are reused outright with
+only their labels substituted, skipping the model call.
+"""
+
+import json
+import re
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from sdlc_common.cache import fingerprint, named_cache
+from sdlc_common.callbacks import find_json_objects, load_json, response_text, text_response, user_text
+from sdlc_common.context import section_map
+
+from .html_optimizer import stylesheet_classes
+
+AUTH_FLOWS = {
+    "password-reset": ("forgot", "reset", "recover"),
+    "registration": ("register", "registration", "sign up", "signup", "create account"),
+    "verification": ("verify", "verification", "mfa", "two-factor", "2fa", "one-time"),
+    "login": ("login", "log in", "sign in", "signin"),
+}
+
+_TEXT_NODE = re.compile(r"(<style\b.*?</style>)|>[^<]*[^<\s][^<]*<", re.DOTALL | re.IGNORECASE)
+_APP_NAME = re.compile(r"(?im)^\W*(?:application|app)\s+name\s*[:\-]\s*(.+?)\s*$")
+
+
+def screen_inputs(context: str) -> tuple[dict | None, dict | None]:
+    """Find the screen definition and the design system among the JSON objects in the input."""
+    screen = design_system = None
+    for value in find_json_objects(context):
+        if screen is None and "screenType" in value:
+            screen = value
+        elif design_system is None and "designTokens" in value:
+            design_system = value
+    return screen, design_system
+
+
+def archetype_key(screen: dict, design_system: dict, styled: bool) -> str:
+    """``styled`` is whether the request listed a COMPONENT STYLESHEET."""
+    flow = auth_flow(screen) if screen.get("screenType") == "auth" else None
+    tokens = design_system.get("designTokens")
+    return fingerprint(screen.get("screenType"), screen.get("complexity"), flow, styled, tokens)
+
+
+def auth_flow(screen: dict) -> str | None:
+    name = (screen.get("name") or "").lower()
+    for flow, keywords in AUTH_FLOWS.items():
+        if any(keyword in name for keyword in keywords):
+            return flow
+    return None
+
+
+def skeletonize(html: str) -> str:
+    """Keep the markup and class structure of a prototype, dropping its copy."""
+    return _TEXT_NODE.sub(lambda match: match.group(1) or ">…<", html)
+
+
+def substitute_labels(html: str, old: dict, new: dict) -> str:
+    for key in ("appName", "name"):
+        if old.get(key) and new.get(key) and old[key] != new[key]:
+            html = html.replace(old[key], new[key])
+    return html
+
+
+def use_archetype(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """before_model_callback: reuse a cached auth screen or attach a cached skeleton."""
+    cache = named_cache("screen_archetypes")
+    context = user_text(callback_context)
+    screen, design_system = screen_inputs(context)
+    # Cleared first, so a screen without inputs is never stored under the previous screen's key.
+    callback_context.state["screen_archetype_key"] = None
+    callback_context.state["screen_archetype"] = None
+    if cache is None or screen is None or design_system is None:
+        return None
+    key = archetype_key(screen, design_system, bool(stylesheet_classes(context)))
+    callback_context.state["screen_archetype_key"] = key
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    labels = _labels(screen, context)
+    if screen.get("screenType") == "auth" and auth_flow(screen) and auth_flow(screen) == entry.get("authFlow"):
+        callback_context.state["screen_archetype"] = "reused"
+        return text_response(json.dumps({
+            "htmlContent": substitute_labels(entry["htmlContent"], entry["labels"], labels),
+            "cssContent": entry["cssContent"],
+            "designNotes": f"Reused the {entry['authFlow']} archetype generated for this design system. "
+            "Only the screen and application labels were changed.",
+        }, ensure_ascii=False))
+
+    callback_context.state["screen_archetype"] = "skeleton"
+    llm_request.contents.append(types.Content(role="user", parts=[types.Part(text=(
+        "REFERENCE SKELETON\n"
+        f"A previously approved {screen.get('screenType')} screen of {screen.get('complexity')} complexity "
+        "built with this design system had the markup below. Use it as a structural starting point, "
+        "keep its layout and class names where they fit, and replace every … with content for this screen.\n\n"
+        + skeletonize(entry["htmlContent"])
+    ))]))
+    return None
+
+
+def remember_archetype(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: store the generated screen under its archetype key."""
+    cache = named_cache("screen_archetypes")
+    key = callback_context.state.get("screen_archetype_key")
+    if cache is None or key is None or llm_response.partial:
+        return None
+    payload = load_json(response_text(llm_response))
+    if not isinstance(payload, dict) or not isinstance(payload.get("htmlContent"), str):
+        return None
+    context = user_text(callback_context)
+    screen, _ = screen_inputs(context)
+    if screen is None:
+        return None
+    cache.put(key, {
+        "htmlContent": payload["htmlContent"],
+        "cssContent": payload.get("cssContent") or "",
+        "authFlow": auth_flow(screen) if screen.get("screenType") == "auth" else None,
+        "labels": _labels(screen, context),
+    })
+    return None
+
+
+def _labels(screen: dict, context: str) -> dict:
+    match = _APP_NAME.search(section_map(context).get("APPLICATION NAVIGATION STRUCTURE", ""))
+    return {"name": screen.get("name"), "appName": match.group(1) if match else None}
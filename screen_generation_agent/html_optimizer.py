@@ -0,0 +1,265 @@
+"""Post-generation cleanup of screen prototypes.
+
+The model does not always follow the COMPONENT STYLESHEET RULES: it redefines
+component classes the backend already injects and repeats the :root token
+block. This module removes those rules, flags class names that are neither in
+the stylesheet index nor defined by the page, and minifies the page-specific
+CSS so stored prototypes stay small.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import load_json, replace_text, response_text, user_text
+from sdlc_common.context import section_map
+
+_STYLE_BLOCK = re.compile(r"(<style\b[^>]*>)(.*?)(</style>)", re.DOTALL | re.IGNORECASE)
+_CLASS_ATTR = re.compile(r"""\bclass\s*=\s*(["'])(.*?)\1""", re.DOTALL | re.IGNORECASE)
+_CLASS_SELECTOR = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_CLASS_NAME = re.compile(r"(?<![\w.-])(-?[_a-zA-Z][\w-]*)")
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_ATTRIBUTE_SELECTOR = re.compile(r"\[[^\]]*\]")
+_WHITESPACE = re.compile(r"\s+")
+_SELECTOR_PUNCTUATION = re.compile(r"\s*([,>~+])\s*")
+_DECLARATION_PUNCTUATION = re.compile(r"\s*([:;,])\s*")
+
+
+@dataclass
+class Rule:
+    """A CSS statement. Block at-rules keep their parsed children in ``nested``."""
+
+    prelude: str
+    body: str | None
+    nested: list["Rule"] | None = None
+
+
+@dataclass
+class ScreenOptimization:
+    html: str
+    css: str
+    removed_rules: list[str] = field(default_factory=list)
+    unknown_classes: list[str] = field(default_factory=list)
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+def parse_css(css: str) -> list[Rule]:
+    """Parse a stylesheet into top-level rules. Tolerates the usual model slips."""
+    css = _COMMENT.sub("", css)
+    rules = []
+    position = 0
+    while position < len(css):
+        brace = _find_outside_strings(css, "{", position)
+        semicolon = _find_outside_strings(css, ";", position)
+        if brace == -1 or (semicolon != -1 and semicolon < brace):
+            end = len(css) if semicolon == -1 else semicolon
+            statement = css[position:end].strip()
+            if statement.startswith("@"):
+                rules.append(Rule(statement, None))
+            position = end + 1
+            continue
+        end = _matching_brace(css, brace)
+        prelude, body = css[position:brace].strip(), css[brace + 1:end]
+        if prelude.startswith("@") and "{" in body:
+            rules.append(Rule(prelude, None, parse_css(body)))
+        elif prelude:
+            rules.append(Rule(prelude, body))
+        position = end + 1
+    return rules
+
+
+def render_css(rules: list[Rule]) -> str:
+    """Serialize rules in minified form, dropping empty rules and blocks."""
+    output = []
+    for rule in rules:
+        if rule.nested is not None:
+            inner = render_css(rule.nested)
+            if inner:
+                output.append(f"{_squash(rule.prelude)}{{{inner}}}")
+        elif rule.body is None:
+            output.append(f"{_squash(rule.prelude)};")
+        else:
+            declarations = _minify_declarations(rule.body)
+            if declarations:
+                output.append(f"{_minify_selector(rule.prelude)}{{{declarations}}}")
+    return "".join(output)
+
+
+def minify_css(css: str) -> str:
+    return render_css(parse_css(css))
+
+
+def stylesheet_classes(context: str) -> set[str]:
+    """Read the class names listed in the COMPONENT STYLESHEET section of the input."""
+    body = section_map(context).get("COMPONENT STYLESHEET", "")
+    dotted = set(_CLASS_SELECTOR.findall(body))
+    return dotted or {name for name in _CLASS_NAME.findall(body) if "-" in name or name.islower()}
+
+
+def optimize_screen(html: str, css: str, known_classes: set[str]) -> ScreenOptimization:
+    """Strip component redefinitions and duplicate :root blocks, then minify.
+
+    With an empty ``known_classes`` (no stylesheet was provided) every component
+    rule is legitimate, so only duplicate :root blocks are merged.
+    """
+    result = ScreenOptimization(html, css, bytes_before=len(html.encode()) + len(css.encode()))
+    sheets = [parse_css(match.group(2)) for match in _STYLE_BLOCK.finditer(html)] + [parse_css(css)]
+
+    root_rule = None
+    for index, rules in enumerate(sheets):
+        kept = []
+        for rule in rules:
+            if rule.body is None or _selectors(rule.prelude) != [":root"]:
+                kept.append(rule)
+            elif known_classes:
+                result.removed_rules.append(":root")
+            elif root_rule is None:
+                root_rule = rule
+                kept.append(rule)
+            else:
+                root_rule.body = f"{root_rule.body};{rule.body}"
+                result.removed_rules.append(":root")
+        if known_classes:
+            kept = _strip_component_rules(kept, known_classes, result.removed_rules)
+        sheets[index] = kept
+    if root_rule is not None:
+        root_rule.body = _dedupe_declarations(root_rule.body)
+
+    rendered = iter([render_css(rules) for rules in sheets])
+    html = _STYLE_BLOCK.sub(lambda match: match.group(1) + next(rendered) + match.group(3), html)
+    html = re.sub(r"<style\b[^>]*>\s*</style>[ \t]*\n?", "", html, flags=re.IGNORECASE)
+    css = next(rendered)
+
+    if known_classes:
+        defined = set()
+        for match in _STYLE_BLOCK.finditer(html):
+            defined.update(_CLASS_SELECTOR.findall(_ATTRIBUTE_SELECTOR.sub("", match.group(2))))
+        defined.update(_CLASS_SELECTOR.findall(_ATTRIBUTE_SELECTOR.sub("", css)))
+        used = {name for match in _CLASS_ATTR.finditer(html) for name in match.group(2).split()}
+        result.unknown_classes = sorted(used - known_classes - defined)
+
+    result.html, result.css = html, css
+    result.bytes_after = len(html.encode()) + len(css.encode())
+    return result
+
+
+def optimize_screen_response(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> LlmResponse | None:
+    """after_model_callback: apply optimize_screen to the generated JSON payload."""
+    if llm_response.partial:
+        return None
+    payload = load_json(response_text(llm_response))
+    if not isinstance(payload, dict) or not isinstance(payload.get("htmlContent"), str):
+        return None
+    known_classes = stylesheet_classes(user_text(callback_context))
+    result = optimize_screen(payload["htmlContent"], payload.get("cssContent") or "", known_classes)
+    payload["htmlContent"], payload["cssContent"] = result.html, result.css
+    callback_context.state["screen_optimization"] = {
+        "removedRules": len(result.removed_rules),
+        "unknownClasses": result.unknown_classes,
+        "bytesBefore": result.bytes_before,
+        "bytesAfter": result.bytes_after,
+    }
+    return replace_text(llm_response, json.dumps(payload, ensure_ascii=False))
+
+
+def _strip_component_rules(rules: list[Rule], known_classes: set[str], removed: list[str]) -> list[Rule]:
+    kept = []
+    for rule in rules:
+        if rule.nested is not None:
+            rule.nested = _strip_component_rules(rule.nested, known_classes, removed)
+            kept.append(rule)
+            continue
+        if rule.body is None:
+            kept.append(rule)
+            continue
+        selectors = _selectors(rule.prelude)
+        own = [selector for selector in selectors if not _is_component_selector(selector, known_classes)]
+        removed.extend(selector for selector in selectors if selector not in own)
+        if own:
+            rule.prelude = ",".join(own)
+            kept.append(rule)
+    return kept
+
+
+def _is_component_selector(selector: str, known_classes: set[str]) -> bool:
+    """True when every class in the selector comes from the injected stylesheet."""
+    if "#" in selector:
+        return False
+    classes = _CLASS_SELECTOR.findall(_ATTRIBUTE_SELECTOR.sub("", selector))
+    return bool(classes) and all(name in known_classes for name in classes)
+
+
+def _selectors(prelude: str) -> list[str]:
+    selectors, depth, current = [], 0, []
+    for char in prelude:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        if char == "," and depth == 0:
+            selectors.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    selectors.append("".join(current).strip())
+    return [selector for selector in selectors if selector]
+
+
+def _dedupe_declarations(body: str) -> str:
+    """Keep the last value of each property, in first-seen order."""
+    declarations = {}
+    for declaration in body.split(";"):
+        name, _, value = declaration.partition(":")
+        if value.strip():
+            declarations[name.strip()] = value.strip()
+    return ";".join(f"{name}:{value}" for name, value in declarations.items())
+
+
+def _minify_selector(prelude: str) -> str:
+    return _SELECTOR_PUNCTUATION.sub(r"\1", _squash(prelude))
+
+
+def _minify_declarations(body: str) -> str:
+    return _DECLARATION_PUNCTUATION.sub(r"\1", _squash(body)).strip(";")
+
+
+def _squash(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _find_outside_strings(css: str, target: str, start: int) -> int:
+    quote = None
+    for index in range(start, len(css)):
+        char = css[index]
+        if quote:
+            if char == quote and css[index - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == target:
+            return index
+    return -1
+
+
+def _matching_brace(css: str, opening: int) -> int:
+    depth, quote = 0, None
+    for index in range(opening, len(css)):
+        char = css[index]
+        if quote:
+            if char == quote and css[index - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(css)
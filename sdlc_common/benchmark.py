@@ -0,0 +1,362 @@
+"""Compares models and prompt versions of one agent on a fixed corpus of inputs.
+
+Each corpus input is sent to every (prompt version, model) pair as a single
+model call, with the prompt's instruction as the system instruction. The
+agent's callbacks do not run, so the figures compare the model and the prompt
+alone. Every run records latency, input and output tokens, estimated cost,
+whether the output parses (as JSON, for agents whose instruction demands it)
+and the agent's structural checks:
+
+- implementation_plan_agent: PRD story coverage, dependency integrity (the share of dependsOn ids that exist) and
+  cross-artifact consistency findings
+- prd_generation_agent: lint issues
+- architecture_overview_agent, sequence_diagrams_agent: Mermaid issues
+
+A check that fails on a malformed answer is recorded on that run (Check errors)
+instead of ending the benchmark.
+
+The corpus is a directory of project inputs (*.txt, *.md), each holding the
+full message the agent receives. Backends:
+
+- ``live`` calls Gemini; with --record DIR every response is saved.
+- ``recorded`` replays the responses saved with --record, so a report can be
+  rebuilt or re-scored without any model call.
+- ``local`` sends every call to an OpenAI-compatible chat endpoint (Ollama,
+  llama.cpp, vLLM) standing in for the model.
+
+    python -m sdlc_common.benchmark implementation_plan_agent corpus/ --models gemini-2.0-flash gemini-2.5-pro \\
+        --prompts live=implementation_plan_agent/agent.py archive=implementation_plan_agent/archive/agent.py \\
+        --record runs/
+    python -m sdlc_common.benchmark implementation_plan_agent corpus/ --backend recorded --recordings runs/ --json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from google.genai import types
+
+from implementation_plan_agent.coverage import check_coverage, plan_tasks
+from prd_generation_agent.lint import lint
+from sdlc_common.cache import JsonCache, fingerprint
+from sdlc_common.callbacks import load_json, strip_outer_fence
+from sdlc_common.consistency import check_context
+from sdlc_common.context import section_map
+from sdlc_common.llm import client
+from sdlc_common.mermaid import validate_markdown
+from sdlc_common.prd import load_prd
+from sdlc_common.prompts import AgentPrompt, PromptError, expects_json, load_prompt
+from sdlc_common.tokens import estimate_tokens
+
+# USD per million input / output tokens (list prices; thinking tokens bill as output).
+PRICES = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+CORPUS_SUFFIXES = (".txt", ".md")
+RECORDING_VERSION = 1
+
+
+class BenchmarkError(RuntimeError):
+    pass
+
+
+@dataclass
+class Response:
+    text: str
+    input_tokens: int
+    output_tokens: int
+    seconds: float
+
+
+@dataclass
+class Run:
+    case: str
+    prompt: str
+    model: str
+    status: str  # "ok" or "error"
+    error: str = ""  # on an "ok" run, the structural check that failed on the answer
+    seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float | None = None
+    parsed: bool = False
+    checks: dict[str, float] = field(default_factory=dict)
+
+
+class LiveBackend:
+    def __init__(self, recordings: JsonCache | None = None):
+        self.recordings = recordings
+
+    async def generate(self, model: str, instruction: str, message: str) -> Response:
+        config = types.GenerateContentConfig(system_instruction=instruction)
+        started = time.monotonic()
+        result = await client().aio.models.generate_content(model=model, contents=message, config=config)
+        seconds = time.monotonic() - started
+        usage = result.usage_metadata
+        text = result.text or ""
+        response = Response(
+            text,
+            usage.prompt_token_count if usage and usage.prompt_token_count else estimate_tokens(instruction + message),
+            (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0) if usage else estimate_tokens(text),
+            seconds,
+        )
+        if self.recordings:
+            self.recordings.put(recording_key(model, instruction, message), {"model": model, **asdict(response)})
+        return response
+
+
+class RecordedBackend:
+    def __init__(self, directory: str | Path):
+        self.recordings = JsonCache(directory)
+
+    async def generate(self, model: str, instruction: str, message: str) -> Response:
+        recorded = self.recordings.get(recording_key(model, instruction, message))
+        if not recorded:
+            raise BenchmarkError(f"no recorded response for {model} with this prompt and input")
+        return Response(recorded["text"], recorded["input_tokens"], recorded["output_tokens"], recorded["seconds"])
+
+
+class LocalBackend:
+    """An OpenAI-compatible /chat/completions endpoint standing in for the Gemini models."""
+
+    def __init__(self, base_url: str, model: str | None = None, timeout: float = 600):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.timeout = timeout
+
+    async def generate(self, model: str, instruction: str, message: str) -> Response:
+        return await asyncio.to_thread(self._post, self.model or model, instruction, message)
+
+    def _post(self, model: str, instruction: str, message: str) -> Response:
+        payload = {"model": model, "messages": [
+            {"role": "system", "content": instruction}, {"role": "user", "content": message},
+        ]}
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        started = time.monotonic()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                answer = json.loads(response.read())
+        except (urllib.error.URLError, ValueError) as error:
+            raise BenchmarkError(f"local model call failed: {error}") from error
+        seconds = time.monotonic() - started
+        text = answer["choices"][0]["message"].get("content") or ""
+        usage = answer.get("usage") or {}
+        return Response(
+            text,
+            usage.get("prompt_tokens") or estimate_tokens(instruction + message),
+            usage.get("completion_tokens") or estimate_tokens(text),
+            seconds,
+        )
+
+
+def recording_key(model: str, instruction: str, message: str) -> str:
+    return fingerprint(RECORDING_VERSION, model, instruction, message)
+
+
+def load_corpus(directory: str | Path) -> dict[str, str]:
+    """The corpus inputs keyed by file name, in name order."""
+    paths = sorted(path for path in Path(directory).iterdir() if path.suffix in CORPUS_SUFFIXES)
+    if not paths:
+        raise BenchmarkError(f"no {' or '.join(CORPUS_SUFFIXES)} inputs in {directory}")
+    return {path.name: path.read_text(encoding="utf-8") for path in paths}
+
+
+def cost(model: str, input_tokens: int, output_tokens: int) -> float | None:
+    if model not in PRICES:
+        return None
+    input_price, output_price = PRICES[model]
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def plan_checks(message: str, text: str) -> dict[str, float]:
+    plan = load_json(text)
+    if not isinstance(plan, dict):
+        return {}
+    checks = {"consistency_findings": len(check_context(message, plan))}
+    stories = load_prd(section_map(message).get("PRODUCT REQUIREMENTS DOCUMENT", "")).stories
+    if stories:
+        checks["story_coverage"] = len(check_coverage(stories, plan).covered) / len(stories)
+    tasks = plan_tasks(plan)
+    task_ids = {task.get("id") for task in tasks}
+    dependencies = [dependency for task in tasks for dependency in task.get("dependsOn") or []]
+    checks["dependency_integrity"] = (
+        sum(dependency in task_ids for dependency in dependencies) / len(dependencies) if dependencies else 1.0
+    )
+    checks["tasks"] = len(tasks)
+    return checks
+
+
+def prd_checks(message: str, text: str) -> dict[str, float]:
+    prd = load_prd(strip_outer_fence(text))
+    return {"lint_issues": len(lint(prd)), "stories": len(prd.stories)}
+
+
+def mermaid_checks(message: str, text: str) -> dict[str, float]:
+    return {"mermaid_issues": len(validate_markdown(text))}
+
+
+CHECKS: dict[str, Callable[[str, str], dict[str, float]]] = {
+    "implementation_plan_agent": plan_checks,
+    "prd_generation_agent": prd_checks,
+    "architecture_overview_agent": mermaid_checks,
+    "sequence_diagrams_agent": mermaid_checks,
+}
+
+
+async def run_benchmark(
+    agent: str,
+    corpus: dict[str, str],
+    prompts: dict[str, AgentPrompt],
+    models: list[str] | None,
+    backend,
+    concurrency: int = 4,
+) -> list[Run]:
+    """Every corpus input through every (prompt, model) pair; ``models`` None uses each prompt's own model."""
+    semaphore = asyncio.Semaphore(concurrency)
+    check = CHECKS.get(agent)
+
+    async def run_one(case: str, label: str, prompt: AgentPrompt, model: str) -> Run:
+        async with semaphore:
+            try:
+                response = await backend.generate(model, prompt.instruction, corpus[case])
+            except Exception as error:  # one failed call must not end the benchmark
+                return Run(case, label, model, "error", error=f"{type(error).__name__}: {error}")
+        text = response.text
+        parsed = load_json(text) is not None if expects_json(prompt.instruction) else bool(strip_outer_fence(text))
+        run = Run(
+            case, label, model, "ok",
+            seconds=round(response.seconds, 2),
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+            cost=cost(model, response.input_tokens, response.output_tokens),
+            parsed=parsed,
+        )
+        if check and parsed:
+            try:
+                run.checks = check(corpus[case], text)
+            except Exception as error:  # one malformed answer must not end the benchmark either
+                run.error = f"check failed: {type(error).__name__}: {error}"
+        return run
+
+    return list(await asyncio.gather(*(
+        run_one(case, label, prompt, model)
+        for label, prompt in prompts.items()
+        for model in models or [prompt.model]
+        for case in corpus
+    )))
+
+
+def summarize(runs: list[Run]) -> list[dict]:
+    """One row per (prompt, model): rates, latency percentiles, mean tokens, total cost and mean check values."""
+    groups: dict[tuple[str, str], list[Run]] = {}
+    for run in runs:
+        groups.setdefault((run.prompt, run.model), []).append(run)
+    rows = []
+    for (prompt, model), group in groups.items():
+        ok = [run for run in group if run.status == "ok"]
+        seconds = sorted(run.seconds for run in ok)
+        check_names = sorted({name for run in ok for name in run.checks})
+        costs = [run.cost for run in ok if run.cost is not None]
+        rows.append({
+            "prompt": prompt,
+            "model": model,
+            "runs": len(group),
+            "errors": len(group) - len(ok),
+            "check_errors": sum(bool(run.error) for run in ok),
+            "parse_rate": sum(run.parsed for run in ok) / len(group),
+            "p50_seconds": _percentile(seconds, 0.5),
+            "p95_seconds": _percentile(seconds, 0.95),
+            "input_tokens": round(statistics.mean(run.input_tokens for run in ok)) if ok else 0,
+            "output_tokens": round(statistics.mean(run.output_tokens for run in ok)) if ok else 0,
+            "cost": round(sum(costs), 4) if costs else None,
+            "checks": {
+                name: round(statistics.mean(run.checks[name] for run in ok if name in run.checks), 3)
+                for name in check_names
+            },
+        })
+    return rows
+
+
+def render_report(agent: str, rows: list[dict]) -> str:
+    check_names = sorted({name for row in rows for name in row["checks"]})
+    header = ["Prompt", "Model", "Runs", "Errors", "Check errors", "Parsed", "p50 s", "p95 s", "In tokens", "Out tokens",
+              "Cost $", *check_names]
+    lines = [f"# {agent} benchmark", "", "| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    for row in rows:
+        cells = [
+            row["prompt"], row["model"], row["runs"], row["errors"], row["check_errors"], f"{row['parse_rate']:.0%}",
+            row["p50_seconds"], row["p95_seconds"], row["input_tokens"], row["output_tokens"],
+            "—" if row["cost"] is None else f"{row['cost']:.4f}",
+            *(row["checks"].get(name, "—") for name in check_names),
+        ]
+        lines.append("| " + " | ".join(str(cell) for cell in cells) + " |")
+    return "\n".join(lines)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("agent", help="agent package name, e.g. implementation_plan_agent")
+    parser.add_argument("corpus", help="directory of project inputs (*.txt, *.md)")
+    parser.add_argument("--prompts", nargs="+", metavar="[LABEL=]AGENT.PY",
+                        help="prompt versions to compare (default: the agent's agent.py)")
+    parser.add_argument("--models", nargs="+", help="models to run every prompt on (default: each prompt's own)")
+    parser.add_argument("--backend", choices=("live", "recorded", "local"), default="live")
+    parser.add_argument("--record", help="with the live backend, save every response in this directory")
+    parser.add_argument("--recordings", help="directory of saved responses for the recorded backend")
+    parser.add_argument("--local-url", default="http://localhost:11434/v1", help="OpenAI-compatible base URL")
+    parser.add_argument("--local-model", help="local model to use for every requested model")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--json", help="also write every run and the summary as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.backend == "recorded" and not args.recordings:
+        parser.error("--backend recorded needs --recordings")
+    try:
+        corpus = load_corpus(args.corpus)
+        prompts = {}
+        for entry in args.prompts or [args.agent]:
+            label, separator, path = entry.partition("=")
+            prompts[label if separator else entry] = load_prompt(path if separator else entry)
+    except (BenchmarkError, PromptError, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    if args.backend == "live":
+        backend = LiveBackend(JsonCache(args.record) if args.record else None)
+    elif args.backend == "recorded":
+        backend = RecordedBackend(args.recordings)
+    else:
+        backend = LocalBackend(args.local_url, args.local_model)
+    runs = asyncio.run(run_benchmark(args.agent, corpus, prompts, args.models, backend, args.concurrency))
+    rows = summarize(runs)
+    print(render_report(args.agent, rows))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"agent": args.agent, "backend": args.backend, "summary": rows,
+                       "runs": [asdict(run) for run in runs]}, file, indent=2, ensure_ascii=False)
+    for run in runs:
+        if run.error:
+            print(f"{run.case} / {run.prompt} / {run.model}: {run.error}", file=sys.stderr)
+    return 1 if any(run.status == "error" for run in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
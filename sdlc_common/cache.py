@@ -0,0 +1,42 @@
+"""Content-addressed JSON cache on the local filesystem.
+
+Caching is opt-in: set SDLC_CACHE_DIR to enable it. Each cache is a
+subdirectory holding one JSON file per key.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of JSON-serializable parts; dict key order does not matter."""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class JsonCache:
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+
+    def get(self, key: str):
+        try:
+            return json.loads((self.directory / f"{key}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value) -> None:
+        """Write atomically so concurrent readers never see a partial entry."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            json.dump(value, file, ensure_ascii=False)
+        os.replace(temporary, self.directory / f"{key}.json")
+
+
+def named_cache(name: str) -> JsonCache | None:
+    """Return the cache called ``name`` under SDLC_CACHE_DIR, or None when caching is disabled."""
+    root = os.getenv("SDLC_CACHE_DIR")
+    return JsonCache(Path(root) / name) if root else None
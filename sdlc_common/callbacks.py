@@ -0,0 +1,123 @@
+"""Helpers shared by the agents' ADK model callbacks."""
+
+import inspect
+import json
+import re
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+_OUTER_FENCE = re.compile(r"^\s*```[\w-]*[ \t]*\n(.*?)\n?```\s*$", re.DOTALL)
+
+
+def response_text(llm_response: LlmResponse) -> str:
+    """Return the visible text of a model response, ignoring thought parts."""
+    if llm_response.content is None or not llm_response.content.parts:
+        return ""
+    return "".join(
+        part.text for part in llm_response.content.parts if part.text and not part.thought
+    )
+
+
+def text_response(text: str) -> LlmResponse:
+    """Build a model response carrying a single text part."""
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def replace_text(llm_response: LlmResponse, text: str) -> LlmResponse:
+    """Return a copy of the response with its text replaced."""
+    content = types.Content(role="model", parts=[types.Part(text=text)])
+    return llm_response.model_copy(update={"content": content})
+
+
+def user_text(callback_context: CallbackContext) -> str:
+    """Return the text of the user message that started the invocation."""
+    return content_text(callback_context.user_content)
+
+
+def content_text(content: types.Content | None) -> str:
+    if content is None or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def replace_request_text(llm_request: LlmRequest, text: str) -> None:
+    """Send the model a single user message with ``text`` instead of the session contents."""
+    llm_request.contents = [types.Content(role="user", parts=[types.Part(text=text)])]
+
+
+def strip_outer_fence(text: str) -> str:
+    """Remove a code fence wrapping the whole response, if the model added one."""
+    match = _OUTER_FENCE.match(text)
+    return match.group(1) if match else text.strip()
+
+
+def find_json_objects(text: str) -> list:
+    """Return every top-level JSON object embedded in free text, in order."""
+    decoder = json.JSONDecoder()
+    objects = []
+    position = text.find("{")
+    while position != -1:
+        try:
+            value, end = decoder.raw_decode(text, position)
+        except ValueError:
+            position = text.find("{", position + 1)
+            continue
+        if isinstance(value, dict):
+            objects.append(value)
+        position = text.find("{", end)
+    return objects
+
+
+def chain_after_model_callbacks(*callbacks):
+    """Combine after_model_callbacks so each one sees the previous one's output.
+
+    ADK stops at the first callback in a list that returns a response, which
+    suits guards but not a pipeline of post-processors.
+    """
+
+    async def chained(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+        current = None
+        for callback in callbacks:
+            result = callback(callback_context, current or llm_response)
+            if inspect.isawaitable(result):
+                result = await result
+            current = result or current
+        return current
+
+    return chained
+
+
+def chain_model_error_callbacks(*callbacks):
+    """Combine on_model_error_callbacks: each runs in turn until one returns a response. None entries are skipped."""
+    callbacks = [callback for callback in callbacks if callback]
+
+    async def chained(callback_context: CallbackContext, llm_request: LlmRequest, error: Exception):
+        for callback in callbacks:
+            result = callback(callback_context, llm_request, error)
+            if inspect.isawaitable(result):
+                result = await result
+            if result is not None:
+                return result
+        return None
+
+    return chained
+
+
+def load_json(text: str):
+    """Parse a JSON response, tolerating a wrapping code fence. Returns None if invalid."""
+    try:
+        return json.loads(strip_outer_fence(text))
+    except ValueError:
+        return None
+
+
+def json_objects(value) -> list[dict]:
+    """The object entries of a JSON array from a model response; anything else is skipped."""
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def json_strings(value) -> list[str]:
+    """The string entries of a JSON array from a model response; anything else is skipped."""
+    return [item for item in value if isinstance(item, str)] if isinstance(value, list) else []
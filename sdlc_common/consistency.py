@@ -0,0 +1,292 @@
+"""Cross-artifact consistency index for the data model, API contract, sequence diagrams and plan.
+
+Builds one index of the names each artifact defines (entities and columns,
+endpoints, migration tables, plan files and task ids) and reports every
+reference one artifact makes to a name another does not define:
+
+- API contract endpoints whose resource is not a data model entity
+- sequence diagram and plan calls to endpoints the API contract does not define
+- plan migration tables and columns that are not in the data model
+- plan tasks that modify files nothing creates, or depend on unknown tasks
+
+Each finding names the agent whose artifact holds the dangling reference, so
+only that agent has to be re-run. Entity, table and path names are compared
+in singular snake_case, so BenefitVerification, benefit_verifications and
+/benefit-verifications all match.
+
+Usage:
+    python -m sdlc_common.consistency --context context.txt --plan plan.json
+    python -m sdlc_common.consistency --data-model DATA_MODEL.md --api-contract API_CONTRACT.md \\
+        --sequence-diagrams SEQUENCE_DIAGRAMS.md --plan plan.json --json
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import json_objects, json_strings, load_json, response_text, user_text
+from sdlc_common.context import section_map
+from sdlc_common.markdown import plain, split_blocks, table_with_column
+
+# First path segments that name an API area rather than a data model entity.
+NON_ENTITY_SEGMENTS = frozenset({
+    "auth", "me", "health", "admin", "search", "report", "dashboard", "webhook", "event", "integration",
+    "internal", "public", "lookup", "metadata", "config", "session", "export", "import", "stat", "metric",
+    "notification", "upload", "file", "ws", "sse", "stream",
+})
+
+_ENDPOINT = re.compile(r"\b(GET|POST|PUT|PATCH|DELETE)\s+`?(/[\w\-./{}:]*)")
+_CREATE_TABLE = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[\"`]?(?:\w+\.)?(\w+)[\"`]?\s*\((.*?)\)\s*;", re.IGNORECASE | re.DOTALL
+)
+_INSERT_INTO = re.compile(r"INSERT\s+INTO\s+[\"`]?(?:\w+\.)?(\w+)[\"`]?", re.IGNORECASE)
+_NOT_A_COLUMN = re.compile(r"^(CONSTRAINT|PRIMARY|FOREIGN|UNIQUE|CHECK|INDEX|KEY|EXCLUDE)\b", re.IGNORECASE)
+_VERSION_PREFIX = re.compile(r"^/api(?:/v\d+)?(?=/|$)", re.IGNORECASE)
+_PATH_PARAMETER = re.compile(r"\{[^}]*\}|:\w+")
+
+
+@dataclass
+class Finding:
+    agent: str  # the agent whose artifact holds the dangling reference
+    kind: str
+    reference: str
+    detail: str
+
+
+@dataclass
+class ArtifactIndex:
+    entities: dict[str, str] = field(default_factory=dict)  # normalized name -> entity name
+    columns: dict[str, set[str]] = field(default_factory=dict)  # normalized entity -> column names
+    endpoints: dict[str, str] = field(default_factory=dict)  # normalized endpoint -> as written
+    diagram_endpoints: list[str] = field(default_factory=list)
+    migration_tables: dict[str, set[str]] = field(default_factory=dict)  # table -> columns
+    seeded_tables: set[str] = field(default_factory=set)
+    plan_endpoints: list[tuple[str, str]] = field(default_factory=list)  # (task id, endpoint)
+    created_files: set[str] = field(default_factory=set)
+    modified_files: list[tuple[str, str]] = field(default_factory=list)  # (task id, path)
+    task_ids: set[str] = field(default_factory=set)
+    dependencies: list[tuple[str, str]] = field(default_factory=list)  # (task id, dependency)
+
+
+def normalize_name(name: str) -> str:
+    """Singular snake_case form of an entity, table or path segment name."""
+    words = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", plain(name)).replace("-", "_").replace(" ", "_").lower()
+    words = re.sub(r"\W+", "", words).strip("_")
+    head, _, last = words.rpartition("_")
+    return f"{head}_{_singular(last)}" if head else _singular(last)
+
+
+def normalize_endpoint(method: str, path: str) -> str:
+    path = _VERSION_PREFIX.sub("", path.rstrip("/.").lower()) or "/"
+    return f"{method.upper()} {_PATH_PARAMETER.sub('{}', path)}"
+
+
+def index_data_model(index: ArtifactIndex, data_model: str) -> None:
+    for row in table_with_column(data_model, "Entity"):
+        if plain(row["Entity"]):
+            index.entities.setdefault(normalize_name(row["Entity"]), plain(row["Entity"]))
+    for block in split_blocks(data_model):
+        rows = table_with_column(block.text, "Column")
+        if block.level >= 3 and rows:
+            key = normalize_name(block.title)
+            index.entities.setdefault(key, plain(block.title))
+            index.columns[key] = {plain(row["Column"]).lower() for row in rows if plain(row["Column"])}
+
+
+def index_api_contract(index: ArtifactIndex, api_contract: str) -> None:
+    for method, path in _ENDPOINT.findall(api_contract):
+        index.endpoints.setdefault(normalize_endpoint(method, path), f"{method} {path}")
+
+
+def index_sequence_diagrams(index: ArtifactIndex, diagrams: str) -> None:
+    index.diagram_endpoints += [f"{method} {path}" for method, path in _ENDPOINT.findall(diagrams)]
+
+
+def index_plan(index: ArtifactIndex, plan: dict) -> None:
+    for phase in json_objects(plan.get("phases")):
+        for task in json_objects(phase.get("tasks")):
+            task_id = str(task.get("id") or "")
+            index.task_ids.add(task_id)
+            index.created_files.update(_path(path) for path in json_strings(task.get("filesToCreate")))
+            index.modified_files += [(task_id, path) for path in json_strings(task.get("filesToModify"))]
+            index.dependencies += [(task_id, dependency) for dependency in json_strings(task.get("dependsOn"))]
+            text = " ".join([str(task.get("description") or ""), *json_strings(task.get("acceptanceCriteria"))])
+            index.plan_endpoints += [(task_id, f"{method} {path}") for method, path in _ENDPOINT.findall(text)]
+    for scaffold in json_objects(plan.get("scaffoldFiles")):
+        path = str(scaffold.get("path") or "")
+        index.created_files.add(_path(path))
+        content = str(scaffold.get("content") or "")
+        if path.endswith(".sql"):
+            for table, body in _CREATE_TABLE.findall(content):
+                index.migration_tables[table.lower()] = _columns(body)
+            index.seeded_tables.update(table.lower() for table in _INSERT_INTO.findall(content))
+
+
+def build_index(
+    data_model: str = "",
+    api_contract: str = "",
+    sequence_diagrams: str = "",
+    plan: dict | None = None,
+) -> ArtifactIndex:
+    index = ArtifactIndex()
+    index_data_model(index, data_model)
+    index_api_contract(index, api_contract)
+    index_sequence_diagrams(index, sequence_diagrams)
+    index_plan(index, plan or {})
+    return index
+
+
+def check_consistency(index: ArtifactIndex) -> list[Finding]:
+    """Every dangling reference in the index, attributed to the agent that made it."""
+    findings = []
+    if index.entities:
+        for endpoint, written in index.endpoints.items():
+            segment = next((part for part in endpoint.split(" ", 1)[1].split("/") if part and part != "{}"), "")
+            resource = normalize_name(segment)
+            if segment and resource not in index.entities and resource not in NON_ENTITY_SEGMENTS:
+                findings.append(Finding("api_contract_agent", "unknown_entity_endpoint", written,
+                                        f"resource '{segment}' is not a data model entity"))
+        for table, columns in index.migration_tables.items():
+            key = normalize_name(table)
+            if key not in index.entities:
+                findings.append(Finding("implementation_plan_agent", "unknown_migration_table", table,
+                                        "migration creates a table that is not in the data model"))
+                continue
+            missing = sorted(columns - index.columns.get(key, columns))
+            if missing:
+                findings.append(Finding("implementation_plan_agent", "unknown_migration_column", table,
+                                        f"columns not in the data model: {', '.join(missing)}"))
+        for table in sorted(index.seeded_tables):
+            if normalize_name(table) not in index.entities:
+                findings.append(Finding("implementation_plan_agent", "unknown_seed_table", table,
+                                        "seed data targets a table that is not in the data model"))
+    if index.endpoints:
+        for written in index.diagram_endpoints:
+            if normalize_endpoint(*written.split(" ", 1)) not in index.endpoints:
+                findings.append(Finding("sequence_diagrams_agent", "unknown_endpoint", written,
+                                        "diagram calls an endpoint the API contract does not define"))
+        for task_id, written in index.plan_endpoints:
+            if normalize_endpoint(*written.split(" ", 1)) not in index.endpoints:
+                findings.append(Finding("implementation_plan_agent", "unknown_endpoint", written,
+                                        f"task {task_id} references an endpoint the API contract does not define"))
+    for task_id, path in index.modified_files:
+        if _path(path) not in index.created_files:
+            findings.append(Finding("implementation_plan_agent", "missing_file", path,
+                                    f"task {task_id} modifies a file no task or scaffold file creates"))
+    for task_id, dependency in index.dependencies:
+        if dependency not in index.task_ids:
+            findings.append(Finding("implementation_plan_agent", "unknown_task", dependency,
+                                    f"task {task_id} depends on a task that does not exist"))
+    return _unique(findings)
+
+
+def check_context(context: str, plan: dict | None = None) -> list[Finding]:
+    """Check the artifacts in a backend context message, plus a plan given separately."""
+    sections = section_map(context)
+    if plan is None:
+        plan = load_json(sections.get("IMPLEMENTATION PLAN", ""))
+    return check_consistency(build_index(
+        sections.get("DATA MODEL", ""),
+        sections.get("API CONTRACT", ""),
+        sections.get("SEQUENCE DIAGRAMS", ""),
+        plan if isinstance(plan, dict) else None,
+    ))
+
+
+def record_consistency(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: check the generated plan against the artifacts it was built from."""
+    if llm_response.partial:
+        return None
+    plan = load_json(response_text(llm_response))
+    if not isinstance(plan, dict):
+        return None
+    try:
+        findings = check_context(user_text(callback_context), plan)
+    except Exception as error:  # a checker bug must not fail the plan it reports on
+        callback_context.state["consistency_error"] = f"{type(error).__name__}: {error}"
+        return None
+    callback_context.state["consistency_findings"] = [asdict(finding) for finding in findings]
+    return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--context", help="a backend context message containing the artifacts")
+    parser.add_argument("--data-model")
+    parser.add_argument("--api-contract")
+    parser.add_argument("--sequence-diagrams")
+    parser.add_argument("--plan", help="implementation plan JSON")
+    parser.add_argument("--json", action="store_true", help="print findings as JSON")
+    args = parser.parse_args(argv)
+
+    sections = section_map(_read(args.context)) if args.context else {}
+    plan = load_json(_read(args.plan) if args.plan else sections.get("IMPLEMENTATION PLAN", ""))
+    findings = check_consistency(build_index(
+        _read(args.data_model) if args.data_model else sections.get("DATA MODEL", ""),
+        _read(args.api_contract) if args.api_contract else sections.get("API CONTRACT", ""),
+        _read(args.sequence_diagrams) if args.sequence_diagrams else sections.get("SEQUENCE DIAGRAMS", ""),
+        plan if isinstance(plan, dict) else None,
+    ))
+
+    if args.json:
+        print(json.dumps([asdict(finding) for finding in findings], indent=2))
+    else:
+        for agent in sorted({finding.agent for finding in findings}):
+            print(agent)
+            for finding in findings:
+                if finding.agent == agent:
+                    print(f"  {finding.kind}: {finding.reference} — {finding.detail}")
+        print(f"{len(findings)} dangling reference(s)" if findings else "No dangling references.")
+    return 1 if findings else 0
+
+
+def _singular(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if re.search(r"(ss|ch|sh|x|z)es$", word):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _columns(body: str) -> set[str]:
+    columns, depth, current = set(), 0, []
+    for char in body + ",":
+        depth += (char == "(") - (char == ")")
+        if char == "," and depth == 0:
+            definition = "".join(current).strip()
+            if definition and not _NOT_A_COLUMN.match(definition):
+                columns.add(definition.split()[0].strip("\"`").lower())
+            current = []
+        else:
+            current.append(char)
+    return columns
+
+
+def _path(path: str) -> str:
+    return re.sub(r"^(?:\./)?(?:scaffold/)?", "", path.strip()).rstrip("/")
+
+
+def _unique(findings: list[Finding]) -> list[Finding]:
+    seen, unique = set(), []
+    for finding in findings:
+        key = (finding.agent, finding.kind, finding.reference, finding.detail)
+        if key not in seen:
+            seen.add(key)
+            unique.append(finding)
+    return unique
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
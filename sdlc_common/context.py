@@ -0,0 +1,68 @@
+"""Parsing of the labelled context blocks the backend sends to every agent.
+
+The backend builds each agent message from upper-case section labels such as
+TECHNOLOGY STACK or PRODUCT REQUIREMENTS DOCUMENT followed by their content.
+The label line may carry markdown or banner decoration (``## DATA MODEL``,
+``=== API CONTRACT ===``, ``DATA MODEL:``), which is preserved on render.
+"""
+
+import re
+from dataclasses import dataclass
+
+SECTION_NAMES = (
+    "PROJECT NAME",
+    "PRODUCT NAME",
+    "PRODUCT DESCRIPTION",
+    "PRD SUMMARY",
+    "CONFIGURATION",
+    "TECHNOLOGY STACK",
+    "PRODUCT REQUIREMENTS DOCUMENT",
+    "CONFIRMED UI SCREENS",
+    "PREVIOUS SCREEN INVENTORY",
+    "DESIGN SYSTEM SUMMARY",
+    "ARCHITECTURE OVERVIEW",
+    "DATA MODEL",
+    "API CONTRACT",
+    "SEQUENCE DIAGRAMS",
+    "IMPLEMENTATION PLAN",
+    "GLOBAL TECHNICAL GUIDELINES",
+    "CORPORATE TECHNICAL GUIDELINES",
+    "COMPONENT STYLESHEET",
+    "APPLICATION NAVIGATION STRUCTURE",
+)
+
+_HEADER = re.compile(
+    r"^[#=\-* \t]*(?P<name>%s)(?:[ \t]+[A-Z][A-Z \t]*)?(?:[ \t]*\([^)\n]*\))?[ \t:=#\-*]*$"
+    % "|".join(re.escape(name) for name in SECTION_NAMES),
+    re.MULTILINE,
+)
+
+
+@dataclass
+class Section:
+    name: str
+    header: str
+    body: str
+
+
+def parse_context(text: str) -> list[Section]:
+    """Split a context message into sections. Text before the first label has name ""."""
+    sections = []
+    position = 0
+    name, header = "", ""
+    for match in _HEADER.finditer(text):
+        sections.append(Section(name, header, text[position:match.start()]))
+        name, header = match.group("name"), match.group(0)
+        position = match.end()
+    sections.append(Section(name, header, text[position:]))
+    return [section for section in sections if section.name or section.body]
+
+
+def render_context(sections: list[Section]) -> str:
+    """Reassemble sections produced by parse_context."""
+    return "".join(section.header + section.body for section in sections)
+
+
+def section_map(text: str) -> dict[str, str]:
+    """Return section bodies keyed by label, stripped of surrounding whitespace."""
+    return {section.name: section.body.strip() for section in parse_context(text) if section.name}
@@ -0,0 +1,125 @@
+"""Runs the five GTM agents concurrently on one message.
+
+The GTM agents only depend on the product name, PRD summary and
+implementation plan summary in the message, not on each other, so the bundle
+sends the same message to all five at once and returns when the slowest one
+finishes. Each agent's outcome is reported separately: one failing or timing
+out leaves the others' documents in the result. With the full PRD in the
+message, the PRD digest the agents share is computed once for the bundle.
+
+    python -m sdlc_common.gtm_bundle MESSAGE.txt [--out gtm.json] [--timeout 300] [--agents gtm_kpis_agent ...]
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+from google.adk.agents import BaseAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from sdlc_common.callbacks import content_text
+
+GTM_AGENTS = (
+    "gtm_kpis_agent",
+    "gtm_launch_plan_agent",
+    "gtm_press_release_agent",
+    "gtm_marketing_materials_agent",
+    "gtm_feature_notes_agent",
+)
+USER_ID = "gtm_bundle"
+
+
+@dataclass
+class AgentResult:
+    status: str  # "ok", "error" or "timeout"
+    output: str = ""
+    error: str = ""
+    seconds: float = 0.0
+
+
+def bundle_status(results: dict[str, AgentResult]) -> str:
+    """Overall status: ok when every agent succeeded, error when none did, otherwise partial."""
+    succeeded = sum(result.status == "ok" for result in results.values())
+    return "ok" if succeeded == len(results) else "error" if not succeeded else "partial"
+
+
+async def run_bundle(
+    message: str,
+    agents: tuple[str, ...] = GTM_AGENTS,
+    timeout: float | None = None,
+) -> dict[str, AgentResult]:
+    """Run every agent on the message concurrently; results are keyed by agent name in ``agents`` order."""
+    outcomes = await asyncio.gather(*(_run_one(name, message, timeout) for name in agents))
+    return dict(zip(agents, outcomes))
+
+
+async def run_agent(agent: BaseAgent, message: str, app_name: str) -> str:
+    """Run an agent on a single user message in a fresh in-memory session; returns its final text."""
+    runner = InMemoryRunner(agent=agent, app_name=app_name)
+    session = await runner.session_service.create_session(app_name=app_name, user_id=USER_ID)
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    final = ""
+    async for event in runner.run_async(user_id=USER_ID, session_id=session.id, new_message=content):
+        if getattr(event, "error_message", None):
+            raise RuntimeError(event.error_message)
+        if event.is_final_response() and event.content:
+            final = content_text(event.content)
+    if not final.strip():
+        raise RuntimeError("agent returned no text")
+    return final
+
+
+async def _run_one(name: str, message: str, timeout: float | None) -> AgentResult:
+    started = time.monotonic()
+
+    def elapsed() -> float:
+        return round(time.monotonic() - started, 2)
+
+    try:
+        agent = importlib.import_module(f"{name}.agent").root_agent
+        output = await asyncio.wait_for(run_agent(agent, message, name), timeout)
+    except asyncio.TimeoutError:
+        return AgentResult("timeout", error=f"no response within {timeout:g}s", seconds=elapsed())
+    except Exception as error:  # one agent failing must not discard the others' output
+        return AgentResult("error", error=f"{type(error).__name__}: {error}", seconds=elapsed())
+    return AgentResult("ok", output=output, seconds=elapsed())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("message", help="file holding the GTM agent message ('-' for stdin)")
+    parser.add_argument("--out", help="write the keyed JSON result here instead of stdout")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per agent")
+    parser.add_argument("--agents", nargs="+", default=list(GTM_AGENTS), choices=GTM_AGENTS, metavar="AGENT")
+    args = parser.parse_args(argv)
+
+    if args.message == "-":
+        message = sys.stdin.read()
+    else:
+        with open(args.message, encoding="utf-8") as file:
+            message = file.read()
+    results = asyncio.run(run_bundle(message, tuple(args.agents), args.timeout))
+    status = bundle_status(results)
+    payload = json.dumps(
+        {"status": status, "results": {name: asdict(result) for name, result in results.items()}},
+        indent=2,
+        ensure_ascii=False,
+    )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            file.write(payload + "\n")
+    else:
+        print(payload)
+    for name, result in results.items():
+        print(f"{name}: {result.status} ({result.seconds:.1f}s){' — ' + result.error if result.error else ''}",
+              file=sys.stderr)
+    return 0 if status == "ok" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Relevant technical guideline sections instead of the whole guidelines.
+
+Enabled with GUIDELINE_RETRIEVAL=on. The GLOBAL and CORPORATE TECHNICAL
+GUIDELINES of the message are split into sections at their markdown headings,
+and long sections are split further. A local BM25 index ranks the sections
+against a query built from the agent's topics (persistence for the data model,
+OWASP and API rules for the contract, and so on), the agent's own name (for
+section agents such as ``architecture_overview_agent_security_architecture``)
+and the TECHNOLOGY STACK. The best-scoring sections are kept, in their
+original order, until GUIDELINE_TOKEN_BUDGET is spent; a corporate section
+wins a tie or near-tie with a global one. Guidelines that already fit the
+budget are sent whole.
+
+Binding sections are always kept, outside the budget. These are sections whose
+heading marks them as such (non-negotiable, mandatory, always, override) and
+corporate sections that state they override other guidance, since corporate
+guidelines may override global ones. The selection is recorded as
+``guideline_selection`` in session state.
+
+    python -m sdlc_common.guidelines context.txt --agent data_model_agent [--budget 1200]
+"""
+
+import argparse
+import math
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import content_text, replace_request_text
+from sdlc_common.context import Section, parse_context, render_context
+from sdlc_common.tokens import chunk_text, estimate_tokens
+
+GUIDELINE_SECTIONS = ("GLOBAL TECHNICAL GUIDELINES", "CORPORATE TECHNICAL GUIDELINES")
+DEFAULT_BUDGET = 1200
+MAX_SECTION_TOKENS = 300
+BM25_K1 = 1.5
+BM25_B = 0.75
+CORPORATE_TIE_MARGIN = 0.1  # corporate sections win against global ones scoring up to 10% higher
+
+AGENT_TOPICS = {
+    "architecture_overview_agent": """
+        architecture layer service component module deployment infrastructure container kubernetes docker cloud
+        scalability availability resilience integration messaging queue event security authentication
+        authorization encryption tls secret observability logging monitoring tracing
+    """,
+    "data_model_agent": """
+        data database persistence schema table entity column naming index key constraint migration transaction
+        query jpa jdbc sql orm pagination tenant ownership idor pii phi pci encryption retention audit
+    """,
+    "api_contract_agent": """
+        api rest endpoint http controller request response dto validation input error status exception
+        authentication authorization token owasp injection idor rate limiting pagination versioning csrf cookie
+        cors
+    """,
+}
+STOPWORDS = frozenset("""
+    a an and are as at be by for from if in into is it of on or that the these this to use with when where
+    which agent
+""".split())
+
+_HEADING = re.compile(r"^#{1,6}\s+\S")
+_BINDING_HEADING = re.compile(r"non-negotiable|mandatory|always|overrid|supersede|prime directive", re.IGNORECASE)
+_OVERRIDE = re.compile(r"\boverrid\w*|\bsupersed\w*|non-negotiable|takes precedence", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class GuidelineSection:
+    source: str  # GLOBAL or CORPORATE TECHNICAL GUIDELINES
+    title: str
+    text: str
+    tokens: int
+    binding: bool
+
+
+class Bm25Index:
+    def __init__(self, documents: list[list[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1, self.b = k1, b
+        self.frequencies = [Counter(document) for document in documents]
+        self.lengths = [len(document) for document in documents]
+        self.average_length = sum(self.lengths) / len(documents) if documents else 0
+        document_frequency = Counter(term for document in documents for term in set(document))
+        count = len(documents)
+        self.idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def scores(self, query: list[str]) -> list[float]:
+        wanted = set(query)
+        scores = []
+        for frequencies, length in zip(self.frequencies, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            scores.append(sum(
+                self.idf[term] * frequencies[term] * (self.k1 + 1) / (frequencies[term] + norm)
+                for term in wanted if term in frequencies
+            ))
+        return scores
+
+
+def terms(text: str) -> list[str]:
+    words = _WORD.findall(text.lower())
+    return [_stem(word) for word in words if word not in STOPWORDS and len(word) > 1]
+
+
+def split_guidelines(source: str, text: str) -> list[GuidelineSection]:
+    """The sections of one guidelines body; each keeps its heading, long ones are split and repeat it."""
+    blocks, current = [], []
+    for line in text.strip().splitlines():
+        if _HEADING.match(line) and current:
+            blocks.append(current)
+            current = []
+        current.append(line)
+    if current:
+        blocks.append(current)
+    sections = []
+    corporate = source.startswith("CORPORATE")
+    for lines in blocks:
+        title = lines[0].lstrip("#").strip() if _HEADING.match(lines[0]) else ""
+        body = "\n".join(lines[1:] if title else lines).strip()
+        binding = bool(_BINDING_HEADING.search(title)) or corporate and bool(_OVERRIDE.search(body))
+        heading = lines[0] if title else ""
+        for chunk in chunk_text(body, MAX_SECTION_TOKENS) if body else [""]:
+            text = f"{heading}\n{chunk}".strip()
+            sections.append(GuidelineSection(source, title or chunk.split("\n", 1)[0][:60], text,
+                                             estimate_tokens(text), binding))
+    return sections
+
+
+@lru_cache(maxsize=16)
+def guideline_index(bodies: tuple[tuple[str, str], ...]) -> tuple[list[GuidelineSection], Bm25Index]:
+    """Sections and BM25 index of the (source, body) guidelines, built once per distinct guidelines text."""
+    sections = [section for source, body in bodies for section in split_guidelines(source, body)]
+    return sections, Bm25Index([terms(section.text) for section in sections])
+
+
+def select_sections(
+    sections: list[GuidelineSection], index: Bm25Index, query: str, budget: int
+) -> list[GuidelineSection]:
+    """Binding sections, then the best-scoring others that fit the budget; in document order."""
+    if sum(section.tokens for section in sections) <= budget:
+        return list(sections)
+    scores = index.scores(terms(query))
+    chosen = {position for position, section in enumerate(sections) if section.binding}
+    remaining = budget - sum(sections[position].tokens for position in chosen)
+    # Corporate guidelines may override global ones, so they win ties and near-ties, but a corporate section
+    # that barely mentions the topic does not outrank the global rules for it.
+    ranked = sorted((position for position in range(len(sections)) if position not in chosen),
+                    key=lambda position: scores[position] * (
+                        1 + CORPORATE_TIE_MARGIN if sections[position].source.startswith("CORPORATE") else 1),
+                    reverse=True)
+    for position in ranked:
+        if scores[position] > 0 and sections[position].tokens <= remaining:
+            chosen.add(position)
+            remaining -= sections[position].tokens
+    return [section for position, section in enumerate(sections) if position in chosen]
+
+
+def agent_query(agent_name: str, context_sections: list[Section]) -> str:
+    topic = max((name for name in AGENT_TOPICS if agent_name.startswith(name)), key=len, default="")
+    suffix = agent_name[len(topic):].replace("_", " ") if topic else agent_name.replace("_", " ")
+    stack = next((section.body for section in context_sections if section.name == "TECHNOLOGY STACK"), "")
+    return " ".join([AGENT_TOPICS.get(topic, ""), suffix, stack])
+
+
+def retrieval_enabled() -> bool:
+    return os.getenv("GUIDELINE_RETRIEVAL", "").lower() in ("on", "1", "true")
+
+
+def guideline_budget() -> int:
+    try:
+        return int(os.getenv("GUIDELINE_TOKEN_BUDGET") or DEFAULT_BUDGET)
+    except ValueError:
+        return DEFAULT_BUDGET
+
+
+def narrow_guidelines(text: str, agent_name: str, budget: int) -> tuple[str, dict]:
+    """The message with only the relevant guideline sections, and a report of what was kept."""
+    context_sections = parse_context(text)
+    bodies = tuple((section.name, section.body) for section in context_sections
+                   if section.name in GUIDELINE_SECTIONS and section.body.strip())
+    if not bodies:
+        return text, {}
+    sections, index = guideline_index(bodies)
+    kept = select_sections(sections, index, agent_query(agent_name, context_sections), budget)
+    report = {
+        "budget": budget,
+        "tokens": sum(section.tokens for section in sections),
+        "selected_tokens": sum(section.tokens for section in kept),
+        "kept": [section.title for section in kept],
+        "dropped": [section.title for section in sections if section not in kept],
+    }
+    rendered = []
+    for section in context_sections:
+        if section.name in GUIDELINE_SECTIONS and section.body.strip():
+            selected = "\n\n".join(part.text for part in kept if part.source == section.name)
+            body = selected or "No sections of these guidelines apply to this document."
+            rendered.append(Section(section.name, section.header, f"\n{body}\n\n"))
+        else:
+            rendered.append(section)
+    return render_context(rendered), report
+
+
+def select_guidelines(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """before_model_callback: send only the guideline sections relevant to this agent."""
+    if not retrieval_enabled():
+        return None
+    message = next((content for content in reversed(llm_request.contents or []) if content.role == "user"), None)
+    original = content_text(message)
+    text, report = narrow_guidelines(original, callback_context.agent_name, guideline_budget())
+    if report:
+        selection = dict(callback_context.state.get("guideline_selection") or {})
+        callback_context.state["guideline_selection"] = {**selection, callback_context.agent_name: report}
+    if text != original:
+        replace_request_text(llm_request, text)
+    return None
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("context", help="a context message holding the guideline sections ('-' for stdin)")
+    parser.add_argument("--agent", required=True, choices=sorted(AGENT_TOPICS))
+    parser.add_argument("--budget", type=int, default=guideline_budget(), help="tokens for the ranked sections")
+    parser.add_argument("--show", action="store_true", help="print the narrowed message instead of the report")
+    args = parser.parse_args(argv)
+
+    if args.context == "-":
+        context = sys.stdin.read()
+    else:
+        with open(args.context, encoding="utf-8") as file:
+            context = file.read()
+    text, report = narrow_guidelines(context, args.agent, args.budget)
+    if not report:
+        print("No GLOBAL or CORPORATE TECHNICAL GUIDELINES section found.", file=sys.stderr)
+        return 1
+    if args.show:
+        print(text)
+        return 0
+    print(f"{report['selected_tokens']} of {report['tokens']} guideline tokens kept (budget {report['budget']})")
+    for title in report["kept"]:
+        print(f"  kept     {title}")
+    for title in report["dropped"]:
+        print(f"  dropped  {title}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""Streaming export of PRD Epics, Stories and Tasks to Jira.
+
+The PRD is read line by line through ``iter_prd`` and every issue is written
+to the sink as soon as its text has been read, so memory stays constant
+however many tasks the PRD holds, and one run can export many projects in
+turn. Sinks:
+
+- ``CsvSink``: a Jira CSV importer file. Issue ID / Parent ID link Stories to
+  their Epic and Tasks to their Story; Labels repeat across columns.
+- ``JsonLinesSink``: one issue per line, in the field shape of the Jira REST API.
+- ``HttpSink``: Jira REST bulk create (``/rest/api/2/issue/bulk``) in batches
+  of up to 50 issues per level, linking each child to the key Jira returned
+  for its parent.
+
+    python -m sdlc_common.jira_export --format csv --out issues.csv CLAIMS=claims/PRD.md RX=rx/PRD.md
+    python -m sdlc_common.jira_export --url https://jira.example.com --token "$JIRA_TOKEN" CLAIMS=PRD.md
+"""
+
+import argparse
+import base64
+import csv
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from sdlc_common.prd import Epic, Node, Story, iter_prd
+
+ISSUE_TYPES = {"epic": "Epic", "story": "Story", "task": "Sub-task"}
+PRIORITIES = {"critical": "Highest"}
+MAX_LABELS = 6
+BULK_BATCH_SIZE = 50  # Jira's limit per bulk create request
+CSV_COLUMNS = ("Issue ID", "Parent ID", "Project Key", "Issue Type", "Summary", "Description", "Priority",
+               "Component")
+
+
+class JiraExportError(RuntimeError):
+    pass
+
+
+@dataclass
+class JiraIssue:
+    project: str
+    issue_id: str
+    parent_id: str
+    kind: str
+    issue_type: str
+    summary: str
+    description: str
+    priority: str = ""
+    component: str = ""
+    labels: list[str] = field(default_factory=list)
+
+    def fields(self) -> dict:
+        """The issue in the field shape of the Jira REST API, without its parent link."""
+        values = {
+            "project": {"key": self.project},
+            "issuetype": {"name": self.issue_type},
+            "summary": self.summary,
+            "description": self.description,
+        }
+        if self.priority:
+            values["priority"] = {"name": self.priority}
+        if self.labels:
+            values["labels"] = self.labels
+        return values
+
+
+def iter_issues(lines: Iterable[str], project: str, issue_types: dict[str, str] = ISSUE_TYPES) -> Iterator[JiraIssue]:
+    """The Jira issues of a PRD, parents first, streamed from its lines."""
+    for node in iter_prd(lines):
+        parent = node.epic if isinstance(node, Story) else "" if isinstance(node, Epic) else node.story
+        yield JiraIssue(
+            project=project,
+            issue_id=f"{project}:{node.number}",
+            parent_id=f"{project}:{parent}" if parent else "",
+            kind=node.kind,
+            issue_type=issue_types[node.kind],
+            summary=node.summary or node.title or f"{node.kind.capitalize()} {node.number}",
+            description=describe(node),
+            priority=PRIORITIES.get(node.priority.lower(), node.priority.capitalize()),
+            component=getattr(node, "component", ""),
+            labels=[label.replace(" ", "-") for label in node.labels],
+        )
+
+
+def describe(node: Node) -> str:
+    """Jira description text (wiki markup) for an epic, story or task."""
+    if isinstance(node, Epic):
+        parts = [node.statement.replace("**", "*")] if node.statement else []
+        if node.success_metrics:
+            parts.append("*Success Metrics:*\n" + "\n".join(f"* {metric}" for metric in node.success_metrics))
+    elif isinstance(node, Story):
+        parts = ["\n".join(
+            f"*{name.capitalize()}:* {getattr(node, name)}"
+            for name in ("scenario", "given", "when", "then") if getattr(node, name)
+        )]
+        if node.acceptance_criteria:
+            parts.append("*Acceptance Criteria:*\n" + "\n".join(f"* {item}" for item in node.acceptance_criteria))
+    else:
+        parts = [node.description]
+    return "\n\n".join(part for part in parts if part)
+
+
+class CsvSink:
+    def __init__(self, file: TextIO):
+        self.writer = csv.writer(file)
+        self.writer.writerow([*CSV_COLUMNS, *["Labels"] * MAX_LABELS])
+
+    def write(self, issue: JiraIssue) -> None:
+        labels = issue.labels[:MAX_LABELS]
+        self.writer.writerow([
+            issue.issue_id, issue.parent_id, issue.project, issue.issue_type, issue.summary, issue.description,
+            issue.priority, issue.component, *labels, *[""] * (MAX_LABELS - len(labels)),
+        ])
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesSink:
+    def __init__(self, file: TextIO):
+        self.file = file
+
+    def write(self, issue: JiraIssue) -> None:
+        values = {"externalId": issue.issue_id, "parentExternalId": issue.parent_id or None, "fields": issue.fields()}
+        if issue.component:
+            values["fields"]["components"] = [{"name": issue.component}]
+        self.file.write(json.dumps(values, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        pass
+
+
+class HttpSink:
+    """Creates the issues through Jira's bulk create endpoint.
+
+    Issues wait in one queue per level (epics, stories, tasks). When a queue
+    reaches ``batch_size`` every queue is sent, parents first, so each child is
+    sent with the key Jira assigned to its parent: a PRD of Epics, Stories and
+    Tasks goes out in requests of up to ``batch_size`` issues per level, not
+    one request per story. Only the queues and the keys of the latest epic and
+    story of each project outlive a flush, since the issues arrive parents
+    first. Issues Jira rejects, and the children of rejected parents, are
+    listed in ``errors``.
+    """
+
+    def __init__(self, base_url: str, headers: dict[str, str] | None = None, batch_size: int = BULK_BATCH_SIZE,
+                 components: bool = False, timeout: float = 60):
+        self.url = base_url.rstrip("/") + "/rest/api/2/issue/bulk"
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json", **(headers or {})}
+        self.batch_size = batch_size
+        self.components = components
+        self.timeout = timeout
+        self.pending: dict[str, list[JiraIssue]] = {kind: [] for kind in ISSUE_TYPES}
+        self.keys: dict[str, str] = {}  # issue id -> Jira key, for parents that can still get children
+        self.latest: dict[tuple[str, str], str] = {}  # (project, kind) -> issue id of the latest epic or story
+        self.created = 0
+        self.errors: list[str] = []
+
+    def write(self, issue: JiraIssue) -> None:
+        self.pending[issue.kind].append(issue)
+        if issue.kind != "task":
+            self.latest[(issue.project, issue.kind)] = issue.issue_id
+        if len(self.pending[issue.kind]) >= self.batch_size:
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        for kind in ISSUE_TYPES:
+            issues, self.pending[kind] = self.pending[kind], []
+            for start in range(0, len(issues), self.batch_size):
+                self._create(issues[start:start + self.batch_size])
+        # Later issues can only be children of the latest epic or story of their project.
+        live = set(self.latest.values())
+        self.keys = {issue_id: key for issue_id, key in self.keys.items() if issue_id in live}
+
+    def _create(self, issues: list[JiraIssue]) -> None:
+        batch, updates = [], []
+        for issue in issues:
+            values = issue.fields()
+            if issue.parent_id:
+                parent_key = self.keys.get(issue.parent_id)
+                if not parent_key:
+                    self.errors.append(f"{issue.issue_id}: parent {issue.parent_id} was not created")
+                    continue
+                values["parent"] = {"key": parent_key}
+            if self.components and issue.component:
+                values["components"] = [{"name": issue.component}]
+            batch.append(issue)
+            updates.append({"fields": values})
+        if not updates:
+            return
+        response = self._post({"issueUpdates": updates})
+        failed = {error.get("failedElementNumber"): error for error in response.get("errors") or []}
+        created = iter(response.get("issues") or [])
+        for index, issue in enumerate(batch):
+            if index in failed:
+                self.errors.append(f"{issue.issue_id}: {json.dumps(failed[index].get('elementErrors'))}")
+                continue
+            key = next(created, {}).get("key")
+            if not key:
+                continue
+            self.created += 1
+            if issue.kind != "task":
+                self.keys[issue.issue_id] = key
+
+    def _post(self, payload: dict) -> dict:
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode(), headers=self.headers, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read() or b"{}")
+        except urllib.error.HTTPError as error:
+            body = error.read().decode(errors="replace")
+            try:
+                return json.loads(body)  # bulk create reports per-issue failures with a 400
+            except ValueError:
+                raise JiraExportError(f"Jira bulk create failed with HTTP {error.code}: {body[:500]}") from error
+        except urllib.error.URLError as error:
+            raise JiraExportError(f"Jira bulk create failed: {error.reason}") from error
+
+
+def export(
+    sources: Iterable[tuple[str, str | os.PathLike]],
+    sink,
+    issue_types: dict[str, str] = ISSUE_TYPES,
+) -> dict[str, int]:
+    """Stream every (project key, PRD path) source to the sink; returns the issue count per project."""
+    counts: dict[str, int] = {}
+    for project, path in sources:
+        with open(path, encoding="utf-8") as file:
+            for issue in iter_issues(file, project, issue_types):
+                sink.write(issue)
+                counts[project] = counts.get(project, 0) + 1
+    sink.close()
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("sources", nargs="+", metavar="PROJECT=PRD.md", help="Jira project key and PRD file")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--out", default="-", help="output file (default: stdout)")
+    parser.add_argument("--url", help="create the issues in this Jira instead of writing a file")
+    parser.add_argument("--user", help="Jira user for basic auth with --token (Jira Cloud)")
+    parser.add_argument("--token", default=os.getenv("JIRA_TOKEN"), help="API token (default: $JIRA_TOKEN)")
+    parser.add_argument("--components", action="store_true", help="set components (they must exist in Jira)")
+    parser.add_argument("--task-type", default=ISSUE_TYPES["task"], help="issue type for PRD tasks")
+    args = parser.parse_args(argv)
+
+    sources = []
+    for source in args.sources:
+        project, separator, path = source.partition("=")
+        if not separator or not project or not path:
+            parser.error(f"expected PROJECT=PRD.md, got {source!r}")
+        sources.append((project, path))
+    issue_types = {**ISSUE_TYPES, "task": args.task_type}
+
+    if args.url:
+        sink = HttpSink(args.url, _auth_headers(args.user, args.token), components=args.components)
+        try:
+            counts = export(sources, sink, issue_types)
+        except JiraExportError as error:
+            print(error, file=sys.stderr)
+            return 1
+        for error in sink.errors:
+            print(error, file=sys.stderr)
+        print(f"Created {sink.created} of {sum(counts.values())} issue(s).", file=sys.stderr)
+        return 1 if sink.errors else 0
+
+    file = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="")
+    try:
+        counts = export(sources, CsvSink(file) if args.format == "csv" else JsonLinesSink(file), issue_types)
+    finally:
+        if file is not sys.stdout:
+            file.close()
+    for project, count in counts.items():
+        print(f"{project}: {count} issue(s)", file=sys.stderr)
+    return 0
+
+
+def _auth_headers(user: str | None, token: str | None) -> dict[str, str]:
+    if not token:
+        return {}
+    if user:
+        return {"Authorization": "Basic " + base64.b64encode(f"{user}:{token}".encode()).decode()}
+    return {"Authorization": f"Bearer {token}"}
+
+
+if __name__ == "__main__":
+    sys.exit(main())
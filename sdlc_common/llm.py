@@ -0,0 +1,50 @@
+"""Direct Gemini calls made from callbacks, outside an agent's own model request.
+
+Used for small follow-up calls (filling a gap in a generated artifact) where
+re-running the whole agent would cost far more. The client picks up the same
+GOOGLE_GENAI_USE_VERTEXAI / GOOGLE_CLOUD_PROJECT / GOOGLE_CLOUD_LOCATION
+environment as the agents.
+"""
+
+from google import genai
+from google.genai import types
+
+_client: genai.Client | None = None
+
+
+def client() -> genai.Client:
+    global _client
+    if _client is None:
+        _client = genai.Client()
+    return _client
+
+
+async def generate_text(
+    model: str,
+    prompt: str,
+    system_instruction: str | None = None,
+    json_output: bool = False,
+) -> str:
+    config = types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        response_mime_type="application/json" if json_output else None,
+    )
+    response = await client().aio.models.generate_content(model=model, contents=prompt, config=config)
+    return response.text or ""
+
+
+async def generate_candidates(
+    model: str,
+    contents: list[types.Content],
+    config: types.GenerateContentConfig | None,
+    count: int,
+) -> list[str]:
+    """Ask for ``count`` alternative responses to the same request in a single call."""
+    update = {"candidate_count": count}
+    config = config.model_copy(update=update) if config else types.GenerateContentConfig(**update)
+    response = await client().aio.models.generate_content(model=model, contents=contents, config=config)
+    return [
+        "".join(part.text for part in candidate.content.parts if part.text and not part.thought)
+        for candidate in response.candidates or []
+        if candidate.content and candidate.content.parts
+    ]
@@ -0,0 +1,99 @@
+"""Splitting of the markdown documents the agents exchange (PRD, API contract, data model).
+
+Used to hand a model call only the part of a long document it needs, and to
+read the pipe tables those documents are built around. Headings
+inside fenced code blocks are not treated as block boundaries.
+"""
+
+import re
+from dataclasses import dataclass
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)[ \t#]*$")
+_TABLE_ROW = re.compile(r"^\s*\|.*\|\s*$")
+_SEPARATOR_CELL = re.compile(r"^\s*:?-{3,}:?\s*$")
+
+
+@dataclass
+class MarkdownBlock:
+    level: int  # 0 for the text before the first heading
+    title: str
+    text: str  # heading line included
+
+
+def split_blocks(markdown: str) -> list[MarkdownBlock]:
+    """Split a document at every heading, in order."""
+    blocks, lines = [], []
+    level, title, fenced = 0, "", False
+    for line in markdown.split("\n"):
+        if line.lstrip().startswith("```"):
+            fenced = not fenced
+        match = None if fenced else _HEADING.match(line)
+        if match:
+            if lines and (level or "".join(lines).strip()):
+                blocks.append(MarkdownBlock(level, title, "\n".join(lines).strip("\n")))
+            level, title, lines = len(match.group(1)), match.group(2), []
+        lines.append(line)
+    if lines and (level or "".join(lines).strip()):
+        blocks.append(MarkdownBlock(level, title, "\n".join(lines).strip("\n")))
+    return blocks
+
+
+def select_blocks(markdown: str, pattern: re.Pattern, fallback: bool = True) -> str:
+    """The blocks whose text matches ``pattern``, plus the document preamble.
+
+    With ``fallback`` the whole document is returned when nothing matches, so
+    a slice is never emptier than it has to be.
+    """
+    blocks = split_blocks(markdown)
+    selected = [block for block in blocks if block.level and pattern.search(block.text)]
+    if not selected:
+        return markdown if fallback else ""
+    preamble = [block for block in blocks[:1] if not block.level]
+    return "\n\n".join(block.text for block in preamble + selected)
+
+
+def parse_tables(markdown: str) -> list[list[dict[str, str]]]:
+    """Every pipe table in the document as a list of rows keyed by header."""
+    tables, rows = [], []
+    for line in markdown.split("\n") + [""]:
+        if _TABLE_ROW.match(line):
+            rows.append(_cells(line))
+            continue
+        if len(rows) >= 2 and all(_SEPARATOR_CELL.match(cell) for cell in rows[1]):
+            headers = rows[0]
+            tables.append([dict(zip(headers, row + [""] * (len(headers) - len(row)))) for row in rows[2:]])
+        rows = []
+    return tables
+
+
+def table_with_column(markdown: str, column: str) -> list[dict[str, str]]:
+    """The rows of the first table that has ``column`` among its headers."""
+    return next((table for table in parse_tables(markdown) if table and column in table[0]), [])
+
+
+def fill_section(markdown: str, title: str, content: str, before: str | None = None) -> str:
+    """Set the body of the first section whose heading contains ``title``.
+
+    Without such a heading a ``## title`` section is inserted ahead of the
+    first heading containing ``before``, or at the end of the document.
+    """
+    blocks = split_blocks(markdown)
+    texts = [block.text for block in blocks]
+    position = next((i for i, block in enumerate(blocks) if title.lower() in block.title.lower()), None)
+    if position is not None:
+        texts[position] = "\n\n".join([texts[position].split("\n")[0], content])
+    else:
+        position = next(
+            (i for i, block in enumerate(blocks) if before and before.lower() in block.title.lower()), len(blocks)
+        )
+        texts.insert(position, f"## {title}\n\n{content}")
+    return "\n\n".join(texts)
+
+
+def plain(cell: str) -> str:
+    """Table cell text without emphasis or code markers."""
+    return re.sub(r"[*`]", "", cell).strip()
+
+
+def _cells(line: str) -> list[str]:
+    return [cell.strip() for cell in re.split(r"(?<!\\)\|", line.strip()[1:-1])]
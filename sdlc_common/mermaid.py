@@ -0,0 +1,237 @@
+"""Validation and repair of the Mermaid diagrams in generated markdown.
+
+Covers the sequenceDiagram and flowchart subsets the sequence diagram and
+architecture overview agents produce. Each fenced ```mermaid block is parsed
+line by line; the failure patterns the frontend renderer trips over (missing
+diagram header, parentheses in subgraph names or bare node labels, the &
+operator, quoted message labels, spaces in participant aliases, undeclared
+participants, unbalanced blocks, unclosed fences) are fixed in place, and
+anything that cannot be fixed is reported.
+"""
+
+import re
+from dataclasses import dataclass
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from sdlc_common.callbacks import replace_text, response_text
+
+MAX_MESSAGE_LABEL = 60
+
+_FENCE = re.compile(r"^```mermaid[ \t]*\n(.*?)(?:(?P<close>^```[ \t]*$)|\Z)", re.DOTALL | re.MULTILINE)
+_SEQUENCE_ARROW = re.compile(
+    r"^(?P<source>[^\s:>-][^:>]*?)\s*(?P<arrow>-->>|->>|-->|->|--x|-x|--\)|-\))(?P<activation>[+-]?)\s*"
+    r"(?P<target>[^:]+?)\s*:\s*(?P<label>.*)$"
+)
+_PARTICIPANT = re.compile(r"^(?P<kind>participant|actor)\s+(?P<alias>.+?)(?:\s+as\s+(?P<label>.+))?$")
+_NOTE = re.compile(r"^(?P<position>Note\s+(?:left of|right of|over)\s+)(?P<targets>[^:]+):\s*.+$", re.IGNORECASE)
+_BLOCK_START = re.compile(r"^(alt|opt|loop|par|critical|break|rect|box)\b")
+_BLOCK_MIDDLE = re.compile(r"^(else|and|option)\b")
+_SEQUENCE_KEYWORDS = re.compile(r"^(activate|deactivate|autonumber|title|create|destroy|links?)\b")
+_FLOWCHART_HEADER = re.compile(r"^(flowchart|graph)(\s+(TB|TD|BT|RL|LR))?\s*$")
+_SUBGRAPH = re.compile(r"^subgraph\s+(?P<title>.+?)\s*$")
+_SUBGRAPH_WITH_ID = re.compile(r'^[\w-]+\s*\[".*"\]$|^[\w-]+\s*\[[^\]()]*\]$')
+_FLOW_EDGE = re.compile(r"\s*(-->|---|-\.->|==>|--[^->]+-->|-->\|[^|]*\|)\s*")
+_UNQUOTED_PAREN_LABEL = re.compile(r"\b([\w-]+)\[(?![\"(\[/\\])([^\]\"]*\([^\]\"]*)\]")
+_NESTED_ROUND_LABEL = re.compile(r"\b([\w-]+)\((?![(\[])([^()\"]*\([^()]*\)[^()\"]*)\)")
+
+
+@dataclass
+class MermaidIssue:
+    block: int
+    line: int
+    message: str
+    fixed: bool
+
+
+def fix_markdown(markdown: str) -> tuple[str, list[MermaidIssue]]:
+    """Validate and repair every mermaid block in a markdown document."""
+    issues = []
+    pieces, position = [], 0
+    for index, match in enumerate(_FENCE.finditer(markdown), start=1):
+        code, block_issues = fix_block(match.group(1), index)
+        issues += block_issues
+        if match.group("close") is None:
+            issues.append(MermaidIssue(index, 0, "mermaid fence was not closed", True))
+        pieces += [markdown[position:match.start()], "```mermaid\n", code.rstrip("\n"), "\n```"]
+        position = match.end()
+        if position < len(markdown) and markdown[position] != "\n":
+            pieces.append("\n")
+    pieces.append(markdown[position:])
+    return "".join(pieces), issues
+
+
+def fix_block(code: str, block: int = 1) -> tuple[str, list[MermaidIssue]]:
+    lines = [line.rstrip() for line in code.strip("\n").split("\n")]
+    header = next((line.strip() for line in lines if line.strip() and not line.strip().startswith("%%")), "")
+    if header == "sequenceDiagram":
+        return _fix_sequence(lines, block)
+    if _FLOWCHART_HEADER.match(header):
+        return _fix_flowchart(lines, block)
+    if any(_SEQUENCE_ARROW.match(line.strip()) for line in lines):
+        fixed, issues = _fix_sequence(["sequenceDiagram", *lines], block)
+        return fixed, [MermaidIssue(block, 1, "missing sequenceDiagram header", True), *issues]
+    if any(_FLOW_EDGE.search(line) for line in lines):
+        fixed, issues = _fix_flowchart(["flowchart TB", *lines], block)
+        return fixed, [MermaidIssue(block, 1, "missing flowchart header", True), *issues]
+    return "\n".join(lines), [MermaidIssue(block, 1, f"unsupported or missing diagram type: {header[:40]!r}", False)]
+
+
+def validate_markdown(markdown: str) -> list[MermaidIssue]:
+    """Issues in the document as generated, fixed or not."""
+    return fix_markdown(markdown)[1]
+
+
+def fix_mermaid_diagrams(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: repair the response's diagrams and record what could not be fixed."""
+    if llm_response.partial:
+        return None
+    text = response_text(llm_response)
+    fixed, issues = fix_markdown(text)
+    callback_context.state["mermaid_issues"] = [issue.__dict__ for issue in issues if not issue.fixed]
+    return replace_text(llm_response, fixed) if fixed != text else None
+
+
+def _fix_sequence(lines: list[str], block: int) -> tuple[str, list[MermaidIssue]]:
+    issues, output, depth = [], [], 0
+    declared, used = [], []
+    # Aliases with spaces ("participant Angular SPA") become "participant AngularSPA as Angular SPA".
+    renames = {
+        match.group("alias"): re.sub(r"\W+", "", match.group("alias"))
+        for match in map(_PARTICIPANT.match, (line.strip() for line in lines))
+        if match and re.search(r"\s", match.group("alias"))
+    }
+    for number, raw in enumerate(lines, start=1):
+        indent, line = raw[: len(raw) - len(raw.lstrip())], raw.strip()
+        if not line or line.startswith("%%") or line == "sequenceDiagram":
+            output.append(raw)
+            continue
+        if match := _PARTICIPANT.match(line):
+            alias = match.group("alias")
+            if alias in renames:
+                raw = f"{indent}{match.group('kind')} {renames[alias]} as {match.group('label') or alias}"
+                issues.append(MermaidIssue(block, number, f"space in participant alias {alias!r}", True))
+            declared.append(renames.get(alias, alias))
+        elif match := _SEQUENCE_ARROW.match(line):
+            source, target = (renames.get(name, name) for name in (match.group("source"), match.group("target")))
+            label = match.group("label")
+            if len(label) >= 2 and label[0] == label[-1] and label[0] in "\"'":
+                label = label[1:-1]
+                issues.append(MermaidIssue(block, number, "quoted message label", True))
+            if len(label) > MAX_MESSAGE_LABEL:
+                issues.append(MermaidIssue(block, number, f"message label longer than {MAX_MESSAGE_LABEL} characters", False))
+            raw = f"{indent}{source}{match.group('arrow')}{match.group('activation')}{target}: {label}"
+            used += [source, target]
+        elif match := _NOTE.match(line):
+            targets = ",".join(renames.get(name.strip(), name.strip()) for name in match.group("targets").split(","))
+            raw = f"{indent}{match.group('position')}{targets}{line[match.end('targets'):]}"
+        elif _BLOCK_START.match(line):
+            depth += 1
+        elif _BLOCK_MIDDLE.match(line):
+            if depth == 0:
+                issues.append(MermaidIssue(block, number, f"{line.split()[0]} outside of a block", False))
+        elif line == "end":
+            if depth == 0:
+                issues.append(MermaidIssue(block, number, "end without a matching block", True))
+                continue
+            depth -= 1
+        elif not _SEQUENCE_KEYWORDS.match(line):
+            issues.append(MermaidIssue(block, number, f"unrecognized statement: {line[:40]!r}", False))
+        output.append(raw)
+    if depth:
+        issues.append(MermaidIssue(block, len(lines), f"{depth} unclosed block(s)", True))
+        output += ["end"] * depth
+
+    missing = list(dict.fromkeys(alias for alias in used if alias not in declared))
+    if declared and missing:
+        header = next((index for index, raw in enumerate(output) if raw.strip() == "sequenceDiagram"), -1)
+        position = header + 1
+        while position < len(output) and _PARTICIPANT.match(output[position].strip()):
+            position += 1
+        output[position:position] = [f"    participant {alias}" for alias in missing]
+        issues.append(MermaidIssue(block, 0, f"undeclared participants: {', '.join(missing)}", True))
+    return "\n".join(output), issues
+
+
+def _fix_flowchart(lines: list[str], block: int) -> tuple[str, list[MermaidIssue]]:
+    issues, output, depth = [], [], 0
+    for number, raw in enumerate(lines, start=1):
+        indent, line = raw[: len(raw) - len(raw.lstrip())], raw.strip()
+        if match := _SUBGRAPH.match(line):
+            depth += 1
+            title = match.group("title")
+            if ("(" in title or ")" in title) and not _SUBGRAPH_WITH_ID.match(title):
+                identifier = re.sub(r"\W+", "_", re.sub(r"\(.*?\)", "", title)).strip("_") or f"group{number}"
+                raw = f'{indent}subgraph {identifier}["{title.replace(chr(34), "")}"]'
+                issues.append(MermaidIssue(block, number, "parentheses in subgraph name", True))
+            output.append(raw)
+            continue
+        if line == "end":
+            if depth == 0:
+                issues.append(MermaidIssue(block, number, "end without a matching subgraph", True))
+                continue
+            depth -= 1
+            output.append(raw)
+            continue
+
+        fixed_line = _UNQUOTED_PAREN_LABEL.sub(lambda m: f'{m.group(1)}["{m.group(2)}"]', line)
+        fixed_line = _NESTED_ROUND_LABEL.sub(lambda m: f'{m.group(1)}["{m.group(2)}"]', fixed_line)
+        if fixed_line != line:
+            issues.append(MermaidIssue(block, number, "parentheses in an unquoted node label", True))
+        if "&" in _strip_labels(fixed_line) and _FLOW_EDGE.search(fixed_line):
+            expanded = _expand_ampersands(fixed_line)
+            if expanded and len(expanded) > 1:
+                output += [indent + edge for edge in expanded]
+                issues.append(MermaidIssue(block, number, "& operator in an edge", True))
+                continue
+            issues.append(MermaidIssue(block, number, "& operator in an edge", False))
+        output.append(indent + fixed_line)
+    if depth:
+        issues.append(MermaidIssue(block, len(lines), f"{depth} unclosed subgraph(s)", True))
+        output += ["end"] * depth
+    return "\n".join(output), issues
+
+
+def _expand_ampersands(line: str) -> list[str] | None:
+    """A & B --> C & D becomes four single edges. Returns None for chained edges."""
+    parts = _FLOW_EDGE.split(line)
+    if len(parts) != 3:
+        return None
+    sources, arrow, targets = parts
+    edges, defined = [], set()
+    for source in _split_ampersand(sources):
+        for target in _split_ampersand(targets):
+            # Only the first mention of a node keeps its label and shape.
+            ends = [node if node not in defined else _node_id(node) for node in (source, target)]
+            defined.update((source, target))
+            edges.append(f"{ends[0]} {arrow} {ends[1]}")
+    return edges
+
+
+def _split_ampersand(nodes: str) -> list[str]:
+    parts, depth, quoted, current = [], 0, False, []
+    for char in nodes:
+        # Quotes open and close on the same character, so they toggle rather than nest.
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in "[({":
+            depth += 1
+        elif not quoted and char in "])}" and depth:
+            depth -= 1
+        if char == "&" and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _node_id(node: str) -> str:
+    match = re.match(r"[\w-]+", node)
+    return match.group(0) if match else node
+
+
+def _strip_labels(line: str) -> str:
+    return re.sub(r'"[^"]*"|\[[^\]]*\]|\([^)]*\)|\{[^}]*\}|\|[^|]*\|', "", line)
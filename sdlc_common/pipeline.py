@@ -0,0 +1,79 @@
+"""Agent compositions for generating one document in parallel parts.
+
+A document agent can be split into one LlmAgent per section, run together
+under a ParallelAgent, each writing its text to session state through its
+output_key. A StitchAgent then assembles the final document from state
+without another model call, so latency is that of the slowest section. When
+the parts are only known at run time (one per entity of a data model), a
+FanOutAgent builds them from state and runs them the same way.
+"""
+
+from collections.abc import AsyncGenerator, Callable
+
+from google.adk.agents import BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from sdlc_common.callbacks import content_text
+
+
+class StitchAgent(BaseAgent):
+    """Builds the final response from session state.
+
+    ``assemble`` receives the session state and the text of the user message
+    and returns the document text and any state changes to record alongside it.
+    """
+
+    assemble: Callable[[dict, str], tuple[str, dict]]
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        text, state_delta = self.assemble(dict(ctx.session.state), content_text(ctx.user_content))
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+class FanOutAgent(BaseAgent):
+    """Runs one agent per item of a list computed at run time, concurrently.
+
+    ``items`` receives the session state and the text of the user message;
+    ``make_agent`` builds the agent for the item at a given index. The agents
+    are created afresh for every invocation, so their names and output keys
+    can carry the index.
+    """
+
+    items: Callable[[dict, str], list]
+    make_agent: Callable[[int, object], BaseAgent]
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        items = self.items(dict(ctx.session.state), content_text(ctx.user_content))
+        if not items:
+            return
+        parallel = ParallelAgent(
+            name=f"{self.name}_items",
+            sub_agents=[self.make_agent(index, item) for index, item in enumerate(items)],
+        )
+        async for event in parallel.run_async(ctx):
+            yield event
+
+
+def parallel_document_agent(
+    name: str,
+    description: str,
+    parts: list[BaseAgent],
+    assemble: Callable[[dict, str], tuple[str, dict]],
+) -> SequentialAgent:
+    """Run ``parts`` concurrently, then stitch their state outputs into one response."""
+    return SequentialAgent(
+        name=name,
+        description=description,
+        sub_agents=[
+            ParallelAgent(name=f"{name}_parts", sub_agents=parts),
+            StitchAgent(name=f"{name}_stitch", assemble=assemble),
+        ],
+    )
@@ -0,0 +1,320 @@
+"""Parsed PRD: the Epic → Story → Task tree of a generated PRD, indexed by number.
+
+The PRD agent writes ``## EPIC 1: Title``, ``### STORY 1.1: Title`` and
+``#### TASK 1.1.1: Title`` headings, each followed by ``**Field:** value``
+lines (Summary, Priority, Labels, Scenario/Given/When/Then, Component,
+Description) and bullet lists (Acceptance Criteria, Success Metrics). The
+parser reads them in one pass over the lines, and ``iter_prd`` streams the
+nodes without building the tree. Numbers are optional in the headings
+(``### STORY: Title``) and are then assigned in document order. Lines tagged
+"please confirm with PM" or "{confirm with PM}" are collected on their node.
+
+``load_prd`` parses each distinct PRD once per process, and once overall when
+SDLC_CACHE_DIR is set, keyed by the hash of its text. Parsed trees are shared
+between callers and must not be modified.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+
+from sdlc_common.cache import fingerprint, named_cache
+
+PARSER_VERSION = 1
+MEMORY_CACHE_SIZE = 32
+
+_HEADING = re.compile(
+    r"^(?P<hashes>#{1,6})\s+(?P<kind>EPIC|STORY|TASK)\b\s*(?P<number>\d+(?:\.\d+)*)?\.?\s*[:\-—–]?\s*"
+    r"(?P<title>.*?)\s*$",
+    re.IGNORECASE,
+)
+_OTHER_HEADING = re.compile(r"^(?P<hashes>#{1,6})\s+(?P<title>.*?)\s*$")
+_FIELD = re.compile(r"^\*\*(?P<key>[A-Za-z /]+?):?\*\*:?\s*(?P<value>.*?)\s*$")
+_STATEMENT = re.compile(r"^\*\*As an?\*\*", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*+]|\d+\.)\s+(?P<item>.+?)\s*$")
+_CONFIRM = re.compile(r"\bconfirm with PM\b", re.IGNORECASE)
+
+# Field labels, lower-cased, mapped to node attributes.
+FIELDS = {
+    "summary": "summary",
+    "priority": "priority",
+    "labels": "labels",
+    "scenario": "scenario",
+    "given": "given",
+    "when": "when",
+    "then": "then",
+    "component": "component",
+    "description": "description",
+}
+LISTS = {"acceptance criteria": "acceptance_criteria", "success metrics": "success_metrics"}
+
+
+class Node:
+    __slots__ = ("number", "title", "level", "line", "summary", "priority", "labels", "confirmations", "body")
+    kind = ""
+
+    def __init__(self, number: str, title: str, level: int = 0, line: int = 0):
+        self.number = number
+        self.title = title
+        self.level = level
+        self.line = line
+        self.summary = ""
+        self.priority = ""
+        self.labels: list[str] = []
+        self.confirmations: list[str] = []
+        self.body = ""
+
+    def to_dict(self) -> dict:
+        values = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                value = getattr(self, name)
+                if isinstance(value, list) and value and isinstance(value[0], Node):
+                    value = [child.to_dict() for child in value]
+                values[name] = value
+        return values
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "Node":
+        node = cls(values["number"], values["title"])
+        for klass in cls.__mro__:
+            for name in getattr(klass, "__slots__", ()):
+                if name in values and name not in CHILDREN.get(cls.kind, ()):
+                    setattr(node, name, values[name])
+        return node
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.number!r}, {self.title!r})"
+
+
+class Task(Node):
+    __slots__ = ("story", "component", "description")
+    kind = "task"
+
+    def __init__(self, number: str, title: str, level: int = 0, line: int = 0):
+        super().__init__(number, title, level, line)
+        self.story = ""
+        self.component = ""
+        self.description = ""
+
+
+class Story(Node):
+    __slots__ = ("epic", "scenario", "given", "when", "then", "acceptance_criteria", "tasks")
+    kind = "story"
+
+    def __init__(self, number: str, title: str, level: int = 0, line: int = 0):
+        super().__init__(number, title, level, line)
+        self.epic = ""
+        self.scenario = ""
+        self.given = ""
+        self.when = ""
+        self.then = ""
+        self.acceptance_criteria: list[str] = []
+        self.tasks: list[Task] = []
+
+
+class Epic(Node):
+    __slots__ = ("statement", "success_metrics", "stories")
+    kind = "epic"
+
+    def __init__(self, number: str, title: str, level: int = 0, line: int = 0):
+        super().__init__(number, title, level, line)
+        self.statement = ""
+        self.success_metrics: list[str] = []
+        self.stories: list[Story] = []
+
+
+CHILDREN = {"epic": ("stories",), "story": ("tasks",)}
+
+
+class Prd:
+    """A parsed PRD with every epic, story and task indexed by number."""
+
+    __slots__ = ("executive_summary", "epics", "stories", "tasks", "index")
+
+    def __init__(self, executive_summary: str = "", epics: list[Epic] | None = None):
+        self.executive_summary = executive_summary
+        self.epics = epics or []
+        self.stories = [story for epic in self.epics for story in epic.stories]
+        self.tasks = [task for story in self.stories for task in story.tasks]
+        self.index: dict[str, Node] = {}
+        for node in [*self.epics, *self.stories, *self.tasks]:
+            self.index.setdefault(node.number, node)
+
+    def get(self, number: str) -> Node | None:
+        return self.index.get(number)
+
+    def confirmations(self) -> list[tuple[str, str]]:
+        """Every (number, line) tagged for PM confirmation, in document order."""
+        nodes = [node for epic in self.epics for node in _walk(epic)]
+        return [(node.number, line) for node in nodes for line in node.confirmations]
+
+    def to_dict(self) -> dict:
+        return {"executive_summary": self.executive_summary, "epics": [epic.to_dict() for epic in self.epics]}
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "Prd":
+        epics = []
+        for epic_values in values.get("epics") or []:
+            epic = Epic.from_dict(epic_values)
+            for story_values in epic_values.get("stories") or []:
+                story = Story.from_dict(story_values)
+                story.tasks = [Task.from_dict(task_values) for task_values in story_values.get("tasks") or []]
+                epic.stories.append(story)
+            epics.append(epic)
+        return cls(values.get("executive_summary", ""), epics)
+
+
+def parse_prd(markdown: str) -> Prd:
+    """Parse PRD markdown into its tree; text outside the Epic tree is ignored."""
+    executive_summary: list[str] = []
+    epics: list[Epic] = []
+    for node in iter_prd(markdown.split("\n"), executive_summary):
+        if isinstance(node, Epic):
+            epics.append(node)
+        elif isinstance(node, Story):
+            epics[-1].stories.append(node)
+        else:
+            epics[-1].stories[-1].tasks.append(node)
+    return Prd("\n".join(executive_summary).strip(), epics)
+
+
+def iter_prd(lines: Iterable[str], executive_summary: list[str] | None = None) -> Iterator[Node]:
+    """Yield every epic, story and task in document order, each once its text has been read.
+
+    Children are not attached to their parents, and only the open epic and
+    story are remembered, so a PRD read line by line streams in constant
+    memory. A parent always comes before its children. Executive Summary lines
+    are appended to ``executive_summary`` when it is given.
+    """
+    numbering = _Numbering()
+    node: Node | None = None
+    body: list[str] = []
+    current_list: str | None = None
+    in_summary = False
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        heading = _HEADING.match(line)
+        if heading:
+            if node is not None:
+                node.body = "\n".join(body).strip()
+                yield node
+            *implied, node = numbering.open(
+                heading["kind"].lower(), heading["number"] or "", heading["title"], len(heading["hashes"]), number
+            )
+            yield from implied
+            body, current_list, in_summary = [], None, False
+            continue
+        other = _OTHER_HEADING.match(line)
+        if other and len(other["hashes"]) <= 2:
+            # Any other top-level section (Executive Summary, Out of Scope, ...) ends the current node.
+            if node is not None:
+                node.body = "\n".join(body).strip()
+                yield node
+            node, body, current_list = None, [], None
+            in_summary = "executive summary" in other["title"].lower()
+            continue
+        if node is None:
+            if in_summary and executive_summary is not None and line.strip() != "---":
+                executive_summary.append(line)
+            continue
+        body.append(line)
+        if _CONFIRM.search(line):
+            node.confirmations.append(line.strip())
+        if other:
+            attribute = LISTS.get(other["title"].strip(" :*").lower())
+            current_list = attribute if hasattr(node, attribute or "") else None
+            continue
+        current_list = _read_line(node, line, current_list)
+    if node is not None:
+        node.body = "\n".join(body).strip()
+        yield node
+
+
+def load_prd(markdown: str) -> Prd:
+    """Parse a PRD, reusing the parse of an identical PRD from memory or SDLC_CACHE_DIR."""
+    key = fingerprint(PARSER_VERSION, markdown)
+    prd = _parsed.get(key)
+    if prd is not None:
+        return prd
+    cache = named_cache("prd")
+    stored = cache.get(key) if cache else None
+    prd = Prd.from_dict(stored) if stored else parse_prd(markdown)
+    if cache and not stored:
+        cache.put(key, prd.to_dict())
+    if len(_parsed) >= MEMORY_CACHE_SIZE:
+        _parsed.pop(next(iter(_parsed)))
+    _parsed[key] = prd
+    return prd
+
+
+_parsed: dict[str, Prd] = {}
+
+
+class _Numbering:
+    """The open epic and story, for numbering headings that carry no number."""
+
+    def __init__(self):
+        self.epic: Epic | None = None
+        self.story: Story | None = None
+        self.epics = self.stories = self.tasks = 0
+
+    def open(self, kind: str, number: str, title: str, level: int, line: int) -> list[Node]:
+        """The new node, preceded by any parent its heading implies but the PRD left out."""
+        if kind == "epic":
+            return [self._epic(number, title, level, line)]
+        implied: list[Node] = []
+        if self.epic is None:
+            implied.append(self._epic("", "", 0, line))
+        if kind == "story":
+            return implied + [self._story(number, title, level, line)]
+        if self.story is None:
+            implied.append(self._story("", "", 0, line))
+        self.tasks += 1
+        task = Task(number or f"{self.story.number}.{self.tasks}", title, level, line)
+        task.story = self.story.number
+        return implied + [task]
+
+    def _epic(self, number: str, title: str, level: int, line: int) -> Epic:
+        self.epics += 1
+        self.epic = Epic(number or str(self.epics), title, level, line)
+        self.story, self.stories = None, 0
+        return self.epic
+
+    def _story(self, number: str, title: str, level: int, line: int) -> Story:
+        self.stories += 1
+        self.story = Story(number or f"{self.epic.number}.{self.stories}", title, level, line)
+        self.story.epic = self.epic.number
+        self.tasks = 0
+        return self.story
+
+
+def _read_line(node: Node, line: str, current_list: str | None) -> str | None:
+    """Record a field, statement or list item on the node; returns the list being read, if any."""
+    text = line.strip()
+    if _STATEMENT.match(text):
+        if isinstance(node, Epic):
+            node.statement = text
+        return None
+    field = _FIELD.match(text)
+    if field:
+        key = field["key"].strip().lower()
+        if key in LISTS:
+            return LISTS[key] if hasattr(node, LISTS[key]) else None
+        attribute = FIELDS.get(key)
+        if attribute == "labels":
+            node.labels = [label.strip() for label in field["value"].split(",") if label.strip()]
+        elif attribute and hasattr(node, attribute):
+            setattr(node, attribute, field["value"])
+        return None
+    bullet = _BULLET.match(line)
+    if bullet and current_list:
+        getattr(node, current_list).append(bullet["item"])
+        return current_list
+    return current_list if not text else None
+
+
+def _walk(node: Node):
+    yield node
+    for name in CHILDREN.get(node.kind, ()):
+        for child in getattr(node, name):
+            yield from _walk(child)
@@ -0,0 +1,152 @@
+"""One PRD digest per PRD, shared by the five GTM agents.
+
+The GTM agents (KPIs, launch plan, press release, marketing materials,
+feature notes) each expect a short PRD SUMMARY and, for some, a PRODUCT
+DESCRIPTION. When their message carries the full PRD instead (as a PRODUCT
+REQUIREMENTS DOCUMENT section, or a PRD SUMMARY section that parses as a full
+PRD), ``use_prd_digest`` swaps it for the digest before the model call.
+
+The digest is written by one small call from a local outline of the parsed
+PRD (executive summary, epics with their story summaries, success metrics),
+not from the PRD text. It is computed once per PRD hash: concurrent GTM calls
+for the same PRD wait for the same digest, and with SDLC_CACHE_DIR set it is
+kept across runs. If the call fails, the outline itself is used as summary
+for the calls waiting on it, but it is not kept: the next call for that PRD
+tries the digest again.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.cache import fingerprint, named_cache
+from sdlc_common.callbacks import load_json, replace_request_text, user_text
+from sdlc_common.context import Section, parse_context, render_context
+from sdlc_common.llm import generate_text
+from sdlc_common.prd import Prd, load_prd
+
+DIGEST_VERSION = 2  # version 1 entries may be a cached fallback
+DIGEST_MODEL = "gemini-2.0-flash"
+MAX_STORIES_PER_EPIC = 8
+
+DIGEST_INSTRUCTION = """
+You are a senior product manager condensing a PRD outline for go-to-market writers (launch plan, KPIs,
+press release, marketing materials, release notes). Return ONLY a JSON object with these keys:
+- "productName": the product's name as the PRD uses it, or "" if it never names it
+- "summary": a Markdown PRD summary of 200-350 words: one paragraph on what the product does, for whom and the
+  MVP scope; then "Key features" as bullets, one per epic, each naming its most important concrete capabilities;
+  then "Target users" and "Success metrics" bullets. Keep every named system, role, number and metric verbatim.
+- "description": a 1-2 sentence product description a marketer could reuse as-is.
+Use only what the outline states. Do not invent pricing, dates or metrics.
+"""
+
+
+@dataclass
+class PrdDigest:
+    product_name: str
+    summary: str
+    description: str
+    fallback: bool = False  # the local outline, used because the digest call failed
+
+
+def prd_outline(prd: Prd) -> str:
+    """The parts of a PRD the digest is written from, a fraction of its length."""
+    lines = []
+    if prd.executive_summary:
+        lines += ["EXECUTIVE SUMMARY", prd.executive_summary, ""]
+    lines.append("EPICS")
+    for epic in prd.epics:
+        lines.append(f"{epic.number}. {epic.title}" + (f" — {epic.summary}" if epic.summary else ""))
+        if epic.statement:
+            lines.append(f"   {epic.statement.replace('**', '')}")
+        stories = [story.summary or story.title for story in epic.stories]
+        if stories:
+            extra = len(stories) - MAX_STORIES_PER_EPIC
+            lines.append("   Stories: " + "; ".join(stories[:MAX_STORIES_PER_EPIC])
+                         + (f"; and {extra} more" if extra > 0 else ""))
+        if epic.success_metrics:
+            lines.append("   Success metrics: " + "; ".join(epic.success_metrics))
+    return "\n".join(lines).strip()
+
+
+def local_digest(prd: Prd, product_name: str = "") -> PrdDigest:
+    """A digest made without a model call, from the outline and the executive summary."""
+    first_sentence = prd.executive_summary.split(". ")[0].rstrip(".")
+    return PrdDigest(product_name, prd_outline(prd), first_sentence + "." if first_sentence else "", fallback=True)
+
+
+async def get_digest(markdown: str, product_name: str = "") -> PrdDigest:
+    """The digest of a PRD, computed at most once per PRD hash unless the call fails."""
+    key = fingerprint(DIGEST_VERSION, markdown, product_name)
+    if key in _digests:
+        return _digests[key]
+    cache = named_cache("prd_digest")
+    stored = cache.get(key) if cache else None
+    if stored:
+        _digests[key] = PrdDigest(**stored)
+        return _digests[key]
+    if key not in _pending:
+        _pending[key] = asyncio.ensure_future(_build_digest(load_prd(markdown), product_name))
+    try:
+        digest = await _pending[key]
+    finally:
+        _pending.pop(key, None)
+    if digest.fallback:
+        return digest
+    _digests[key] = digest
+    if cache:
+        cache.put(key, asdict(digest))
+    return digest
+
+
+_digests: dict[str, PrdDigest] = {}
+_pending: dict[str, asyncio.Future] = {}
+
+
+async def use_prd_digest(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """before_model_callback: send the PRD digest in place of a full PRD."""
+    sections = parse_context(user_text(callback_context))
+    names = [section.name for section in sections]
+    prd_section = next(
+        (section for section in sections
+         if section.name == "PRODUCT REQUIREMENTS DOCUMENT"
+         or section.name == "PRD SUMMARY" and load_prd(section.body).stories),
+        None,
+    )
+    if prd_section is None or not load_prd(prd_section.body).epics:
+        return None
+    bodies = {section.name: section.body.strip() for section in sections}
+    product_name = bodies.get("PRODUCT NAME") or bodies.get("PROJECT NAME") or ""
+    digest = await get_digest(prd_section.body, product_name)
+    callback_context.state["prd_digest"] = asdict(digest)
+
+    rendered = []
+    for section in sections:
+        if section is prd_section:
+            rendered.append(Section("PRD SUMMARY", "PRD SUMMARY\n", digest.summary.strip() + "\n\n"))
+            if "PRODUCT DESCRIPTION" not in names and digest.description:
+                rendered.append(Section("PRODUCT DESCRIPTION", "PRODUCT DESCRIPTION\n", digest.description + "\n\n"))
+        elif section.name != "PRD SUMMARY":
+            rendered.append(section)
+    if not product_name and digest.product_name:
+        rendered.insert(0, Section("PRODUCT NAME", "PRODUCT NAME\n", digest.product_name + "\n\n"))
+    replace_request_text(llm_request, render_context(rendered))
+    return None
+
+
+async def _build_digest(prd: Prd, product_name: str) -> PrdDigest:
+    outline = prd_outline(prd)
+    prompt = f"PRODUCT NAME\n{product_name or 'Not given'}\n\nPRD OUTLINE\n{outline}\n"
+    try:
+        answer = load_json(await generate_text(DIGEST_MODEL, prompt, DIGEST_INSTRUCTION, json_output=True))
+    except Exception:  # the outline is a usable summary on its own
+        return local_digest(prd, product_name)
+    if not isinstance(answer, dict) or not answer.get("summary"):
+        return local_digest(prd, product_name)
+    return PrdDigest(
+        product_name or str(answer.get("productName") or ""),
+        str(answer["summary"]).strip(),
+        str(answer.get("description") or "").strip() or local_digest(prd).description,
+    )
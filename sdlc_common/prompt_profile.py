@@ -0,0 +1,294 @@
+"""Offline token profile of every agent's instruction, with a budget gate.
+
+The instruction of each <agent>/agent.py is read without importing it (see
+``sdlc_common.prompts``) and counted with the same characters-per-token
+estimate the chunking and routing use, so no model call or credentials are
+needed. The report shows:
+
+- each agent's instruction tokens, multiplied by how often the agent is
+  called, since the instruction is resent on every call. By default the call
+  counts are per project (screen generation runs once per screen). With
+  --observed they are the calls recorded in the prompt registry
+  (PROMPT_REGISTRY_DIR).
+- the largest sections of each instruction: markdown headings and
+  upper-case labels such as ``RULES:``. Headings of an output template (under
+  OUTPUT FORMAT, Document Structure, JSON SCHEMA and the like) belong to the
+  section describing that template.
+- lines repeated word for word across agents' instructions (shared
+  boilerplate), with the tokens they add up to.
+
+Agents in their parallel or map-reduce mode (ARCHITECTURE_OVERVIEW_MODE,
+SEQUENCE_DIAGRAMS_MODE, DATA_MODEL_MODE, API_CONTRACT_MODE,
+PRD_GENERATION_MODE, as set in the environment, or all of them with --modes)
+are profiled as the calls that mode makes instead: one line per distinct
+instruction, named after its sub-agent. Calls made once per entity, resource
+or transcript part count FAN_OUT_CALLS times per project. The prompt registry
+only records the instructions it serves, so with --observed the others (the
+fan-out calls, instructions built per call, agents not yet run with the
+registry) keep their per-project count.
+
+With --max-tokens or --budget, the exit status is 1 when an instruction goes
+over its budget, so the profile can gate local checks. Budgets are per profiled
+instruction, so a mode's calls are budgeted by their sub-agent names:
+
+    python -m sdlc_common.prompt_profile [--sections 5] [--observed] [--modes] [--calls screen_generation_agent=25]
+    python -m sdlc_common.prompt_profile --max-tokens 8000 --budget implementation_plan_agent=9000
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+
+from sdlc_common.prompt_registry import default_registry
+from sdlc_common.prompts import ROOT, PromptError, load_prompt
+from sdlc_common.tokens import estimate_tokens
+
+# Mode calls made once per entity, resource or transcript part, per project.
+FAN_OUT_CALLS = {
+    "data_model_agent_entity": 12,
+    "api_contract_agent_resource": 12,
+    "prd_generation_agent_extract": 3,
+}
+# Calls per project for agents called more than once; every other agent is called once.
+CALLS_PER_PROJECT = {"screen_generation_agent": 15, **FAN_OUT_CALLS}
+# The environment variable and value that switch an agent to its parallel or map-reduce mode.
+MODES = {
+    "api_contract_agent": ("API_CONTRACT_MODE", "parallel"),
+    "architecture_overview_agent": ("ARCHITECTURE_OVERVIEW_MODE", "parallel"),
+    "data_model_agent": ("DATA_MODEL_MODE", "parallel"),
+    "prd_generation_agent": ("PRD_GENERATION_MODE", "mapreduce"),
+    "sequence_diagrams_agent": ("SEQUENCE_DIAGRAMS_MODE", "parallel"),
+}
+MIN_SHARED_LINE = 30  # characters; shorter lines are too generic to count as boilerplate
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_LABEL = re.compile(r"^([A-Z][A-Z0-9 &/(),'\-]*[A-Z0-9)]):\s*$")
+_TEMPLATE = re.compile(r"output format|output rules|output structure|document structure|example output|schema|template",
+                       re.IGNORECASE)
+_FENCE = re.compile(r"^\s*```")
+
+
+@dataclass
+class Section:
+    title: str
+    tokens: int
+
+
+@dataclass
+class AgentProfile:
+    agent: str
+    tokens: int
+    calls: int
+    sections: list[Section] = field(default_factory=list)
+
+    @property
+    def weighted_tokens(self) -> int:
+        return self.tokens * self.calls
+
+
+@dataclass
+class SharedText:
+    agents: list[str]
+    lines: int
+    tokens: int  # per agent
+    sample: str
+
+
+def agent_names() -> list[str]:
+    return sorted(path.parent.name for path in ROOT.glob("*_agent/agent.py"))
+
+
+def split_sections(instruction: str) -> list[Section]:
+    """Token counts per heading or upper-case label; text before the first one is the preamble.
+
+    Inside a section describing the output (OUTPUT FORMAT, Document Structure,
+    ...), deeper headings and the output's own # title belong to the output
+    template, so they are counted with that section.
+    """
+    sections, title, lines, in_fence = [], "(preamble)", [], False
+    template_level = None  # level of the output template section being read; labels are level 0
+    for line in instruction.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        heading = None if in_fence else _heading(line)
+        if heading and template_level is not None and (
+            heading[0] > template_level or heading[0] == 1 < template_level
+        ):
+            heading = None
+        if heading:
+            if "".join(lines).strip():
+                sections.append(Section(title, estimate_tokens("\n".join(lines))))
+            (level, title), lines = heading, []
+            template_level = level if _TEMPLATE.search(title) else None
+        lines.append(line)
+    if "".join(lines).strip():
+        sections.append(Section(title, estimate_tokens("\n".join(lines))))
+    return sections
+
+
+def shared_text(instructions: dict[str, str]) -> list[SharedText]:
+    """Lines found in more than one agent's instruction, grouped by the set of agents sharing them."""
+    owners: dict[str, set[str]] = {}
+    for agent, instruction in instructions.items():
+        for line in instruction.splitlines():
+            key = " ".join(line.split())
+            if len(key) >= MIN_SHARED_LINE:
+                owners.setdefault(key, set()).add(agent)
+    groups: dict[tuple[str, ...], list[str]] = {}
+    for line, agents in owners.items():
+        if len(agents) > 1:
+            groups.setdefault(tuple(sorted(agents)), []).append(line)
+    shared = [
+        SharedText(list(agents), len(lines), sum(estimate_tokens(line) for line in lines), max(lines, key=len))
+        for agents, lines in groups.items()
+    ]
+    return sorted(shared, key=lambda item: item.tokens * len(item.agents), reverse=True)
+
+
+def mode_enabled(agent: str) -> bool:
+    variable, value = MODES.get(agent, ("", None))
+    return bool(variable) and os.getenv(variable) == value
+
+
+def mode_instructions(agent: str, instruction: str) -> dict[str, str]:
+    """The instruction of each distinct call the agent makes in its parallel or map-reduce mode, by sub-agent."""
+    if agent == "architecture_overview_agent":
+        from architecture_overview_agent.parallel import part_instructions
+        return {f"{agent}_{key}": text for key, text in part_instructions(instruction).items()}
+    if agent == "sequence_diagrams_agent":
+        from sequence_diagrams_agent.parallel import part_instructions
+        return {f"{agent}_{key}": text for key, text in part_instructions(instruction).items()}
+    if agent == "data_model_agent":
+        from data_model_agent.parallel import data_model_instructions
+        outline, entity = data_model_instructions(instruction)
+        return {f"{agent}_outline": outline, f"{agent}_entity": entity}
+    if agent == "api_contract_agent":
+        from api_contract_agent.parallel import contract_instructions
+        frame, resource = contract_instructions(instruction)
+        return {f"{agent}_frame": frame, f"{agent}_resource": resource}
+    if agent == "prd_generation_agent":
+        from prd_generation_agent.mapreduce import EXTRACT_INSTRUCTION, reduce_instruction
+        return {f"{agent}_extract": EXTRACT_INSTRUCTION, f"{agent}_reduce": reduce_instruction(instruction)}
+    return {}
+
+
+def agent_instructions(agents: list[str], all_modes: bool = False) -> dict[str, str]:
+    """Every instruction the agents send: the agent.py instruction, or its mode's calls when the mode is on."""
+    instructions = {}
+    for agent in agents:
+        instruction = load_prompt(agent).instruction
+        if agent in MODES and (all_modes or mode_enabled(agent)):
+            instructions.update(mode_instructions(agent, instruction))
+        else:
+            instructions[agent] = instruction
+    return instructions
+
+
+def profile(instructions: dict[str, str], calls: dict[str, int]) -> tuple[list[AgentProfile], list[SharedText]]:
+    profiles = [
+        AgentProfile(agent, estimate_tokens(instruction), calls.get(agent, 1), split_sections(instruction))
+        for agent, instruction in instructions.items()
+    ]
+    return sorted(profiles, key=lambda item: item.weighted_tokens, reverse=True), shared_text(instructions)
+
+
+def observed_calls(names: list[str]) -> dict[str, int]:
+    """Recorded calls per instruction the registry serves; the per-project count for the others."""
+    registry = default_registry()
+    if registry is None:
+        raise PromptError("--observed needs PROMPT_REGISTRY_DIR")
+    return {
+        name: len(registry.calls(name)) if registry.versions(name) else CALLS_PER_PROJECT.get(name, 1)
+        for name in names
+    }
+
+
+def over_budget(profiles: list[AgentProfile], max_tokens: int | None, budgets: dict[str, int]) -> list[str]:
+    failures = []
+    for item in profiles:
+        budget = budgets.get(item.agent, max_tokens)
+        if budget is not None and item.tokens > budget:
+            failures.append(f"{item.agent}: {item.tokens} instruction tokens, budget {budget}")
+    return failures
+
+
+def render_profile(profiles: list[AgentProfile], shared: list[SharedText], top_sections: int) -> str:
+    total = sum(item.weighted_tokens for item in profiles) or 1
+    width = max([32, *(len(item.agent) + 1 for item in profiles)])
+    lines = [f"{'Agent':<{width}} {'Tokens':>7} {'Calls':>6} {'Tokens x calls':>15} {'Share':>6}"]
+    for item in profiles:
+        lines.append(f"{item.agent:<{width}} {item.tokens:>7} {item.calls:>6} {item.weighted_tokens:>15} "
+                     f"{item.weighted_tokens / total:>6.1%}")
+    lines.append(f"{'Total':<{width}} {sum(item.tokens for item in profiles):>7} {'':>6} {total:>15}")
+    if top_sections:
+        for item in profiles:
+            lines += ["", f"{item.agent} — largest sections"]
+            for section in sorted(item.sections, key=lambda section: section.tokens, reverse=True)[:top_sections]:
+                lines.append(f"  {section.tokens:>6}  {section.title}")
+    if shared:
+        lines += ["", "Shared across agents (tokens per agent x agents)"]
+        for item in shared:
+            lines.append(f"  {item.tokens:>6} x {len(item.agents)}  {item.lines} line(s) in {', '.join(item.agents)}")
+            lines.append(f"          e.g. {item.sample[:100]}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--agents", nargs="+", help="agents to profile (default: every *_agent/agent.py)")
+    parser.add_argument("--sections", type=int, default=3, metavar="N", help="largest sections shown per agent")
+    parser.add_argument("--observed", action="store_true", help="use the call counts in the prompt registry")
+    parser.add_argument("--modes", action="store_true", help="profile every agent in its parallel or map-reduce mode")
+    parser.add_argument("--calls", nargs="+", default=[], metavar="AGENT=N", help="override an agent's call count")
+    parser.add_argument("--max-tokens", type=int, help="fail when any instruction is over this many tokens")
+    parser.add_argument("--budget", nargs="+", default=[], metavar="AGENT=TOKENS", help="per-agent token budget")
+    parser.add_argument("--json", action="store_true", help="print the profile as JSON")
+    args = parser.parse_args(argv)
+
+    agents = args.agents or agent_names()
+    try:
+        instructions = agent_instructions(agents, args.modes)
+        calls = observed_calls(list(instructions)) if args.observed else dict(CALLS_PER_PROJECT)
+        calls.update(_pairs(parser, args.calls))
+        profiles, shared = profile(instructions, calls)
+    except PromptError as error:
+        print(error, file=sys.stderr)
+        return 1
+    failures = over_budget(profiles, args.max_tokens, _pairs(parser, args.budget))
+
+    if args.json:
+        print(json.dumps({
+            "agents": [{**asdict(item), "weighted_tokens": item.weighted_tokens} for item in profiles],
+            "shared": [asdict(item) for item in shared],
+            "over_budget": failures,
+        }, indent=2, ensure_ascii=False))
+    else:
+        print(render_profile(profiles, shared, args.sections))
+    for failure in failures:
+        print(f"Over budget — {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _heading(line: str) -> tuple[int, str] | None:
+    if match := _HEADING.match(line):
+        return len(match.group(1)), match.group(2)
+    if match := _LABEL.match(line):
+        return 0, match.group(1)
+    return None
+
+
+def _pairs(parser: argparse.ArgumentParser, entries: list[str]) -> dict[str, int]:
+    pairs = {}
+    for entry in entries:
+        name, separator, value = entry.partition("=")
+        if not separator or not value.isdigit():
+            parser.error(f"expected AGENT=N, got {entry!r}")
+        pairs[name] = int(value)
+    return pairs
+
+
+if __name__ == "__main__":
+    sys.exit(main())
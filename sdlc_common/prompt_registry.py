@@ -0,0 +1,311 @@
+"""Versioned agent instructions with traffic splitting and per-version metrics.
+
+Enabled by setting PROMPT_REGISTRY_DIR. Each agent's instruction versions are
+stored there under the first 12 hex digits of their SHA-256, so a version id
+always names the same text. The instruction in agent.py is registered
+automatically when the agent is built. Other versions are added with the CLI,
+from a text file or from any agent.py (an archive copy, for example):
+
+    <PROMPT_REGISTRY_DIR>/<agent>/versions/<version>.txt
+    <PROMPT_REGISTRY_DIR>/<agent>/split.json     {"<version>": percent, ...}
+    <PROMPT_REGISTRY_DIR>/<agent>/calls.jsonl    one line per model call
+
+``versioned(agent)`` sends each session to a version drawn from the agent's
+split and keeps the session on it: the choice is stored under
+``prompt_versions`` in session state, which a caller can also preset to pin a
+version. Without a split, every session uses the agent.py instruction. Every
+model call appends its version, latency, token usage and outcome to
+calls.jsonl. A call fails on a model error, an empty response, or unparsable
+JSON from an agent whose instruction demands JSON. When a version's
+instruction cannot be swapped in (the request no longer holds the agent.py
+instruction), the call runs unchanged and is recorded for that version as a
+failed swap instead of as a call of either version. Calls answered by another
+before_model_callback (a cache, for example) are not recorded.
+
+    python -m sdlc_common.prompt_registry add implementation_plan_agent implementation_plan_agent/archive/agent.py
+    python -m sdlc_common.prompt_registry split implementation_plan_agent 3f2a9c01d4e5=90 7b1e0c9a2f64=10
+    python -m sdlc_common.prompt_registry stats implementation_plan_agent
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import (
+    chain_after_model_callbacks, chain_model_error_callbacks, load_json, response_text,
+)
+from sdlc_common.prompts import PromptError, expects_json, load_prompt
+from sdlc_common.tokens import estimate_tokens
+
+VERSION_LENGTH = 12
+SWAP_FAILED = "instruction swap failed: the agent.py instruction is not in the request's system instruction"
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryError(ValueError):
+    pass
+
+
+@dataclass
+class Call:
+    version: str
+    seconds: float
+    input_tokens: int
+    output_tokens: int
+    failed: bool
+    error: str = ""
+    at: float = 0.0
+
+
+def prompt_version(instruction: str) -> str:
+    return hashlib.sha256(instruction.encode()).hexdigest()[:VERSION_LENGTH]
+
+
+class PromptRegistry:
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+
+    def register(self, agent: str, instruction: str) -> str:
+        version = prompt_version(instruction)
+        path = self._versions(agent) / f"{version}.txt"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(instruction, encoding="utf-8")
+        return version
+
+    def instruction(self, agent: str, version: str) -> str | None:
+        try:
+            return (self._versions(agent) / f"{version}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def versions(self, agent: str) -> list[str]:
+        return sorted(path.stem for path in self._versions(agent).glob("*.txt"))
+
+    def split(self, agent: str) -> dict[str, float]:
+        try:
+            return json.loads((self.directory / agent / "split.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def set_split(self, agent: str, split: dict[str, float]) -> None:
+        """Route ``percent`` of new sessions to each version; the percentages must add up to 100."""
+        known = set(self.versions(agent))
+        unknown = sorted(set(split) - known)
+        if unknown:
+            raise RegistryError(f"unknown {agent} version(s): {', '.join(unknown)}")
+        if any(percent < 0 for percent in split.values()) or abs(sum(split.values()) - 100) > 1e-6:
+            raise RegistryError("split percentages must be non-negative and add up to 100")
+        (self.directory / agent).mkdir(parents=True, exist_ok=True)
+        (self.directory / agent / "split.json").write_text(json.dumps(split, indent=2), encoding="utf-8")
+
+    def choose(self, agent: str, default: str) -> str:
+        split = {version: percent for version, percent in self.split(agent).items() if percent > 0}
+        if not split:
+            return default
+        return random.choices(list(split), weights=list(split.values()))[0]
+
+    def record(self, agent: str, call: Call) -> None:
+        (self.directory / agent).mkdir(parents=True, exist_ok=True)
+        with open(self.directory / agent / "calls.jsonl", "a", encoding="utf-8") as file:
+            file.write(json.dumps(asdict(call)) + "\n")
+
+    def calls(self, agent: str) -> list[Call]:
+        try:
+            with open(self.directory / agent / "calls.jsonl", encoding="utf-8") as file:
+                return [Call(**json.loads(line)) for line in file if line.strip()]
+        except OSError:
+            return []
+
+    def stats(self, agent: str) -> list[dict]:
+        """Per version: traffic share, calls, failure rate, and latency and token usage of the answered calls."""
+        by_version: dict[str, list[Call]] = {version: [] for version in self.versions(agent)}
+        for call in self.calls(agent):
+            by_version.setdefault(call.version, []).append(call)
+        split = self.split(agent)
+        rows = []
+        for version, calls in by_version.items():
+            instruction = self.instruction(agent, version) or ""
+            answered = [call for call in calls if not call.error]
+            seconds = sorted(call.seconds for call in answered)
+            rows.append({
+                "version": version,
+                "split": split.get(version, 0),
+                "instruction_tokens": estimate_tokens(instruction),
+                "calls": len(calls),
+                "failure_rate": round(sum(call.failed for call in calls) / len(calls), 3) if calls else None,
+                "p50_seconds": round(statistics.median(seconds), 2) if seconds else None,
+                "p95_seconds": round(_p95(seconds), 2) if seconds else None,
+                "input_tokens": round(statistics.mean(call.input_tokens for call in answered)) if answered else None,
+                "output_tokens": round(statistics.mean(call.output_tokens for call in answered)) if answered else None,
+            })
+        return rows
+
+    def _versions(self, agent: str) -> Path:
+        return self.directory / agent / "versions"
+
+
+def default_registry() -> PromptRegistry | None:
+    directory = os.getenv("PROMPT_REGISTRY_DIR")
+    return PromptRegistry(directory) if directory else None
+
+
+def versioned(agent: BaseAgent) -> BaseAgent:
+    """Serve registered instruction versions to the agent and every LlmAgent below it, when enabled."""
+    registry = default_registry()
+    if registry is None:
+        return agent
+    if isinstance(agent, LlmAgent) and isinstance(agent.instruction, str) and agent.instruction:
+        _install(agent, registry)
+    for sub_agent in agent.sub_agents:
+        versioned(sub_agent)
+    return agent
+
+
+def _install(agent: LlmAgent, registry: PromptRegistry) -> None:
+    live = agent.instruction
+    live_version = registry.register(agent.name, live)
+    started: dict[str, tuple[str, float, bool]] = {}  # invocation id -> (version, start time, expects JSON)
+
+    def select_version(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        pinned = dict(callback_context.state.get("prompt_versions") or {})
+        version = pinned.get(agent.name)
+        instruction = registry.instruction(agent.name, version) if version else None
+        if instruction is None:
+            version = registry.choose(agent.name, live_version)
+            instruction = registry.instruction(agent.name, version)
+        if not instruction:
+            version, instruction = live_version, live
+        callback_context.state["prompt_versions"] = {**pinned, agent.name: version}
+        config = llm_request.config
+        if version != live_version:
+            if not config or live not in str(config.system_instruction or ""):
+                logger.warning("%s: cannot serve prompt version %s, %s", agent.name, version, SWAP_FAILED)
+                registry.record(agent.name, Call(version, 0.0, 0, 0, True, SWAP_FAILED, time.time()))
+                return None
+            config.system_instruction = config.system_instruction.replace(live, instruction)
+        started[callback_context.invocation_id] = (version, time.monotonic(), expects_json(instruction))
+        return None
+
+    async def unless_answered(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        # ADK skips the after_model_callbacks of a call answered here, so its start is dropped.
+        for callback in before:
+            result = callback(callback_context, llm_request)
+            if inspect.isawaitable(result):
+                result = await result
+            if result is not None:
+                started.pop(callback_context.invocation_id, None)
+                return result
+        return None
+
+    def record_call(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+        if llm_response.partial or callback_context.invocation_id not in started:
+            return None
+        version, start, json_output = started.pop(callback_context.invocation_id)
+        text = response_text(llm_response)
+        usage = llm_response.usage_metadata
+        registry.record(agent.name, Call(
+            version=version,
+            seconds=round(time.monotonic() - start, 3),
+            input_tokens=usage.prompt_token_count or 0 if usage else 0,
+            output_tokens=usage.candidates_token_count or 0 if usage else estimate_tokens(text),
+            failed=not text.strip() or json_output and load_json(text) is None,
+            at=time.time(),
+        ))
+        return None
+
+    def record_error(callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> None:
+        if callback_context.invocation_id in started:
+            version, start, _ = started.pop(callback_context.invocation_id)
+            registry.record(agent.name, Call(
+                version, round(time.monotonic() - start, 3), 0, 0, True, f"{type(error).__name__}: {error}",
+                time.time(),
+            ))
+
+    before = agent.before_model_callback
+    before = before if isinstance(before, list) else [before] if before else []
+    # First, so the callbacks after it see the instruction that will be sent.
+    agent.before_model_callback = [select_version, unless_answered] if before else [select_version]
+    after = agent.after_model_callback
+    after = after if isinstance(after, list) else [after] if after else []
+    agent.after_model_callback = chain_after_model_callbacks(record_call, *after)
+    agent.on_model_error_callback = chain_model_error_callbacks(record_error, agent.on_model_error_callback)
+
+
+def _p95(values: list[float]) -> float:
+    return values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dir", default=os.getenv("PROMPT_REGISTRY_DIR"), help="default: $PROMPT_REGISTRY_DIR")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="register an instruction version")
+    add.add_argument("agent")
+    add.add_argument("source", help="an agent.py whose Agent(...) instruction to register, or a text file")
+    split = commands.add_parser("split", help="set the traffic split")
+    split.add_argument("agent")
+    split.add_argument("shares", nargs="+", metavar="VERSION=PERCENT")
+    stats = commands.add_parser("stats", help="per-version latency, tokens and failure rate")
+    stats.add_argument("agent")
+    stats.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.dir:
+        parser.error("set PROMPT_REGISTRY_DIR or pass --dir")
+    registry = PromptRegistry(args.dir)
+    try:
+        if args.command == "add":
+            if args.source.endswith(".py"):
+                instruction = load_prompt(args.source).instruction
+            else:
+                instruction = Path(args.source).read_text(encoding="utf-8")
+            print(registry.register(args.agent, instruction))
+        elif args.command == "split":
+            shares = {}
+            for share in args.shares:
+                version, separator, percent = share.partition("=")
+                if not separator:
+                    parser.error(f"expected VERSION=PERCENT, got {share!r}")
+                shares[version] = float(percent)
+            registry.set_split(args.agent, shares)
+        else:
+            rows = registry.stats(args.agent)
+            if args.json:
+                print(json.dumps(rows, indent=2))
+            else:
+                for row in rows:
+                    print(f"{row['version']}  {row['split']:>5g}%  {row['instruction_tokens']:>6} instruction tokens  "
+                          f"{row['calls']:>5} calls  failures {_rate(row['failure_rate'])}  "
+                          f"p50 {_seconds(row['p50_seconds'])}  p95 {_seconds(row['p95_seconds'])}  "
+                          f"tokens in/out {row['input_tokens'] or 0}/{row['output_tokens'] or 0}")
+    except (RegistryError, PromptError, OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+def _rate(value: float | None) -> str:
+    return "—" if value is None else f"{value:.1%}"
+
+
+def _seconds(value: float | None) -> str:
+    return "—" if value is None else f"{value:.1f}s"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
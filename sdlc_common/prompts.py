@@ -0,0 +1,99 @@
+"""Agent prompts read from an agent.py source file without importing it.
+
+Reads the name, model, description and instruction given to the module's
+``Agent(...)`` call, whether they are written inline or as module-level string
+constants (NAME, DESCRIPTION, INSTRUCTION). Several versions of one agent (the
+live agent.py, an archive copy, a file from another commit) can be loaded side
+by side this way, without running their imports or building their agents.
+"""
+
+import ast
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+AGENT_CLASSES = ("Agent", "LlmAgent")
+
+_JSON_OUTPUT = re.compile(
+    r"(?:return|output) ONLY (?:a )?valid JSON|respond with a JSON (?:object|array)"
+    r"|first character of your response must be an opening brace",
+    re.IGNORECASE,
+)
+
+
+class PromptError(ValueError):
+    pass
+
+
+@dataclass
+class AgentPrompt:
+    name: str
+    model: str
+    description: str
+    instruction: str
+    path: str
+
+
+def expects_json(instruction: str) -> bool:
+    """Whether the instruction demands a bare JSON response."""
+    return bool(_JSON_OUTPUT.search(instruction))
+
+
+def agent_path(agent: str) -> Path:
+    return ROOT / agent / "agent.py"
+
+
+def load_prompt(agent_or_path: str | os.PathLike) -> AgentPrompt:
+    """The prompt of an agent given by name (``data_model_agent``) or by the path of its agent.py."""
+    path = Path(agent_or_path)
+    if path.suffix != ".py":
+        path = agent_path(str(agent_or_path))
+    try:
+        source = path.read_text(encoding="utf-8")
+    except OSError as error:
+        raise PromptError(f"cannot read {path}: {error.strerror}") from error
+    return parse_prompt(source, str(path))
+
+
+def parse_prompt(source: str, path: str = "<string>") -> AgentPrompt:
+    tree = ast.parse(source, path)
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            value = _string(node.value, constants)
+            if value is not None:
+                constants[node.targets[0].id] = value
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and _called_name(node) in AGENT_CLASSES:
+            values = {keyword.arg: _string(keyword.value, constants) for keyword in node.keywords if keyword.arg}
+            if values.get("instruction") is not None:
+                return AgentPrompt(
+                    name=values.get("name") or "",
+                    model=values.get("model") or "",
+                    description=values.get("description") or "",
+                    instruction=values["instruction"],
+                    path=path,
+                )
+    raise PromptError(f"{path}: no Agent(...) call with a literal instruction")
+
+
+def _called_name(call: ast.Call) -> str:
+    if isinstance(call.func, ast.Name):
+        return call.func.id
+    if isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    return ""
+
+
+def _string(node: ast.expr, constants: dict[str, str]) -> str | None:
+    """The value of a string literal, a known constant or a concatenation of them; None otherwise."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _string(node.left, constants), _string(node.right, constants)
+        return left + right if left is not None and right is not None else None
+    return None
@@ -0,0 +1,210 @@
+"""Per-agent choice between the flash and pro model tiers, with one fallback.
+
+Enabled with MODEL_ROUTING=on; otherwise every agent keeps its own model.
+Before each model call, the request's input tokens are estimated and the
+agent's ``RoutePolicy`` picks the tier. First, a tier must fit the expected
+output. Then large inputs prefer pro and small ones prefer flash. Finally, a
+tier whose estimated latency misses the policy's SLO yields to the other tier
+when that one fits. So small projects get a fast flash plan, and large ones go
+straight to pro instead of retrying on flash.
+
+If the call fails with an overload error (429 / 503), or stops at the output
+limit, it is retried once on the other tier (truncation only moves up to
+pro). The decision is recorded as ``model_route`` in session state.
+
+``routed(agent)`` adds the callbacks to an agent and to every LlmAgent below
+it. Agents created at run time by a FanOutAgent keep their own model, as do
+before_model_callbacks that answer from a cache or make their own call.
+"""
+
+import os
+from dataclasses import asdict, dataclass
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from sdlc_common.callbacks import (
+    chain_after_model_callbacks, chain_model_error_callbacks, content_text, replace_text, text_response,
+)
+from sdlc_common.llm import generate_candidates
+from sdlc_common.tokens import estimate_tokens
+
+
+@dataclass(frozen=True)
+class Tier:
+    model: str
+    max_output_tokens: int
+    # Rough throughput used for latency estimates only.
+    input_tokens_per_second: float
+    output_tokens_per_second: float
+    first_token_seconds: float
+
+    def latency(self, input_tokens: int, output_tokens: int) -> float:
+        return (
+            self.first_token_seconds
+            + input_tokens / self.input_tokens_per_second
+            + output_tokens / self.output_tokens_per_second
+        )
+
+
+FLASH = Tier("gemini-2.0-flash", 8192, 20000, 150, 0.5)
+PRO = Tier("gemini-2.5-pro", 65536, 8000, 60, 4.0)
+TIERS = {tier.model: tier for tier in (FLASH, PRO)}
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    default: Tier = FLASH
+    flash_below: int = 0  # input tokens under which flash is preferred
+    pro_above: int = 60000  # input tokens over which pro is preferred
+    output_ratio: float = 0.5  # expected output tokens per input token
+    min_output: int = 2000
+    latency_slo: float = 120.0
+
+    def expected_output(self, input_tokens: int) -> int:
+        return max(self.min_output, int(input_tokens * self.output_ratio))
+
+
+# Keyed by agent name; sub-agents (data_model_agent_outline, ...) use their parent's policy.
+POLICIES = {
+    "implementation_plan_agent": RoutePolicy(
+        default=PRO, flash_below=12000, pro_above=12000, output_ratio=0.6, min_output=5000, latency_slo=300
+    ),
+    "prd_generation_agent": RoutePolicy(pro_above=40000, output_ratio=0.3, min_output=4000, latency_slo=180),
+    "data_model_agent": RoutePolicy(pro_above=40000, output_ratio=0.3, min_output=3000),
+    "api_contract_agent": RoutePolicy(pro_above=40000, output_ratio=0.4, min_output=4000),
+    "architecture_overview_agent": RoutePolicy(pro_above=40000, output_ratio=0.25, min_output=3000),
+    "sequence_diagrams_agent": RoutePolicy(pro_above=40000, output_ratio=0.25, min_output=3000),
+    "screen_generation_agent": RoutePolicy(output_ratio=0.6, min_output=6000),
+    "it_estimation_agent": RoutePolicy(pro_above=40000, output_ratio=0.2),
+}
+DEFAULT_POLICY = RoutePolicy(output_ratio=0.2, min_output=1500, latency_slo=60)
+
+OVERLOAD_MARKERS = ("429", "503", "RESOURCE_EXHAUSTED", "UNAVAILABLE", "overloaded")
+
+
+@dataclass
+class Route:
+    model: str
+    input_tokens: int
+    expected_output_tokens: int
+    estimated_seconds: float
+    reason: str
+    fallback: str = ""
+
+
+def routing_enabled() -> bool:
+    return os.getenv("MODEL_ROUTING", "").lower() in ("on", "1", "true")
+
+
+def policy_for(agent_name: str) -> RoutePolicy:
+    matches = [name for name in POLICIES if agent_name == name or agent_name.startswith(f"{name}_")]
+    return POLICIES[max(matches, key=len)] if matches else DEFAULT_POLICY
+
+
+def choose_tier(policy: RoutePolicy, input_tokens: int) -> tuple[Tier, str]:
+    output_tokens = policy.expected_output(input_tokens)
+    fits = [tier for tier in (policy.default, _other(policy.default)) if tier.max_output_tokens >= output_tokens]
+    if not fits:
+        return PRO, "expected output exceeds every tier's limit"
+    if len(fits) == 1:
+        return fits[0], "only tier whose output limit fits"
+    if input_tokens > policy.pro_above:
+        tier, reason = PRO, f"input over {policy.pro_above} tokens"
+    elif input_tokens < policy.flash_below:
+        tier, reason = FLASH, f"input under {policy.flash_below} tokens"
+    else:
+        tier, reason = policy.default, "agent default"
+    other = _other(tier)
+    if (tier.latency(input_tokens, output_tokens) > policy.latency_slo
+            >= other.latency(input_tokens, output_tokens)):
+        return other, f"{tier.model} would miss the {policy.latency_slo:g}s latency SLO"
+    return tier, reason
+
+
+def route_model(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """before_model_callback: set the request's model from the agent's policy."""
+    config = llm_request.config
+    instruction = config.system_instruction if config and isinstance(config.system_instruction, str) else ""
+    input_tokens = estimate_tokens(instruction) + sum(
+        estimate_tokens(content_text(content)) for content in llm_request.contents or []
+    )
+    policy = policy_for(callback_context.agent_name)
+    tier, reason = choose_tier(policy, input_tokens)
+    llm_request.model = tier.model
+    output_tokens = policy.expected_output(input_tokens)
+    route = Route(tier.model, input_tokens, output_tokens, round(tier.latency(input_tokens, output_tokens), 1), reason)
+    callback_context.state["model_route"] = asdict(route)
+    _requests[_key(callback_context)] = llm_request
+    return None
+
+
+async def retry_truncated(callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+    """after_model_callback: redo a flash response cut off at the output limit on pro."""
+    if llm_response.partial:  # the request stays stored until the final streamed response
+        return None
+    llm_request = _requests.pop(_key(callback_context), None)
+    if llm_request is None or str(llm_response.finish_reason or "") not in (
+        "MAX_TOKENS", "FinishReason.MAX_TOKENS"
+    ) or llm_request.model == PRO.model:
+        return None
+    text = await _call_other_tier(callback_context, llm_request, "truncated at the output limit")
+    if not text:
+        return None
+    return replace_text(llm_response, text).model_copy(update={"finish_reason": types.FinishReason.STOP})
+
+
+async def retry_overloaded(
+    callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+) -> LlmResponse | None:
+    """on_model_error_callback: retry an overloaded call once on the other tier."""
+    _requests.pop(_key(callback_context), None)
+    if not any(marker in str(error) for marker in OVERLOAD_MARKERS):
+        return None
+    text = await _call_other_tier(callback_context, llm_request, f"overloaded: {str(error)[:200]}")
+    return text_response(text) if text else None
+
+
+def routed(agent: BaseAgent) -> BaseAgent:
+    """Add model routing to the agent and every LlmAgent below it, when MODEL_ROUTING is on."""
+    if not routing_enabled():
+        return agent
+    if isinstance(agent, LlmAgent):
+        before = agent.before_model_callback
+        before = before if isinstance(before, list) else [before] if before else []
+        # Last, so the request is measured after the other callbacks have rewritten it.
+        agent.before_model_callback = [*before, route_model]
+        after = agent.after_model_callback
+        after = after if isinstance(after, list) else [after] if after else []
+        # Chained, so the other post-processors see the complete response from the retry.
+        agent.after_model_callback = chain_after_model_callbacks(retry_truncated, *after)
+        # After any existing error callbacks, which may only be observing the failure.
+        agent.on_model_error_callback = chain_model_error_callbacks(agent.on_model_error_callback, retry_overloaded)
+    for sub_agent in agent.sub_agents:
+        routed(sub_agent)
+    return agent
+
+
+_requests: dict[str, LlmRequest] = {}
+
+
+async def _call_other_tier(callback_context: CallbackContext, llm_request: LlmRequest, why: str) -> str:
+    other = _other(TIERS.get(llm_request.model, FLASH))
+    route = dict(callback_context.state.get("model_route") or {})
+    try:
+        texts = await generate_candidates(other.model, llm_request.contents, llm_request.config, 1)
+    except Exception as error:  # one fallback only: never cascade retries across tiers
+        callback_context.state["model_route"] = {**route, "fallback": f"{other.model} failed after {why}: {error}"}
+        return ""
+    callback_context.state["model_route"] = {**route, "model": other.model, "fallback": f"{llm_request.model} {why}"}
+    return texts[0] if texts else ""
+
+
+def _other(tier: Tier) -> Tier:
+    return PRO if tier is FLASH else FLASH
+
+
+def _key(callback_context: CallbackContext) -> str:
+    return f"{callback_context.invocation_id}:{callback_context.agent_name}"
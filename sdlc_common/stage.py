@@ -0,0 +1,77 @@
+"""Stage an agent for ``adk deploy agent_engine`` with sdlc_common inside it.
+
+``adk deploy agent_engine <agent_dir>`` uploads only the agent folder, so the
+sibling sdlc_common package would be missing on Agent Engine. This copies the
+agent folder to a staging directory, vendors sdlc_common into the copy and
+rewrites the ``sdlc_common`` imports of both to package-relative ones, so the
+staged folder is self-contained. The working tree is not modified.
+
+    python -m sdlc_common.stage screen_generation_agent
+    # prints the staged folder to pass to adk deploy agent_engine
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+PACKAGE = "sdlc_common"
+ROOT = Path(__file__).resolve().parent.parent
+
+_IGNORE = shutil.ignore_patterns("__pycache__", "*.py[cod]", "deploy.sh*", ".env")
+_IMPORT = re.compile(rf"^(\s*)from {PACKAGE}(\.|\s+import\b)", re.MULTILINE)
+
+
+class StageError(Exception):
+    pass
+
+
+def stage(agent: str, dest: Path | None = None) -> Path:
+    """Copy ``agent`` to ``dest/agent`` with sdlc_common vendored; return the copy."""
+    source = ROOT / agent
+    if not (source / "agent.py").is_file():
+        raise StageError(f"{agent}: no agent.py under {source}")
+    dest = Path(dest) if dest else Path(tempfile.mkdtemp(prefix="sdlc-deploy-"))
+    staged = dest / agent
+    if staged.exists():
+        shutil.rmtree(staged)
+    shutil.copytree(source, staged, ignore=_IGNORE)
+    shutil.copytree(ROOT / PACKAGE, staged / PACKAGE, ignore=_IGNORE)
+    for path in staged.rglob("*.py"):
+        text = path.read_text(encoding="utf-8")
+        rewritten = relative_imports(text, len(path.relative_to(staged).parts))
+        if rewritten != text:
+            path.write_text(rewritten, encoding="utf-8")
+    return staged
+
+
+def relative_imports(source: str, depth: int) -> str:
+    """Rewrite ``from sdlc_common…`` for a module ``depth`` levels below the agent folder.
+
+    ``depth`` counts the module file itself, so agent.py is 1 and
+    sdlc_common/routing.py is 2; the import is made relative to the agent
+    package, which is where the vendored sdlc_common lives.
+    """
+    dots = "." * depth
+    return _IMPORT.sub(lambda match: f"{match.group(1)}from {dots}{PACKAGE}{match.group(2)}", source)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("agent", help="agent folder, e.g. screen_generation_agent")
+    parser.add_argument("--dest", type=Path, help="staging directory (default: a new temporary directory)")
+    args = parser.parse_args(argv)
+    try:
+        print(stage(args.agent, args.dest))
+    except StageError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
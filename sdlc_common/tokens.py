@@ -0,0 +1,62 @@
+"""Token estimates and token-budgeted chunking of long inputs.
+
+Estimates use a fixed characters-per-token ratio rather than a tokenizer call:
+they only decide where to cut, and Gemini tokenizes English prose at roughly
+four characters per token.
+"""
+
+import re
+
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def chunk_text(text: str, budget: int) -> list[str]:
+    """Split text into chunks of at most ``budget`` estimated tokens.
+
+    Cuts fall between paragraphs where possible, then between lines, and only
+    split a line when a single line is over budget. Text within budget is
+    returned as one chunk.
+    """
+    if estimate_tokens(text) <= budget:
+        return [text] if text.strip() else []
+    chunks, current = [], []
+    for piece in _pieces(text, budget * CHARS_PER_TOKEN):
+        if current and estimate_tokens("\n\n".join(current + [piece])) > budget:
+            chunks.append("\n\n".join(current))
+            current = []
+        current.append(piece)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _pieces(text: str, limit: int) -> list[str]:
+    """Paragraphs of the text, with any paragraph over ``limit`` characters split further."""
+    pieces = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip("\n")
+        if not paragraph.strip():
+            continue
+        if len(paragraph) <= limit:
+            pieces.append(paragraph)
+            continue
+        line_group = ""
+        for line in paragraph.split("\n"):
+            while len(line) > limit:
+                cut = line.rfind(" ", 0, limit)
+                cut = cut if cut > 0 else limit
+                pieces.extend(filter(None, [line_group, line[:cut]]))
+                line_group, line = "", line[cut:].lstrip()
+            if line_group and len(line_group) + 1 + len(line) > limit:
+                pieces.append(line_group)
+                line_group = ""
+            line_group = f"{line_group}\n{line}" if line_group else line
+        if line_group:
+            pieces.append(line_group)
+    return pieces
@@ -0,0 +1,106 @@
+"""Several alternative responses from one model call.
+
+Set GTM_VARIANTS (or ``variant_count`` in session state, which takes
+precedence) to a number above 1, and an agent with ``generate_variants`` as
+before_model_callback answers with that many alternatives from a single
+request: the model is asked for that many candidates of the same prompt, so
+the input is processed once. Where candidate_count is refused, one structured
+request for a JSON list of variants is made instead. Variants whose wording is
+nearly identical to an earlier one are dropped.
+
+The response holds each variant under a ``# Variant N`` heading, separated by
+horizontal rules; the variant texts are also recorded as ``variants`` in
+session state.
+"""
+
+import os
+import re
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import content_text, load_json, strip_outer_fence, text_response
+from sdlc_common.llm import generate_candidates, generate_text
+
+MAX_VARIANTS = 8  # Gemini's candidate_count limit
+VARIANT_TEMPERATURE = 1.0
+DUPLICATE_SIMILARITY = 0.8
+SHINGLE_SIZE = 3
+
+STRUCTURED_INSTRUCTION = """
+
+## Variants
+
+Write {count} distinct alternative versions of the complete document described above, each following every rule
+above on its own. Vary the angle, headline, wording and emphasis between them; do not reuse sentences.
+Return ONLY a JSON object of the form {{"variants": ["<document 1>", "<document 2>", ...]}} with {count} entries.
+"""
+
+
+def variant_count(callback_context: CallbackContext) -> int:
+    value = callback_context.state.get("variant_count") or os.getenv("GTM_VARIANTS") or 1
+    try:
+        return max(1, min(int(value), MAX_VARIANTS))
+    except (TypeError, ValueError):
+        return 1
+
+
+def distinct_variants(texts: list[str], threshold: float = DUPLICATE_SIMILARITY) -> list[str]:
+    """Drop empty variants and those whose word shingles mostly repeat an earlier variant's."""
+    kept: list[tuple[str, set]] = []
+    for text in texts:
+        shingles = _shingles(text)
+        if not shingles:
+            continue
+        if any(len(shingles & other) / len(shingles | other) >= threshold for _, other in kept):
+            continue
+        kept.append((text, shingles))
+    return [text for text, _ in kept]
+
+
+def render_variants(variants: list[str]) -> str:
+    return "\n\n---\n\n".join(f"# Variant {number}\n\n{text.strip()}" for number, text in enumerate(variants, 1))
+
+
+async def generate_variants(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """before_model_callback: answer with several variants from one call when variants are requested."""
+    count = variant_count(callback_context)
+    if count < 2:
+        return None
+    config = llm_request.config
+    if config is not None and config.temperature is None:
+        config = config.model_copy(update={"temperature": VARIANT_TEMPERATURE})
+    try:
+        texts = await generate_candidates(llm_request.model, llm_request.contents, config, count)
+    except Exception:  # models or endpoints that refuse candidate_count
+        texts = []
+    if len(texts) < 2:
+        try:
+            texts = await _structured_variants(llm_request, count)
+        except Exception as error:  # fall back to the agent's own single-response call
+            callback_context.state["variants_error"] = str(error)
+            return None
+    variants = distinct_variants([strip_outer_fence(text) for text in texts])
+    if not variants:
+        return None
+    callback_context.state["variants"] = variants
+    callback_context.state["variants_dropped"] = len(texts) - len(variants)
+    return text_response(render_variants(variants))
+
+
+async def _structured_variants(llm_request: LlmRequest, count: int) -> list[str]:
+    config = llm_request.config
+    instruction = config.system_instruction if config and isinstance(config.system_instruction, str) else ""
+    prompt = "\n\n".join(content_text(content) for content in llm_request.contents)
+    answer = load_json(await generate_text(
+        llm_request.model, prompt, instruction + STRUCTURED_INSTRUCTION.format(count=count), json_output=True
+    ))
+    variants = answer.get("variants") if isinstance(answer, dict) else None
+    return [str(variant) for variant in variants or [] if isinstance(variant, str)]
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[index:index + SHINGLE_SIZE]) for index in range(len(words) - SHINGLE_SIZE + 1)}
@@ -1,10 +1,16 @@
+import os
+
 from google.adk.agents import Agent
 
-root_agent = Agent(
-    name="sequence_diagrams_agent",
-    model="gemini-2.0-flash",
-    description="Generates Mermaid sequence diagrams for key system flows from a PRD, architecture overview, data model, API contract, and technical guidelines.",
-    instruction="""
+from sdlc_common.mermaid import fix_mermaid_diagrams
+from sdlc_common.prompt_registry import versioned
+from sdlc_common.routing import routed
+
+from .parallel import parallel_sequence_diagrams_agent
+
+NAME = "sequence_diagrams_agent"
+DESCRIPTION = "Generates Mermaid sequence diagrams for key system flows from a PRD, architecture overview, data model, API contract, and technical guidelines."
+INSTRUCTION = """
 CRITICAL: Generate output based ONLY on the context provided in this message. Do not use any information from previous sessions, prior conversations, or stored memory. Every section of your response must be derived exclusively from the input provided below.
 
 You are a senior software architect generating sequence diagrams for an enterprise software project.
@@ -147,5 +153,17 @@ Before finalizing your response, verify:
 - Does Diagram 1 include an alt block for valid vs invalid credentials?
 - Does Diagram 2 show the single most important PRD business flow end to end?
 
-""",
-)
+"""
+
+if os.getenv("SEQUENCE_DIAGRAMS_MODE") == "parallel":
+    root_agent = parallel_sequence_diagrams_agent(NAME, DESCRIPTION, INSTRUCTION)
+else:
+    root_agent = Agent(
+        name=NAME,
+        model="gemini-2.0-flash",
+        description=DESCRIPTION,
+        instruction=INSTRUCTION,
+        after_model_callback=fix_mermaid_diagrams,
+    )
+
+root_agent = routed(versioned(root_agent))
@@ -0,0 +1,179 @@
+"""Parallel mode: one model call per diagram, each with only the context it needs.
+
+Enabled with SEQUENCE_DIAGRAMS_MODE=parallel. Whether the optional external
+integration and validation diagrams apply is decided locally from the
+context. Each diagram agent receives the shared rules of the full instruction
+plus its own diagram brief and a slice of the PRD, API contract and data model
+filtered to that flow. The stitch step adds the document header, numbers the
+diagrams that were produced and repairs their Mermaid syntax.
+"""
+
+import re
+from dataclasses import dataclass
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from sdlc_common.callbacks import replace_request_text, text_response, user_text
+from sdlc_common.context import parse_context, render_context, section_map
+from sdlc_common.markdown import select_blocks
+from sdlc_common.mermaid import fix_markdown
+from sdlc_common.pipeline import parallel_document_agent
+
+HEADER = "## Sequence Diagrams\n**Generated from:** API Contract · Data Model · Architecture Overview"
+VALIDATION_THRESHOLD = 4
+
+_BRIEF = re.compile(r"^Diagram (\d) — (.+?)(?: \(.+\))?:\s*$", re.MULTILINE)
+_INTEGRATION = re.compile(
+    r"\bexternal (?:system|service|api|provider|integration)s?\b|\bthird[- ]party\b|\bintegrat(?:e|es|ion) with\b"
+    r"|\bwebhooks?\b|\boutbound (?:call|request)s?\b",
+    re.IGNORECASE,
+)
+_VALIDATION = re.compile(
+    r"\bvalidat\w*|\binvalid\b|\breject\w*|\brequired fields?\b|\bbusiness rules?\b|\berror (?:message|state)s?\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Diagram:
+    key: str
+    sections: tuple[str, ...]
+    focus: re.Pattern | None  # filters the PRD, API contract and data model; None keeps them whole
+    optional: bool = False
+
+    @property
+    def output_key(self) -> str:
+        return f"sequence_diagram_{self.key}"
+
+
+DIAGRAMS = (
+    Diagram(
+        "authentication",
+        ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT", "DATA MODEL", "API CONTRACT",
+         "CORPORATE TECHNICAL GUIDELINES"),
+        re.compile(r"\b(?:auth\w*|log ?in|sign ?in|password|credential|token|session|users?)\b", re.IGNORECASE),
+    ),
+    Diagram(
+        "core_business",
+        ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT", "DATA MODEL", "API CONTRACT"),
+        None,
+    ),
+    Diagram(
+        "data_retrieval",
+        ("TECHNOLOGY STACK", "CONFIRMED UI SCREENS", "DATA MODEL", "API CONTRACT"),
+        re.compile(r"\bGET\b|\b(?:list|dashboard|detail|search)\b", re.IGNORECASE),
+    ),
+    Diagram(
+        "external_integration",
+        ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT", "ARCHITECTURE OVERVIEW", "API CONTRACT"),
+        _INTEGRATION,
+        optional=True,
+    ),
+    Diagram(
+        "error_validation",
+        ("TECHNOLOGY STACK", "PRODUCT REQUIREMENTS DOCUMENT", "API CONTRACT"),
+        re.compile(_VALIDATION.pattern + r"|\b4\d\d\b", re.IGNORECASE),
+        optional=True,
+    ),
+)
+
+
+def applicable_diagrams(context: str) -> list[Diagram]:
+    """The always-required diagrams plus the optional ones the context calls for."""
+    sections = section_map(context)
+    prd = sections.get("PRODUCT REQUIREMENTS DOCUMENT", "")
+    integration_text = " ".join(sections.get(name, "") for name in ("PRODUCT REQUIREMENTS DOCUMENT", "API CONTRACT"))
+    include = {
+        "external_integration": bool(_INTEGRATION.search(integration_text)),
+        "error_validation": len(_VALIDATION.findall(prd)) >= VALIDATION_THRESHOLD,
+    }
+    return [diagram for diagram in DIAGRAMS if not diagram.optional or include[diagram.key]]
+
+
+def slice_context(context: str, diagram: Diagram) -> str:
+    """The context sections the diagram needs, with the long documents filtered to its flow."""
+    sections = [section for section in parse_context(context) if section.name in diagram.sections]
+    if diagram.focus is not None:
+        for section in sections:
+            if section.name in ("PRODUCT REQUIREMENTS DOCUMENT", "API CONTRACT", "DATA MODEL"):
+                section.body = "\n" + select_blocks(section.body, diagram.focus) + "\n\n"
+    return render_context(sections)
+
+
+def diagram_instructions(instruction: str) -> tuple[str, dict[int, tuple[str, str]]]:
+    """Split the full instruction into its shared rules and the brief of each numbered diagram."""
+    start = instruction.index("## Document Structure")
+    end = instruction.index("## Quality Standards")
+    # Rules about the document as a whole are replaced by the per-diagram output format.
+    shared = "\n".join(
+        line for line in (instruction[:start] + instruction[end:]).split("\n")
+        if "start with ## Sequence Diagrams" not in line
+    )
+    briefs = {}
+    matches = list(_BRIEF.finditer(instruction, start, end))
+    for match, following in zip(matches, matches[1:] + [None]):
+        body = instruction[match.end():following.start() if following else end].strip()
+        briefs[int(match.group(1))] = (match.group(2), body)
+    return shared, briefs
+
+
+def part_instructions(instruction: str) -> dict[str, str]:
+    """The instruction of each diagram's call, by diagram key."""
+    shared, briefs = diagram_instructions(instruction)
+    instructions = {}
+    for number, diagram in enumerate(DIAGRAMS, start=1):
+        title, brief = briefs[number]
+        instructions[diagram.key] = (
+            f"{shared}\n\n## Your Diagram\n\n"
+            f"Produce ONLY the {title} diagram described below, not the whole document. Return a single "
+            "sentence describing the flow followed by its ```mermaid block — no headings, no document header.\n\n"
+            f"{brief}\n"
+        )
+    return instructions
+
+
+def parallel_sequence_diagrams_agent(name: str, description: str, instruction: str):
+    _, briefs = diagram_instructions(instruction)
+    instructions = part_instructions(instruction)
+    titles = {}
+    parts = []
+    for number, diagram in enumerate(DIAGRAMS, start=1):
+        title = briefs[number][0]
+        titles[diagram.output_key] = title
+        parts.append(LlmAgent(
+            name=f"{name}_{diagram.key}",
+            model="gemini-2.0-flash",
+            description=f"Generates the {title} sequence diagram.",
+            instruction=instructions[diagram.key],
+            output_key=diagram.output_key,
+            before_model_callback=_focus_on(diagram),
+        ))
+
+    def assemble(state: dict, context: str) -> tuple[str, dict]:
+        diagrams = [
+            (titles[diagram.output_key], (state.get(diagram.output_key) or "").strip())
+            for diagram in DIAGRAMS
+        ]
+        document = "\n\n".join([HEADER] + [
+            f"### Diagram {number}: {title}\n\n{text}"
+            for number, (title, text) in enumerate(((title, text) for title, text in diagrams if text), start=1)
+        ])
+        document, issues = fix_markdown(document)
+        return document, {"mermaid_issues": [issue.__dict__ for issue in issues if not issue.fixed]}
+
+    return parallel_document_agent(name, description, parts, assemble)
+
+
+def _focus_on(diagram: Diagram):
+    def focus(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        """before_model_callback: skip an inapplicable diagram, otherwise send only its context slice."""
+        context = user_text(callback_context)
+        if diagram not in applicable_diagrams(context):
+            callback_context.state[diagram.output_key] = ""
+            return text_response("")
+        replace_request_text(llm_request, slice_context(context, diagram))
+        return None
+
+    return focus
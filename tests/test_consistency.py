@@ -0,0 +1,23 @@
+from sdlc_common.consistency import build_index, check_consistency
+
+
+def test_malformed_plan_entries_are_skipped():
+    plan = {
+        "phases": [
+            "Phase 1",
+            {"tasks": [
+                None,
+                {"id": "phase-1-task-1", "description": None, "acceptanceCriteria": [None, "POST /orders works"],
+                 "filesToModify": ["src/app.py", 3], "dependsOn": [None, "phase-9-task-9"]},
+            ]},
+        ],
+        "scaffoldFiles": ["README.md", {"path": None, "content": None}],
+    }
+
+    findings = check_consistency(build_index(api_contract="GET /orders", plan=plan))
+
+    assert [(finding.kind, finding.reference) for finding in findings] == [
+        ("unknown_endpoint", "POST /orders"),
+        ("missing_file", "src/app.py"),
+        ("unknown_task", "phase-9-task-9"),
+    ]
@@ -0,0 +1,31 @@
+from implementation_plan_agent.coverage import check_coverage, splice_tasks
+from sdlc_common.prd import load_prd
+
+PRD = "## EPIC 1: Orders\n\n### STORY 1.1: Place an order\n\n### STORY 1.2: Cancel an order with refund\n"
+
+
+def test_null_fields_and_non_object_entries_are_skipped():
+    plan = {"phases": [
+        "Phase 1",
+        {"phaseNumber": 2, "tasks": [None, {"id": "phase-2-task-1", "title": None, "description": None,
+                                            "references": ["Story 1.1", 5]}]},
+    ]}
+
+    coverage = check_coverage(load_prd(PRD).stories, plan)
+
+    assert coverage.covered == {"1.1": ["phase-2-task-1"]}
+    assert [story.number for story in coverage.uncovered] == ["1.2"]
+
+
+def test_spliced_tasks_coerce_malformed_fields():
+    plan = {"phases": [{"phaseNumber": 1, "tasks": "none yet"}]}
+
+    added = splice_tasks(plan, [{"phaseNumber": [1], "storyNumber": "1.2", "title": None, "effort": ["S"],
+                                 "dependsOn": [None], "filesToCreate": [None, "src/refund.py"]}])
+
+    assert added == ["phase-1-task-1"]
+    task = plan["phases"][0]["tasks"][0]
+    assert (task["title"], task["effort"], task["dependsOn"]) == ("", "M", [])
+    assert task["filesToCreate"] == ["src/refund.py"]
+    assert task["references"] == ["PRD → Story 1.2"]
+    assert plan["effortSummary"]["totalTasks"] == 1
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from sdlc_common.jira_export import CsvSink, HttpSink, export
+
+
+def _prd(epics: int, stories: int, tasks: int) -> str:
+    lines = []
+    for epic in range(1, epics + 1):
+        lines += [f"## EPIC {epic}: Epic {epic}", "**Priority:** Critical", ""]
+        for story in range(1, stories + 1):
+            lines += [f"### STORY {epic}.{story}: Story {epic}.{story}", ""]
+            for task in range(1, tasks + 1):
+                lines += [f"#### TASK {epic}.{story}.{task}: Task {epic}.{story}.{task}", ""]
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def prd_path(tmp_path):
+    path = tmp_path / "PRD.md"
+    path.write_text(_prd(epics=2, stories=3, tasks=4), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def jira():
+    """A local stand-in for Jira bulk create that assigns keys in order and records every request."""
+    requests, keys = [], {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            updates = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["issueUpdates"]
+            requests.append(updates)
+            issues = []
+            for update in updates:
+                key = f"{update['fields']['project']['key']}-{len(keys) + 1}"
+                keys[key] = update["fields"]
+                issues.append({"key": key})
+            body = json.dumps({"issues": issues, "errors": []}).encode()
+            self.send_response(201)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", requests, keys
+    server.shutdown()
+    server.server_close()
+
+
+def test_csv_sink_links_children_to_parents(prd_path):
+    out = io.StringIO()
+
+    counts = export([("CLM", prd_path)], CsvSink(out))
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert counts == {"CLM": 2 + 6 + 24}
+    assert [(row["Issue ID"], row["Parent ID"], row["Issue Type"]) for row in rows[:3]] == [
+        ("CLM:1", "", "Epic"), ("CLM:1.1", "CLM:1", "Story"), ("CLM:1.1.1", "CLM:1.1", "Sub-task"),
+    ]
+    assert rows[0]["Priority"] == "Highest"
+
+
+@pytest.mark.parametrize("batch_size, batches", [
+    (50, [2, 6, 24]),  # one request per level, not one per story
+    (10, [1, 3, 10, 1, 2, 10, 1, 4]),  # sent whenever the task queue fills, and on close
+])
+def test_http_sink_batches_by_level_and_links_parent_keys(prd_path, jira, batch_size, batches):
+    url, requests, keys = jira
+    sink = HttpSink(url, batch_size=batch_size)
+
+    export([("CLM", prd_path)], sink)
+
+    assert sink.errors == []
+    assert sink.created == len(keys) == 32
+    assert [len(batch) for batch in requests] == batches
+    by_summary = {fields["summary"]: key for key, fields in keys.items()}
+    for fields in keys.values():
+        number = fields["summary"].split()[1]
+        if "." in number:
+            parent = ("Story " if number.count(".") == 2 else "Epic ") + number.rsplit(".", 1)[0]
+            assert fields["parent"] == {"key": by_summary[parent]}
+        else:
+            assert "parent" not in fields
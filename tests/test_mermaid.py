@@ -0,0 +1,81 @@
+from sdlc_common.mermaid import fix_markdown
+
+
+def _fence(code: str) -> str:
+    return f"# Architecture\n\n```mermaid\n{code}\n```\n"
+
+
+def _body(markdown: str) -> list[str]:
+    return markdown.split("```mermaid\n", 1)[1].split("\n```", 1)[0].split("\n")
+
+
+def test_unquoted_ampersand_edge_is_expanded():
+    fixed, issues = fix_markdown(_fence("flowchart LR\n    A & B --> C & D"))
+
+    assert _body(fixed)[1:] == ["    A --> C", "    A --> D", "    B --> C", "    B --> D"]
+    assert [(issue.message, issue.fixed) for issue in issues] == [("& operator in an edge", True)]
+
+
+def test_quoted_ampersand_edge_is_expanded():
+    fixed, issues = fix_markdown(_fence('flowchart LR\n    A["Web App"] & B["Mobile"] --> C["API"]'))
+
+    assert _body(fixed)[1:] == ['    A["Web App"] --> C["API"]', '    B["Mobile"] --> C']
+    assert [(issue.message, issue.fixed) for issue in issues] == [("& operator in an edge", True)]
+
+
+def test_ampersand_inside_a_quoted_label_is_left_alone():
+    code = 'flowchart LR\n    A["Sales & Marketing"] --> B["API"]'
+    fixed, issues = fix_markdown(_fence(code))
+
+    assert _body(fixed) == code.split("\n")
+    assert issues == []
+
+
+def test_paren_label_is_quoted_before_expanding():
+    fixed, issues = fix_markdown(_fence("flowchart TB\n    A[Web (SPA)] & B[Mobile] --> C[API]"))
+
+    assert _body(fixed)[1:] == ['    A["Web (SPA)"] --> C[API]', "    B[Mobile] --> C"]
+    assert [issue.message for issue in issues] == ["parentheses in an unquoted node label", "& operator in an edge"]
+    assert all(issue.fixed for issue in issues)
+
+
+def test_chained_ampersand_edge_is_reported_unfixed():
+    code = "flowchart LR\n    A & B --> C --> D"
+    fixed, issues = fix_markdown(_fence(code))
+
+    assert _body(fixed) == code.split("\n")
+    assert [(issue.message, issue.fixed) for issue in issues] == [("& operator in an edge", False)]
+
+
+def test_subgraph_with_parentheses_and_ampersand_edges():
+    code = "\n".join([
+        "flowchart TB",
+        "    subgraph Frontend (React)",
+        '        W["Web"] & M["Mobile"] --> G["Gateway"]',
+        "    end",
+    ])
+    fixed, issues = fix_markdown(_fence(code))
+
+    assert _body(fixed) == [
+        "flowchart TB",
+        '    subgraph Frontend["Frontend (React)"]',
+        '        W["Web"] --> G["Gateway"]',
+        '        M["Mobile"] --> G',
+        "    end",
+    ]
+    assert [issue.message for issue in issues] == ["parentheses in subgraph name", "& operator in an edge"]
+    assert all(issue.fixed for issue in issues)
+
+
+def test_unclosed_subgraph_and_fence_are_closed():
+    fixed, issues = fix_markdown("```mermaid\nflowchart TB\n    subgraph API\n        A --> B\n")
+
+    assert fixed == "```mermaid\nflowchart TB\n    subgraph API\n        A --> B\nend\n```"
+    assert [issue.message for issue in issues] == ["1 unclosed subgraph(s)", "mermaid fence was not closed"]
+
+
+def test_undeclared_participants_go_below_an_indented_header():
+    fixed, issues = fix_markdown(_fence("  sequenceDiagram\n participant U as User\n U->>API: hi"))
+
+    assert _body(fixed) == ["  sequenceDiagram", " participant U as User", "    participant API", " U->>API: hi"]
+    assert [(issue.message, issue.fixed) for issue in issues] == [("undeclared participants: API", True)]
@@ -0,0 +1,16 @@
+from sdlc_common.prompts import ROOT, expects_json, load_prompt
+
+JSON_AGENTS = {
+    "design_system_agent",
+    "implementation_plan_agent",
+    "it_estimation_agent",
+    "screen_extraction_agent",
+    "screen_generation_agent",
+}
+
+
+def test_expects_json_matches_every_agent():
+    agents = sorted(path.parent.name for path in ROOT.glob("*_agent/agent.py"))
+
+    assert JSON_AGENTS <= set(agents)
+    assert {agent for agent in agents if expects_json(load_prompt(agent).instruction)} == JSON_AGENTS
@@ -0,0 +1,21 @@
+import re
+
+from sdlc_common.stage import relative_imports, stage
+
+
+def test_imports_are_made_relative_to_the_agent_package():
+    source = "from sdlc_common.routing import routed\n\ndef f():\n    from sdlc_common import llm\n"
+
+    assert relative_imports(source, 1) == "from .sdlc_common.routing import routed\n\ndef f():\n    from .sdlc_common import llm\n"
+    assert relative_imports(source, 2).startswith("from ..sdlc_common.routing import routed")
+
+
+def test_staged_agent_vendors_sdlc_common(tmp_path):
+    staged = stage("screen_generation_agent", tmp_path)
+
+    assert staged == tmp_path / "screen_generation_agent"
+    assert (staged / "agent.py").is_file()
+    assert (staged / "sdlc_common" / "callbacks.py").is_file()
+    assert not list(staged.rglob("deploy.sh*"))
+    absolute = re.compile(r"^\s*from sdlc_common\b", re.MULTILINE)
+    assert [path for path in staged.rglob("*.py") if absolute.search(path.read_text())] == []